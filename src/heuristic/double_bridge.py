@@ -1,6 +1,8 @@
 from random import randrange
 from heuristic.two_opt import two_opt_local_search
 from utils.graficar import graficar_ciudades, graficar_recorrido
+from utils.tour import Tour
+from utils.two_level_list import TwoLevelList
 
 
 def calculate_total_distance(tour, distance_matrix):
@@ -18,6 +20,9 @@ def double_bridge_move(tour):
     """
     Realiza el movimiento de doble puente en un recorrido determinado.
     """
+    if isinstance(tour, (Tour, TwoLevelList)):
+        tour = tour.tolist()
+        tour.append(tour[0])
 
     last_node = tour.pop()
     n = len(tour)
@@ -35,7 +40,7 @@ def double_bridge_move(tour):
 
 
 def iterative_local_search(
-    distance_matrix, city, algorithm_func, show_iterations, current_city = ""
+    distance_matrix, city, algorithm_func, show_iterations, current_city = "", neighbourhood = "2opt"
 ):
     """
     Búsqueda local iterativa para la resolución del problema del agente viajero (TSP).
@@ -55,6 +60,9 @@ def iterative_local_search(
     (por ejemplo, nearest_neighbour).
     max_no_improv_iters (int, opcional): Número máximo de iteraciones sin
     mejora para detener el algoritmo. Por defecto es 50.
+    neighbourhood (str, opcional): Vecindario de la búsqueda local ("2opt",
+    "or_opt", "2opt+or_opt", "3opt" o "lk" para Lin-Kernighan). Por defecto
+    es "2opt".
 
     Return:
     ------
@@ -67,7 +75,7 @@ def iterative_local_search(
 
     # Genera una solucion inicial
     best_distance, best_tour = two_opt_local_search(
-        distance_matrix, city, algorithm_func
+        distance_matrix, city, algorithm_func, neighbourhood=neighbourhood
     )
     no_improv_iters = 0
     max_no_improv_iters= 50
@@ -91,7 +99,7 @@ def iterative_local_search(
 
         # Aplica la busqueda local sobre la solucion perturbada
         new_distance, new_tour = two_opt_local_search(
-            distance_matrix, city, lambda dm, c: (0, new_tour)
+            distance_matrix, city, lambda dm, c: (0, new_tour), neighbourhood=neighbourhood
         )
 
         # Criterio de aceptacion
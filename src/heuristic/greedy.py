@@ -1,7 +1,8 @@
 from utils.graficar import graficar_ciudades, graficar_recorrido
+from utils.indice_espacial import candidatos_como_listas
 
 
-def greedy_insertion(matriz_distancia, ciudades, show_iterations = False, current_city = "", nodo_inicial=0):
+def greedy_insertion(matriz_distancia, ciudades, show_iterations = False, current_city = "", nodo_inicial=0, candidatos=None):
     """
     Heurística Greedy Insertion (también llamada cheapest insertion) para la
     resolución del problema del agente viajero (TSP).
@@ -18,6 +19,10 @@ def greedy_insertion(matriz_distancia, ciudades, show_iterations = False, curren
     nodo_inicial (int): Nodo inicial desde el cual comenzar la ruta. Por defecto es 0.
     guardar (bool): Si es True, genera una imagen por iteración mostrando cómo
                     se agregan los nodos a la ruta.
+    candidatos (np.ndarray / lista de listas, opcional): Listas de candidatos de
+                    cada nodo (ver utils/indice_espacial.py). Si se dan, cada
+                    nodo solo se evalúa en las aristas de la ruta que tocan a
+                    sus candidatos, en O(n * k) por paso en lugar de O(n^2).
     
     Return:
     tuple: Una tupla que contiene:
@@ -28,12 +33,33 @@ def greedy_insertion(matriz_distancia, ciudades, show_iterations = False, curren
     cantidad_nodos = len(matriz_distancia)
     ruta = [nodo_inicial, nodo_inicial]
     no_visitados = set(range(len(matriz_distancia))) - {nodo_inicial}
+    candidatos = candidatos_como_listas(candidatos)
     iter = 0
     while no_visitados:
+        movimientos = None
+        if candidatos is not None:
+            # Posiciones de insercion adyacentes a los candidatos de cada nodo
+            # (el nodo inicial esta en ambos extremos de la ruta)
+            posicion = {nodo: i for i, nodo in enumerate(ruta)}
+            posicion[nodo_inicial] = 0
+            movimientos = [
+                (node, i)
+                for node in no_visitados
+                for vecino in candidatos[node]
+                if vecino in posicion
+                for i in (
+                    (1, len(ruta) - 1)
+                    if vecino == nodo_inicial
+                    else (posicion[vecino], posicion[vecino] + 1)
+                )
+            ]
+        if not movimientos:
+            movimientos = ((node, i) for node in no_visitados for i in range(1, len(ruta)))
+
         # Encuentra el nodo no visitado y el lugar donde insertarlo en la ruta,
         # de manera que se minimice el aumento de la distancia.
         sig_nodo, posicion_insertar = min(
-            ((node, i) for node in no_visitados for i in range(1, len(ruta))),
+            movimientos,
             key=lambda x: matriz_distancia[ruta[x[1] - 1]][x[0]]
             + matriz_distancia[x[0]][ruta[x[1]]]
             - matriz_distancia[ruta[x[1] - 1]][ruta[x[1]]],
@@ -0,0 +1,100 @@
+from functools import partial
+from itertools import count
+
+from utils.graficar import graficar_recorrido
+from heuristic.local_search_engine import (
+    K_CANDIDATOS,
+    LK_BREADTH,
+    LK_MAX_DEPTH,
+    lin_kernighan_move,
+    or_opt_move,
+    local_search,
+)
+
+
+def lin_kernighan(distance_matrix, tour, candidates=None, k=K_CANDIDATOS, max_depth=LK_MAX_DEPTH, breadth=LK_BREADTH, dont_look_bits=True, callback=None):
+    """
+    Búsqueda local de profundidad variable al estilo Lin-Kernighan.
+
+    Cada movimiento es una cadena de hasta max_depth movimientos 2-opt
+    secuenciales que se construye mientras la ganancia parcial sea positiva,
+    eligiendo en cada nivel el candidato que maximiza d(t3, t4) - d(t2, t3).
+    Las aristas eliminadas no se vuelven a agregar y las agregadas no se
+    eliminan dentro de la misma cadena. Se aplica la parte de la cadena con
+    mayor ganancia; antes se prueban los movimientos Or-opt, que las cadenas
+    de 2-opt no alcanzan.
+
+    Parámetros:
+    ----------
+
+    distance_matrix ([[int/float]] / np.ndarray / OraculoDistancia): Distancias entre nodos.
+    tour (list / Tour): Ruta inicial, abierta o cerrada (con el nodo inicial al
+                        final). Un Tour se mejora en el lugar.
+    candidates (np.ndarray / lista de listas, opcional): Listas de candidatos de
+                cada nodo ordenadas por distancia. Por defecto los k más cercanos.
+    k (int): Cantidad de candidatos por nodo si no se dan candidates.
+    max_depth (int): Cantidad máxima de movimientos 2-opt de una cadena.
+    breadth (int): Alternativas probadas en el primer nivel de cada cadena.
+    dont_look_bits (bool): Si es True, solo se reevalúan las ciudades tocadas
+                           por los últimos movimientos.
+    callback (function, opcional): Se llama con la ruta actual (lista) tras cada mejora.
+
+    Return:
+    ------
+
+    tuple: Una tupla que contiene:
+           - distance (float): La distancia total de la ruta mejorada.
+           - tour (list): La ruta mejorada, que empieza en la misma ciudad que
+             la original y está cerrada si la original lo estaba.
+    """
+    moves = (or_opt_move, partial(lin_kernighan_move, max_depth=max_depth, breadth=breadth))
+    return local_search(distance_matrix, tour, moves, candidates, k, "first", dont_look_bits, callback)
+
+
+def lin_kernighan_local_search(distance_matrix, city, algorithm_func, show_iterations = False, current_city = "", candidates=None, max_depth=LK_MAX_DEPTH):
+    """
+    Búsqueda local Lin-Kernighan para la resolución del problema del agente viajero (TSP).
+
+    Mejora la solución inicial generada por algorithm_func con lin_kernighan.
+    Tiene la misma firma que two_opt_local_search, por lo que puede usarse en
+    su lugar.
+
+    Parámetros: 
+    ----------
+
+    distance_matrix ([[int/float]]): Matriz de distancias entre los nodos del
+                                     problema. (distance_matrix[i][j] representa
+                                     la distancia del nodo i al nodo j).
+    city (list): Lista de nombres o identificadores de las ciudades o nodos.
+    algorithm_func (function): Función de heurística que genera una ruta inicial
+                               (por ejemplo, nearest_neighbour).
+    candidates (np.ndarray / lista de listas, opcional): Listas de candidatos
+                               de cada nodo (ver utils/indice_espacial.py).
+                               Por defecto se usan los 10 vecinos más cercanos.
+    max_depth (int): Cantidad máxima de movimientos 2-opt de una cadena.
+
+    Return:
+    ------
+
+    tuple: Una tupla que contiene:
+           - distancia_total (int/float): La distancia total de la ruta mejorada.
+           - tour (list): La ruta (lista de nodos) mejorada.
+    """
+
+    distance, tour = algorithm_func(distance_matrix, city)
+
+    callback = None
+    if show_iterations:
+        itr = count()
+
+        def callback(current_tour):
+            # Dibujar la nueva ruta
+            graficar_recorrido(
+                current_tour + [current_tour[0]],
+                city,
+                f"lin_kernighan_{algorithm_func.__name__}/{current_city}",
+                f"{current_city}_lin_kernighan_{algorithm_func.__name__}_iter_{next(itr)}",
+                False
+            )
+
+    return lin_kernighan(distance_matrix, tour, candidates, max_depth=max_depth, callback=callback)
@@ -0,0 +1,459 @@
+from collections import deque
+
+import numpy as np
+
+from utils.calcular_distancia import OraculoDistancia
+from utils.indice_espacial import candidatos_como_listas, obtener_candidatos
+from utils.tour import Tour
+from utils.two_level_list import TwoLevelList
+
+# Tolerancia para considerar que un movimiento mejora la ruta
+EPSILON = 1e-10
+
+# Cantidad de vecinos por ciudad usados cuando no se dan candidatos
+K_CANDIDATOS = 10
+
+# Profundidad máxima de las cadenas de Lin-Kernighan y cantidad de
+# alternativas probadas en su primer nivel
+LK_MAX_DEPTH = 30
+LK_BREADTH = 5
+
+# Cantidad de ciudades a partir de la cual las rutas se representan con la
+# lista de dos niveles (inversiones O(sqrt(n))) en lugar de un arreglo (O(n))
+UMBRAL_DOS_NIVELES = 2000
+
+
+def distance_function(distance_matrix):
+    """
+    Devuelve una función d(i, j) rápida para la estructura de distancias dada.
+
+    Con un np.ndarray (o np.memmap) contiguo se indexa una vista plana de la
+    matriz sin copiarla, lo que evita crear escalares de NumPy en cada acceso.
+    La vista conserva el tipo de la matriz (float32 en la cache de
+    distancias): cada acceso ya devuelve un float de Python, por lo que
+    convertir la matriz completa a float64 solo costaría una copia n x n.
+    """
+    if isinstance(distance_matrix, OraculoDistancia):
+        return distance_matrix.d
+    if isinstance(distance_matrix, np.ndarray):
+        n = len(distance_matrix)
+        matriz = np.ascontiguousarray(distance_matrix)
+        if matriz.dtype.char not in "fdbBhHiIlLqQ":
+            # Tipos que memoryview no sabe leer (p. ej. float16)
+            matriz = matriz.astype(np.float64)
+        plana = memoryview(matriz.reshape(-1))
+        return lambda i, j: plana[i * n + j]
+    return lambda i, j: distance_matrix[i][j]
+
+
+def make_2opt_move(tour, a, b, c, d):
+    """
+    Elimina las aristas (a, b) y (c, d) y agrega (a, c) y (b, d).
+
+    b y d deben ser ambos sucesores (o ambos predecesores) de a y c.
+    Los movimientos Or-opt y 3-opt se aplican como secuencias de estos
+    movimientos, por lo que solo dependen de poder invertir caminos.
+    """
+    if b == c or a == d:
+        # Las aristas agregadas son las mismas que se eliminan
+        return
+    if tour.next(a) == b:
+        tour.reverse_path(b, c)
+    else:
+        tour.reverse_path(a, d)
+
+
+def prepare(distance_matrix, tour, candidates=None, k=K_CANDIDATOS, representation=None):
+    """
+    Prepara las estructuras comunes de los motores de búsqueda local.
+
+    Si tour es un Tour (ver utils/tour.py) o una TwoLevelList (ver
+    utils/two_level_list.py) los movimientos se aplican directamente sobre
+    él; si es una lista, sobre una estructura nueva: la indicada por
+    representation ("array" o "two_level") o, por defecto, la lista de dos
+    niveles a partir de UMBRAL_DOS_NIVELES ciudades.
+
+    Returns:
+    ------
+    tuple: (d, candidatos, estructura, cerrada, inicio) donde d es la función
+           de distancia, candidatos las listas de vecinos de cada ciudad,
+           estructura la ruta como Tour o TwoLevelList, cerrada indica si la ruta original
+           repetía la ciudad inicial al final e inicio es esa ciudad (None
+           si la ruta original es un Tour).
+    """
+    if candidates is None:
+        candidates = obtener_candidatos(distance_matrix, k)
+    candidates = candidatos_como_listas(candidates)
+    d = distance_function(distance_matrix)
+
+    if isinstance(tour, (Tour, TwoLevelList)):
+        return d, candidates, tour, False, None
+    closed = len(tour) > 1 and tour[0] == tour[-1]
+    if representation is None:
+        representation = "two_level" if len(tour) >= UMBRAL_DOS_NIVELES else "array"
+    if representation == "two_level":
+        structure = TwoLevelList(tour, len(distance_matrix))
+    elif representation == "array":
+        structure = Tour(tour, len(distance_matrix))
+    else:
+        raise ValueError(f"Representación no válida: {representation}")
+    return d, candidates, structure, closed, tour[0]
+
+
+def finish(d, structure, closed, start):
+    """
+    Devuelve (distancia, ruta) a partir de la estructura. Si la ruta original
+    era un Tour se devuelve ese mismo Tour; si era una lista, una lista que
+    comienza en la misma ciudad que la original, cerrada si lo era.
+    """
+    if start is None:
+        order = structure.tolist()
+        return sum(d(order[i - 1], order[i]) for i in range(len(order))), structure
+    tour = structure.sequence(start)
+    distance = sum(d(tour[i - 1], tour[i]) for i in range(len(tour)))
+    if closed:
+        tour.append(start)
+    return distance, tour
+
+
+def run_queue(structure, improve_city, dont_look_bits=True):
+    """
+    Ciclo común con bits de "no mirar".
+
+    Se procesan las ciudades activas de una cola; improve_city(a) intenta
+    mejorar la ruta alrededor de a y devuelve las ciudades afectadas por el
+    movimiento aplicado (o None). Las ciudades afectadas se reactivan. Sin
+    bits de "no mirar", todas las ciudades se reactivan tras cada pasada
+    con alguna mejora.
+    """
+    n = len(structure)
+    queue = deque(structure.tolist())
+    active = [True] * n
+    improved_pass = False
+
+    while queue:
+        a = queue.popleft()
+        active[a] = False
+        touched = improve_city(a)
+        if touched is not None:
+            improved_pass = True
+            for c in touched:
+                if not active[c]:
+                    active[c] = True
+                    queue.append(c)
+
+        if not queue and not dont_look_bits and improved_pass:
+            improved_pass = False
+            queue.extend(structure.tolist())
+            active = [True] * n
+
+
+def two_opt_move(structure, d, candidates, a, first):
+    # Intercambio 2-opt: elimina (a, b) y (c, e) y agrega (a, c) y (b, e)
+    best, best_delta = None, -EPSILON
+    for successor in (True, False):
+        b = structure.next(a) if successor else structure.prev(a)
+        d_ab = d(a, b)
+        for c in candidates[a]:
+            d_ac = d(a, c)
+            if d_ac >= d_ab:
+                break
+            e = structure.next(c) if successor else structure.prev(c)
+            if c == b or e == a:
+                continue
+            delta = d_ac + d(b, e) - d_ab - d(c, e)
+            if delta < best_delta:
+                best, best_delta = [(a, b, c, e)], delta
+                if first:
+                    return best_delta, best
+    return (best_delta, best) if best is not None else None
+
+
+def or_opt_move(structure, d, candidates, a, first, max_segment=3):
+    # Reubica el segmento s1..sL (s1 = a, L <= max_segment) entre dos ciudades
+    # vecinas c y e, con o sin invertirlo. Con p y q los vecinos del segmento,
+    # se eliminan (p, s1), (sL, q) y (c, e) y se agregan (p, q) y
+    # (c, s1), (sL, e) o bien (c, sL), (s1, e) si el segmento se invierte.
+    if len(structure) < max_segment + 5:
+        return None
+    best, best_delta = None, -EPSILON
+    for successor in (True, False):
+        succ = structure.next if successor else structure.prev
+        pred = structure.prev if successor else structure.next
+        p = pred(a)
+        segment = [a]
+        s_last = a
+        for length in range(1, max_segment + 1):
+            if length > 1:
+                s_last = succ(s_last)
+                segment.append(s_last)
+            q = succ(s_last)
+            removal_gain = d(p, a) + d(s_last, q) - d(p, q)
+            if removal_gain <= EPSILON:
+                continue
+            for x in candidates[a]:
+                d_ax = d(a, x)
+                if d_ax >= removal_gain:
+                    break
+                if x in segment or x == p:
+                    continue
+
+                # Sin invertir: c = x, e = succ(x)
+                e = succ(x)
+                if e != p:
+                    delta = d_ax + d(s_last, e) - d(x, e) - removal_gain
+                    if delta < best_delta:
+                        best_delta = delta
+                        best = [(p, a, x, e), (p, x, q, s_last), (x, s_last, a, e)]
+                        if first:
+                            return best_delta, best
+
+                # Invertido: c = pred(x), e = x
+                c = pred(x)
+                if x != q:
+                    delta = d_ax + d(c, s_last) - d(c, x) - removal_gain
+                    if delta < best_delta:
+                        best_delta = delta
+                        best = [(p, a, c, x), (p, c, q, s_last)]
+                        if first:
+                            return best_delta, best
+    return (best_delta, best) if best is not None else None
+
+
+def or3opt_move(structure, d, candidates, a, first):
+    # 3-opt restringido al movimiento sin inversiones ("or3opt"): con
+    # t2 = succ(t1), t4 = succ(t3) y t6 = succ(t5), la ruta t1 [t2..t3] [t4..t5] t6
+    # pasa a ser t1 [t4..t5] [t2..t3] t6. Las aristas agregadas (t1, t4) y
+    # (t2, t5) se buscan en las listas de candidatos.
+    best, best_delta = None, -EPSILON
+    t1 = a
+    for successor in (True, False):
+        succ = structure.next if successor else structure.prev
+        pred = structure.prev if successor else structure.next
+        t2 = succ(t1)
+        d12 = d(t1, t2)
+        for t4 in candidates[t1]:
+            g1 = d12 - d(t1, t4)
+            if g1 <= EPSILON:
+                break
+            if t4 == t2:
+                continue
+            t3 = pred(t4)
+            g1 += d(t3, t4)
+            for t5 in candidates[t2]:
+                g2 = g1 - d(t2, t5)
+                if g2 <= EPSILON:
+                    break
+                # t5 debe estar en el camino t4 -> t1, sin ser t1
+                if t5 == t1:
+                    continue
+                if not (structure.between(t4, t5, t1) if successor else structure.between(t1, t5, t4)):
+                    continue
+                t6 = succ(t5)
+                if t6 == t1:
+                    continue
+                delta = d(t3, t6) - d(t5, t6) - g2
+                if delta < best_delta:
+                    best_delta = delta
+                    best = [(t1, t2, t5, t6), (t1, t5, t4, t3), (t5, t3, t2, t6)]
+                    if first:
+                        return best_delta, best
+    return (best_delta, best) if best is not None else None
+
+
+def _lk_next(structure, d, candidates, t1, t2, gain, removed, added):
+    # Elige el siguiente t3 de una cadena de Lin-Kernighan entre los candidatos
+    # de t2 que cumplen el criterio de ganancia, maximizando d(t3, t4) - d(t2, t3).
+    # Devuelve las alternativas ordenadas de mejor a peor.
+    successor = structure.next(t1) == t2
+    succ = structure.next if successor else structure.prev
+    pred = structure.prev if successor else structure.next
+    t2_succ = succ(t2)
+    options = []
+    for t3 in candidates[t2]:
+        d23 = d(t2, t3)
+        if d23 >= gain:
+            break
+        if t3 == t1 or t3 == t2_succ:
+            continue
+        t4 = pred(t3)
+        if (min(t2, t3), max(t2, t3)) in removed or (min(t3, t4), max(t3, t4)) in added:
+            continue
+        options.append((d(t3, t4) - d23, t3, t4))
+    options.sort(reverse=True)
+    return options
+
+
+def _lk_chain(structure, d, candidates, t1, t2, t3, t4, max_depth):
+    # Aplica de forma tentativa una cadena de movimientos 2-opt que empieza
+    # eliminando (t1, t2); en cada nivel se elimina (t3, t4), se agrega (t2, t3)
+    # y la ruta queda cerrada con (t4, t1), que el siguiente nivel vuelve a
+    # eliminar. Al terminar se deshace la cadena y se devuelve la mayor
+    # ganancia encontrada junto con los movimientos que la producen.
+    removed = {(min(t1, t2), max(t1, t2))}
+    added = set()
+    applied = []
+    gain = d(t1, t2)
+    best_gain, best_depth = EPSILON, 0
+
+    while True:
+        gain += d(t3, t4) - d(t2, t3)
+        move = (t2, t1, t3, t4)
+        make_2opt_move(structure, *move)
+        applied.append(move)
+        added.add((min(t2, t3), max(t2, t3)))
+        removed.add((min(t3, t4), max(t3, t4)))
+
+        closed_gain = gain - d(t4, t1)
+        if closed_gain > best_gain:
+            best_gain, best_depth = closed_gain, len(applied)
+        if len(applied) >= max_depth:
+            break
+
+        t2 = t4
+        options = _lk_next(structure, d, candidates, t1, t2, gain, removed, added)
+        if not options:
+            break
+        _, t3, t4 = options[0]
+
+    # Deshace la cadena: cada movimiento se revierte con el 2-opt inverso
+    for t2, t1_, t3, t4 in reversed(applied):
+        make_2opt_move(structure, t1_, t4, t2, t3)
+    return best_gain, applied[:best_depth]
+
+
+def lin_kernighan_move(structure, d, candidates, a, first, max_depth=LK_MAX_DEPTH, breadth=LK_BREADTH):
+    # Movimiento de profundidad variable al estilo Lin-Kernighan, construido
+    # como una cadena de movimientos 2-opt secuenciales desde t1 = a. Solo el
+    # primer nivel prueba varias alternativas (breadth); los siguientes
+    # siguen la mejor según d(t3, t4) - d(t2, t3).
+    if len(structure) < 8:
+        return None
+    best, best_delta = None, -EPSILON
+    t1 = a
+    for t2 in (structure.next(t1), structure.prev(t1)):
+        options = _lk_next(structure, d, candidates, t1, t2, d(t1, t2), set(), set())
+        for _, t3, t4 in options[:breadth]:
+            gain, moves = _lk_chain(structure, d, candidates, t1, t2, t3, t4, max_depth)
+            if moves and -gain < best_delta:
+                best, best_delta = moves, -gain
+                if first:
+                    return best_delta, best
+    return (best_delta, best) if best is not None else None
+
+
+# Vecindarios disponibles para la búsqueda local. Cada movimiento se busca
+# en el orden dado, y se aplica como una secuencia de movimientos 2-opt.
+NEIGHBOURHOODS = {
+    "2opt": (two_opt_move,),
+    "or_opt": (or_opt_move,),
+    "2opt+or_opt": (two_opt_move, or_opt_move),
+    "3opt": (two_opt_move, or_opt_move, or3opt_move),
+    # Las cadenas de 2-opt secuenciales no alcanzan los movimientos Or-opt,
+    # que en el Lin-Kernighan clásico salen de la alternativa t4 = succ(t3)
+    "lk": (or_opt_move, lin_kernighan_move),
+}
+
+
+def local_search(distance_matrix, tour, neighbourhood="2opt", candidates=None, k=K_CANDIDATOS, strategy="first", dont_look_bits=True, callback=None, representation=None):
+    """
+    Búsqueda local con evaluación delta O(1), listas de vecinos y bits de "no mirar".
+
+    Para cada ciudad activa a se evalúan los movimientos del vecindario que
+    agregan una arista entre a (o su vecina en la ruta) y uno de sus
+    candidatos. Como los candidatos están ordenados por distancia, la
+    búsqueda se corta en cuanto la ganancia parcial deja de ser positiva.
+
+    Parámetros:
+    ----------
+
+    distance_matrix ([[int/float]] / np.ndarray / OraculoDistancia): Distancias entre nodos.
+    tour (list / Tour / TwoLevelList): Ruta inicial, abierta o cerrada (con el
+                        nodo inicial al final). Un Tour o una TwoLevelList
+                        se mejora en el lugar.
+    neighbourhood (str): Vecindario a usar (ver NEIGHBOURHOODS): "2opt", "or_opt"
+                         (segmentos de 1 a 3 ciudades, con y sin inversión),
+                         "2opt+or_opt", "3opt" (los anteriores más el 3-opt
+                         restringido sin inversiones) o "lk" (cadenas de
+                         Lin-Kernighan). También se acepta una tupla de
+                         funciones de búsqueda de movimientos.
+    candidates (np.ndarray / lista de listas, opcional): Listas de candidatos de
+                cada nodo ordenadas por distancia. Por defecto los k más cercanos.
+    k (int): Cantidad de candidatos por nodo si no se dan candidates.
+    strategy (str): "first" aplica el primer movimiento que mejora para cada
+                    ciudad, "best" evalúa todos los de la ciudad y aplica el mejor.
+    dont_look_bits (bool): Si es True, solo se reevalúan las ciudades tocadas
+                           por los últimos movimientos.
+    callback (function, opcional): Se llama con la ruta actual (lista) tras cada mejora.
+    representation (str, opcional): Estructura usada para una ruta dada como
+                                    lista: "array" (Tour) o "two_level"
+                                    (TwoLevelList). Por defecto se elige
+                                    según la cantidad de ciudades.
+
+    Return:
+    ------
+
+    tuple: Una tupla que contiene:
+           - distance (float): La distancia total de la ruta mejorada.
+           - tour (list / Tour): La ruta mejorada, que empieza en la misma
+             ciudad que la original y está cerrada si la original lo estaba
+             (o la misma estructura recibida).
+
+    Complejidad de tiempo:
+    O(k) por ciudad evaluada (O(k^2) con "3opt") más O(n) por movimiento aplicado.
+    """
+    if strategy not in ("first", "best"):
+        raise ValueError("Estrategia no válida")
+    if isinstance(neighbourhood, str):
+        if neighbourhood not in NEIGHBOURHOODS:
+            raise ValueError(f"Vecindario no válido: {neighbourhood}")
+        moves = NEIGHBOURHOODS[neighbourhood]
+    else:
+        moves = tuple(neighbourhood)
+    first = strategy == "first"
+    d, candidates, structure, closed, start = prepare(distance_matrix, tour, candidates, k, representation)
+    if len(structure) < 4:
+        return finish(d, structure, closed, start)
+
+    def improve_city(a):
+        best = None
+        for find_move in moves:
+            move = find_move(structure, d, candidates, a, first)
+            if move is not None and (best is None or move[0] < best[0]):
+                best = move
+                if first:
+                    break
+
+        if best is None:
+            return None
+        touched = []
+        for two_opt_move in best[1]:
+            make_2opt_move(structure, *two_opt_move)
+            touched.extend(two_opt_move)
+        if callback is not None:
+            callback(structure.tolist() if start is None else structure.sequence(start))
+        return touched
+
+    run_queue(structure, improve_city, dont_look_bits)
+    return finish(d, structure, closed, start)
+
+
+def two_opt(distance_matrix, tour, candidates=None, k=K_CANDIDATOS, strategy="first", dont_look_bits=True, callback=None):
+    """
+    Búsqueda local 2-opt (ver local_search).
+    """
+    return local_search(distance_matrix, tour, "2opt", candidates, k, strategy, dont_look_bits, callback)
+
+
+def or_opt(distance_matrix, tour, candidates=None, k=K_CANDIDATOS, strategy="first", dont_look_bits=True, callback=None):
+    """
+    Búsqueda local Or-opt (ver local_search).
+    """
+    return local_search(distance_matrix, tour, "or_opt", candidates, k, strategy, dont_look_bits, callback)
+
+
+def three_opt(distance_matrix, tour, candidates=None, k=K_CANDIDATOS, strategy="first", dont_look_bits=True, callback=None):
+    """
+    Búsqueda local 2-opt + Or-opt + 3-opt restringido (ver local_search).
+    """
+    return local_search(distance_matrix, tour, "3opt", candidates, k, strategy, dont_look_bits, callback)
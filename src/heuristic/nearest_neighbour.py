@@ -1,7 +1,8 @@
 from utils.graficar import graficar_ciudades, graficar_recorrido
+from utils.indice_espacial import candidatos_como_listas
 
 
-def nearest_neighbour(matriz_distancia, ciudades, show_iterations = False, current_city = "", nodo_inicial=0):
+def nearest_neighbour(matriz_distancia, ciudades, show_iterations = False, current_city = "", nodo_inicial=0, candidatos=None):
     """
     Método exacto para la resolución del problema del agente viajero (TSP).
 
@@ -22,6 +23,10 @@ def nearest_neighbour(matriz_distancia, ciudades, show_iterations = False, curre
     la ruta. Por defecto es 0.
     guardar (bool, opcional): Si es True, genera una imagen por iteración
     mostrando cómo se van agregando los nodos a la ruta. Por defecto es False.
+    candidatos (np.ndarray / lista de listas, opcional): Listas de candidatos
+    de cada nodo ordenadas por distancia (ver utils/indice_espacial.py). Si se
+    dan, el siguiente nodo es el primer candidato no visitado y solo se
+    revisan todos los nodos cuando no queda ninguno.
 
     Return:
     ------
@@ -31,9 +36,11 @@ def nearest_neighbour(matriz_distancia, ciudades, show_iterations = False, curre
            - ruta (list): La ruta (lista de nodos) encontrada.
 
     Complejidad de tiempo: 
-    O(n^2) donde n es la cantidad de nodos.
+    O(n^2) donde n es la cantidad de nodos, O(n * k) en promedio con
+    listas de k candidatos.
     """
 
+    candidatos = candidatos_como_listas(candidatos)
     cantidad_nodos = len(matriz_distancia)
     # Inicializa la ruta con el nodo inicial.
     ruta = [nodo_inicial]
@@ -43,13 +50,22 @@ def nearest_neighbour(matriz_distancia, ciudades, show_iterations = False, curre
     iter = 0
     # Se visitan todos los nodos, en cada iteración se selecciona el nodo más cercano.
     while len(visitados) < cantidad_nodos:
-        distancia_min = float("inf")
-        for i in range(cantidad_nodos):
-            # Se revisan todos los nodos aun no visitados
-            # y se obtiene el nodo que se encuentre más cerca
-            if i not in visitados and matriz_distancia[ruta[-1]][i] < distancia_min:
-                distancia_min = matriz_distancia[ruta[-1]][i]
-                sig_nodo = i
+        sig_nodo = None
+        if candidatos is not None:
+            # Los candidatos estan ordenados por distancia, el primero no
+            # visitado es el más cercano entre ellos
+            for i in candidatos[ruta[-1]]:
+                if i not in visitados:
+                    sig_nodo = i
+                    break
+        if sig_nodo is None:
+            distancia_min = float("inf")
+            for i in range(cantidad_nodos):
+                # Se revisan todos los nodos aun no visitados
+                # y se obtiene el nodo que se encuentre más cerca
+                if i not in visitados and matriz_distancia[ruta[-1]][i] < distancia_min:
+                    distancia_min = matriz_distancia[ruta[-1]][i]
+                    sig_nodo = i
         # El nodo más cercano se agrega al recorrido y se marca como visitado
         ruta.append(sig_nodo)
         visitados.add(sig_nodo)
@@ -1,15 +1,19 @@
+from itertools import count
+
 from utils.graficar import graficar_ciudades, graficar_recorrido
 from heuristic.nearest_neighbour import nearest_neighbour
+from heuristic.local_search_engine import local_search
 
 
-def two_opt_local_search(distance_matrix, city, algorithm_func, show_iterations = False, current_city = ""):
+def two_opt_local_search(distance_matrix, city, algorithm_func, show_iterations = False, current_city = "", candidates=None, strategy="first", neighbourhood="2opt"):
     """
     Búsqueda local para la resolución del problema del agente viajero (TSP).
 
     El método mejora iterativamente una solución inicial (generada por un
     algoritmo heurístico) mediante el intercambio de dos aristas a la vez
     (2-opt) si el intercambio resulta en una ruta más corta; se repite hasta
-    que no se puedan realizar más mejoras.
+    que no se puedan realizar más mejoras. La búsqueda la realiza el motor
+    común de heuristic/local_search_engine.py.
 
     Parámetros: 
     ----------
@@ -20,6 +24,15 @@ def two_opt_local_search(distance_matrix, city, algorithm_func, show_iterations
     city (list): Lista de nombres o identificadores de las ciudades o nodos.
     algorithm_func (function): Función de heurística que genera una ruta inicial
                                (por ejemplo, nearest_neighbour).
+    candidates (np.ndarray / lista de listas, opcional): Listas de candidatos
+                               de cada nodo (ver utils/indice_espacial.py). Si se
+                               dan, solo se evalúan los intercambios que agregan
+                               una arista entre un nodo y uno de sus candidatos.
+                               Por defecto se usan los 10 vecinos más cercanos.
+    strategy (str): "first" (primera mejora) o "best" (mejor mejora por ciudad).
+    neighbourhood (str): Vecindario de la búsqueda local: "2opt" (por defecto),
+                         "or_opt", "2opt+or_opt", "3opt" o "lk" (ver
+                         heuristic/local_search_engine.NEIGHBOURHOODS).
 
     Return:
     ------
@@ -29,50 +42,20 @@ def two_opt_local_search(distance_matrix, city, algorithm_func, show_iterations
            - tour (list): La ruta (lista de nodos) mejorada.
     """
 
-    n = len(distance_matrix)
-   
     distance, tour = algorithm_func(distance_matrix, city)
 
-    improved = True
-    itr = 0
-    while improved:
-
-        improved = False
-        for i in range(n):
-            for j in range(i + 1, n):
-                # Obtener los dos bordes actuales de la ruta
-                cur1 = (tour[i], tour[(i + 1) % n])
-                cur2 = (tour[j], tour[(j + 1) % n])
-                cur_length = (
-                    distance_matrix[tour[i]][tour[(i + 1) % n]]
-                    + distance_matrix[tour[j]][tour[(j + 1) % n]]
-                )
-
-                # Obtener los dos 'nuevos' bordes para la ruta
-                new1 = (tour[i], tour[j])
-                new2 = (tour[(i + 1) % n], tour[(j + 1) % n])
-                new_length = (
-                    distance_matrix[tour[i]][tour[j]]
-                    + distance_matrix[tour[(i + 1) % n]][tour[(j + 1) % n]]
-                )
-
-                # Actualizar la ruta, si se mejora
-                if new_length < cur_length:
-                    # print(f"Intercambiando bordes {cur1} y {cur2} por {new1} y {new2}")
-                    tour[i + 1 : j + 1] = tour[i + 1 : j + 1][::-1]
-                    improved = True
-
-                    # Dibujar la nueva ruta
-                    if show_iterations:
-                        graficar_recorrido(
-                            tour, 
-                            city, 
-                            f"two_opt_{algorithm_func.__name__}/{current_city}" , 
-                            f"{current_city}_two_opt_{algorithm_func.__name__}_iter_{itr}", 
-                            False
-                        )
-                itr += 1
-    # Calcular la distancia total de la ruta
-    distancia_total = sum(distance_matrix[tour[i]][tour[i + 1]] for i in range(n))
-
-    return distancia_total, tour
+    callback = None
+    if show_iterations:
+        itr = count()
+
+        def callback(current_tour):
+            # Dibujar la nueva ruta
+            graficar_recorrido(
+                current_tour + [current_tour[0]],
+                city,
+                f"two_opt_{algorithm_func.__name__}/{current_city}",
+                f"{current_city}_two_opt_{algorithm_func.__name__}_iter_{next(itr)}",
+                False
+            )
+
+    return local_search(distance_matrix, tour, neighbourhood, candidates, strategy=strategy, callback=callback)
@@ -1,7 +1,13 @@
 import numpy as np
 import random
+from concurrent.futures import ProcessPoolExecutor
 
-def ant_colony_optimization(distance_matrix, n_ants, n_iterations, alpha, beta, rho, Q):
+from utils.indice_espacial import obtener_candidatos, candidatos_como_listas
+from utils.calcular_distancia import OraculoDistancia, matriz_distancias
+from utils.memoria_compartida import ArreglosCompartidos, conectar
+from heuristic.local_search_engine import local_search
+
+def ant_colony_optimization(distance_matrix, n_ants, n_iterations, alpha, beta, rho, Q, construction="numpy", seed=None, n_workers=None, neighbourhood=None):
     """
     Implementación del algoritmo de Optimización de Colonia de Hormigas para el TSP.
     
@@ -13,6 +19,23 @@ def ant_colony_optimization(distance_matrix, n_ants, n_iterations, alpha, beta,
     - beta: importancia de la información heurística
     - rho: tasa de evaporación de feromonas
     - Q: constante para la actualización de feromonas
+    - construction: "numpy" construye los caminos de todas las hormigas a la vez
+      (ver construct_solutions); "python" los construye uno por uno con
+      construct_solution
+    - seed: semilla del generador aleatorio (solo con construction="numpy").
+      Con None se toma del módulo random, por lo que random.seed hace
+      reproducibles ambas construcciones como antes de que "numpy" fuera
+      la construcción por defecto
+    - n_workers: cantidad de procesos entre los que se reparten las hormigas
+      (ver ParallelAnts). Con None o 1 se construyen en este proceso. Los
+      resultados son reproducibles para la misma semilla y cantidad de procesos
+    - neighbourhood: vecindario de la búsqueda local aplicada a cada hormiga
+      (ver heuristic/local_search_engine.py). Por defecto no se aplica
+
+    Con construction="numpy" y un OraculoDistancia en lugar de la matriz, la
+    matriz completa se construye una vez con matriz_distancias: la feromona y
+    la matriz de decision ya ocupan memoria O(n^2). Para no usar memoria
+    O(n^2) se debe usar max_min_ant_system con pheromone_storage="candidates"
     
     Retorna:
     - best_path: mejor camino encontrado
@@ -23,23 +46,148 @@ def ant_colony_optimization(distance_matrix, n_ants, n_iterations, alpha, beta,
     best_path = None
     best_cost = float('inf')
 
-    for iteration in range(n_iterations):
-        paths = []
-        costs = []
+    parallel = None
+    if construction == "numpy":
+        if isinstance(distance_matrix, OraculoDistancia):
+            # Por bloques desde las coordenadas; np.asarray recorreria el
+            # oraculo fila por fila
+            coords = np.column_stack((distance_matrix.x, distance_matrix.y))
+            distances = matriz_distancias(coords, euc_2d=distance_matrix.euc_2d)
+        else:
+            distances = np.asarray(distance_matrix, dtype=np.float64)
+        heuristic = heuristic_matrix(distances, beta)
+        if seed is None:
+            seed = random.getrandbits(64)
+        rng = np.random.default_rng(seed)
+        choice = np.empty_like(distances)
+        if n_workers is not None and n_workers > 1:
+            # La feromona y la matriz de decision viven en memoria compartida:
+            # los procesos leen los valores que se escriben en cada iteracion
+            shared = {"distances": distances, "choice": choice, "pheromone": pheromone}
+            if neighbourhood is not None:
+                shared["search_candidates"] = obtener_candidatos(distance_matrix)
+            parallel = ParallelAnts(n_workers, seed, **shared)
+            choice = parallel.arrays["choice"]
+            pheromone = parallel.arrays["pheromone"]
+    elif construction != "python":
+        raise ValueError("Construction method not valid")
 
-        for ant in range(n_ants):
-            path = construct_solution(distance_matrix, pheromone, alpha, beta)
-            cost = calculate_path_cost(distance_matrix, path)
-            paths.append(path)
-            costs.append(cost)
+    try:
+        for iteration in range(n_iterations):
+            if construction == "numpy":
+                # Matriz de decision tau^alpha * eta^beta, una vez por iteracion
+                np.power(pheromone, alpha, out=choice)
+                choice *= heuristic
+                if parallel is not None:
+                    path_array, cost_array = parallel.construct(iteration, n_ants, neighbourhood=neighbourhood)
+                else:
+                    path_array = construct_solutions(choice, n_ants, rng)
+                    path_array, cost_array = improve_paths(distances, path_array, neighbourhood)
+                paths = path_array.tolist()
+                costs = cost_array.tolist()
+            else:
+                paths = []
+                costs = []
+                for ant in range(n_ants):
+                    path = construct_solution(distance_matrix, pheromone, alpha, beta)
+                    paths.append(path)
+                    costs.append(calculate_path_cost(distance_matrix, path))
 
-            if cost < best_cost:
-                best_cost = cost
-                best_path = path
+            for path, cost in zip(paths, costs):
+                if cost < best_cost:
+                    best_cost = cost
+                    best_path = path
 
-        pheromone = update_pheromone(pheromone, paths, costs, rho, Q)
+            pheromone = update_pheromone(pheromone, paths, costs, rho, Q)
+    finally:
+        if parallel is not None:
+            # Se sueltan las vistas de la memoria compartida antes de liberarla
+            pheromone = choice = None
+            parallel.close()
     return best_cost, best_path
 
+def heuristic_matrix(distances, beta, diagonal=True):
+    """
+    Calcula eta^beta = (1 / d)^beta para los pares de ciudades dados. Si
+    diagonal es True (matriz (n, n) completa), deja 0 en la diagonal para que
+    una hormiga nunca se quede en la misma ciudad.
+    """
+    with np.errstate(divide="ignore"):
+        eta = 1 / distances
+    # Ciudades distintas en la misma posicion: se trata como una distancia minima
+    eta[~np.isfinite(eta)] = 1 / np.finfo(np.float64).eps
+    heuristic = eta ** beta
+    if diagonal:
+        np.fill_diagonal(heuristic, 0)
+    return heuristic
+
+def construct_solutions(choice, n_ants, rng):
+    """
+    Construye los caminos de todas las hormigas a la vez.
+
+    En cada paso todas las hormigas eligen su siguiente ciudad con un único
+    sorteo vectorizado: los pesos de la fila de su ciudad actual en la matriz
+    de decision, con las ciudades visitadas anuladas por una mascara booleana,
+    se acumulan y se busca el primer acumulado mayor a un numero aleatorio
+    entre 0 y el total.
+
+    Parámetros:
+    - choice: matriz (n, n) con tau^alpha * eta^beta
+    - n_ants: número de hormigas
+    - rng: generador aleatorio de NumPy
+
+    Retorna:
+    - paths: arreglo (n_ants, n + 1) con los caminos cerrados, que empiezan
+      y terminan en la ciudad 0 como en construct_solution
+    """
+    n_cities = len(choice)
+    ants = np.arange(n_ants)
+    paths = np.zeros((n_ants, n_cities + 1), dtype=np.int64)
+    unvisited = np.ones((n_ants, n_cities), dtype=bool)
+    unvisited[:, 0] = False
+    current = paths[:, 0]
+
+    for step in range(1, n_cities):
+        weights = choice[current] * unvisited
+        cumulative = np.cumsum(weights, axis=1)
+        total = cumulative[:, -1]
+
+        # Si todos los pesos se anulan (por ejemplo, por desbordamiento),
+        # la hormiga elige de manera uniforme entre las no visitadas
+        empty = ~(total > 0)
+        if empty.any():
+            cumulative[empty] = np.cumsum(unvisited[empty], axis=1)
+            total = cumulative[:, -1]
+
+        r = rng.random(n_ants) * total
+        current = np.argmax(cumulative > r[:, None], axis=1)
+        paths[:, step] = current
+        unvisited[ants, current] = False
+
+    return paths
+
+def improve_paths(distances, paths, neighbourhood=None, candidates=None):
+    """
+    Aplica la búsqueda local a cada camino (si neighbourhood no es None) y
+    calcula sus costos.
+
+    Parámetros:
+    - distances: matriz (n, n) de distancias
+    - paths: arreglo (n_ants, n + 1) con los caminos cerrados
+    - neighbourhood: vecindario de la búsqueda local, o None
+    - candidates: listas de candidatos de la búsqueda local
+
+    Retorna:
+    - paths: los caminos mejorados, en el mismo arreglo
+    - costs: arreglo con el costo de cada camino
+    """
+    if neighbourhood is None:
+        return paths, distances[paths[:, :-1], paths[:, 1:]].sum(axis=1)
+    costs = np.empty(len(paths))
+    for i, path in enumerate(paths.tolist()):
+        costs[i], paths[i] = local_search(distances, path, neighbourhood, candidates=candidates)
+    return paths, costs
+
 def construct_solution(distance_matrix, pheromone, alpha, beta):
     n_cities = len(distance_matrix)
     unvisited = list(range(1, n_cities))
@@ -68,15 +216,407 @@ def calculate_path_cost(distance_matrix, path):
     return sum(distance_matrix[path[i]][path[i+1]] for i in range(len(path)-1))
 
 def update_pheromone(pheromone, paths, costs, rho, Q):
-    n_cities = len(pheromone)
+    """
+    Evapora la feromona en el lugar y deposita Q / costo en las aristas de
+    cada camino, en ambos sentidos (ver deposit_pheromone).
+    """
     pheromone *= (1 - rho)
+    return deposit_pheromone(pheromone, paths, Q / np.asarray(costs, dtype=np.float64))
 
-    for path, cost in zip(paths, costs):
-        for i in range(len(path) - 1):
-            pheromone[path[i]][path[i+1]] += Q / cost
-    
+def deposit_pheromone(pheromone, paths, amounts):
+    """
+    Deposita amounts[a] en las aristas del camino a, en ambos sentidos, con
+    una sola operación para todos los caminos: las aristas de todas las
+    hormigas se apilan en dos arreglos (origen, destino) y se suman con
+    np.add.at, que acumula correctamente las aristas repetidas.
+
+    Parámetros:
+    - pheromone: matriz (n, n) de feromonas o CandidatePheromone, se modifica
+      en el lugar
+    - paths: arreglo o lista (n_caminos, n + 1) con los caminos cerrados
+    - amounts: cantidad a depositar por cada camino
+
+    Retorna:
+    - pheromone: la misma feromona recibida
+    """
+    paths = np.asarray(paths)
+    if paths.ndim == 1:
+        paths = paths[None, :]
+    source = paths[:, :-1].ravel()
+    target = paths[:, 1:].ravel()
+    amount = np.repeat(np.asarray(amounts, dtype=np.float64).reshape(-1), paths.shape[1] - 1)
+    if isinstance(pheromone, CandidatePheromone):
+        pheromone.deposit(source, target, amount)
+    else:
+        np.add.at(pheromone, (source, target), amount)
+        np.add.at(pheromone, (target, source), amount)
     return pheromone
 
+class CandidatePheromone:
+    """
+    Feromona guardada solo en las aristas candidatas, para instancias grandes.
+
+    Los valores se guardan en un arreglo (n, k) alineado con la matriz de
+    candidatos: una estructura tipo CSR con filas de largo fijo, en la que
+    values[i, j] es la feromona de la arista (i, candidates[i, j]). Así la
+    memoria es O(n·k) en lugar de O(n^2). Las demás aristas comparten un
+    único valor, outside, que se evapora y acota igual que el resto; lo que
+    se deposite sobre ellas se descarta.
+
+    Admite las operaciones de la matriz densa que usan las hormigas:
+    pheromone *= factor, pheromone.fill(valor), pheromone.clip(lo, hi) y
+    pheromone[filas], que devuelve esas filas completas (solo se usa para las
+    pocas hormigas sin candidatos disponibles).
+
+    Parámetros:
+    - candidates: matriz (n, k) de candidatos, con -1 como relleno (ver
+      utils/indice_espacial.obtener_candidatos)
+    - value: feromona inicial de todas las aristas
+    - values: arreglo (n, k) con los valores de las aristas candidatas (por
+      ejemplo, en memoria compartida). Se usa sin copiarlo y value queda solo
+      como el valor de las demás aristas
+    """
+
+    def __init__(self, candidates, value=1.0, values=None):
+        self.candidates = np.asarray(candidates)
+        self.n_cities = len(self.candidates)
+        if values is None:
+            values = np.full(self.candidates.shape, float(value))
+        self.values = values
+        self.outside = float(value)
+
+    def __imul__(self, factor):
+        self.values *= factor
+        self.outside *= factor
+        return self
+
+    def fill(self, value):
+        self.values.fill(value)
+        self.outside = float(value)
+
+    def clip(self, low, high):
+        np.clip(self.values, low, high, out=self.values)
+        self.outside = float(np.clip(self.outside, low, high))
+        return self
+
+    def __getitem__(self, rows):
+        rows = np.asarray(rows)
+        full = np.full((len(rows), self.n_cities), self.outside)
+        options = self.candidates[rows]
+        valid = options >= 0
+        full[np.nonzero(valid)[0], options[valid]] = self.values[rows][valid]
+        return full
+
+    def deposit(self, source, target, amount):
+        """
+        Suma amount a las aristas (source, target) y (target, source) que son
+        candidatas. Cada arista se busca comparando con la fila de candidatos
+        de su origen, en O(k).
+        """
+        for a, b in ((source, target), (target, source)):
+            edges, slots = np.nonzero(self.candidates[a] == b[:, None])
+            np.add.at(self.values, (a[edges], slots), amount[edges])
+
+def max_min_ant_system(distance_matrix, n_ants, n_iterations, alpha=1, beta=5, rho=0.2, k=15, p_best=0.05, global_best_every=10, neighbourhood=None, seed=None, n_workers=None, pheromone_storage="dense"):
+    """
+    MAX-MIN Ant System (Stützle y Hoos) para el TSP.
+
+    Variante de ant_colony_optimization en la que:
+    - las hormigas solo eligen entre los k candidatos más cercanos de su
+      ciudad actual; si todos están visitados, van a la ciudad no visitada con
+      mayor tau^alpha * eta^beta (ver construct_solutions_candidates).
+    - la feromona se mantiene en [tau_min, tau_max], con tau_max = 1 / (rho * C)
+      para el costo C de la mejor ruta global.
+    - solo deposita feromona la mejor hormiga de la iteración, o la mejor ruta
+      global cada global_best_every iteraciones.
+    - opcionalmente, la ruta de cada hormiga se mejora con una búsqueda local.
+
+    Parámetros:
+    - distance_matrix: matriz de distancias entre ciudades
+    - n_ants: número de hormigas
+    - n_iterations: número de iteraciones
+    - alpha: importancia de las feromonas
+    - beta: importancia de la información heurística
+    - rho: tasa de evaporación de feromonas. Con corridas largas sin búsqueda
+      local conviene un valor menor (0.02), que converge más lento
+    - k: cantidad de candidatos por ciudad
+    - p_best: probabilidad de construir la mejor ruta al converger, fija tau_min
+    - global_best_every: cada cuántas iteraciones deposita la mejor ruta global
+    - neighbourhood: vecindario de la búsqueda local aplicada a cada hormiga
+      ("2opt", "or_opt", "2opt+or_opt", "3opt" o "lk"; ver
+      heuristic/local_search_engine.py). Por defecto no se aplica
+    - seed: semilla del generador aleatorio. Con None se toma del módulo
+      random (random.seed hace reproducible el resultado)
+    - n_workers: cantidad de procesos entre los que se reparten las hormigas y
+      su búsqueda local (ver ParallelAnts). Con None o 1 se construyen en este
+      proceso
+    - pheromone_storage: "dense" guarda la feromona en una matriz (n, n);
+      "candidates" solo en las aristas candidatas (ver CandidatePheromone),
+      con memoria O(n·k). Con "candidates" y un OraculoDistancia (ver
+      utils/calcular_distancia.py) en lugar de la matriz, el algoritmo no usa
+      memoria O(n^2) (salvo con n_workers, que requiere la matriz)
+
+    Retorna:
+    - best_cost: costo del mejor camino
+    - best_path: mejor camino encontrado (cerrado)
+    """
+    parallel = None
+    use_workers = n_workers is not None and n_workers > 1
+    if isinstance(distance_matrix, OraculoDistancia):
+        # El oraculo admite los mismos indices vectorizados que la matriz; los
+        # procesos de ParallelAnts necesitan la matriz completa
+        distances = distance_matrix
+        if use_workers:
+            cities = np.arange(len(distance_matrix))
+            distances = distance_matrix[cities[:, None], cities]
+    else:
+        distances = np.asarray(distance_matrix, dtype=np.float64)
+    n_cities = len(distances)
+    if seed is None:
+        seed = random.getrandbits(64)
+    rng = np.random.default_rng(seed)
+    search_candidates = obtener_candidatos(distance_matrix, min(k, n_cities - 1))
+    valid = search_candidates >= 0
+    candidates = np.where(valid, search_candidates, 0)
+    rows = np.arange(n_cities)[:, None]
+    heuristic_candidates = heuristic_matrix(distances[rows, candidates], beta, diagonal=False)
+    heuristic_candidates[~valid] = 0
+
+    # La feromona inicial no importa (solo cuentan los valores relativos):
+    # tras la primera iteracion se reinicia en tau_max. Se modifica siempre en
+    # el lugar, para que los procesos de parallel (si los hay) la vean
+    sparse = pheromone_storage == "candidates"
+    if sparse:
+        pheromone = CandidatePheromone(search_candidates)
+    elif pheromone_storage == "dense":
+        pheromone = np.ones((n_cities, n_cities))
+    else:
+        raise ValueError("Pheromone storage not valid")
+    tau_max = tau_min = None
+    p_dec = p_best ** (1 / n_cities)
+    best_path = None
+    best_cost = float('inf')
+    choice_candidates = np.empty_like(heuristic_candidates)
+
+    if use_workers:
+        shared = {
+            "distances": distances, "candidates": candidates,
+            "choice_candidates": choice_candidates, "search_candidates": search_candidates,
+        }
+        if sparse:
+            shared["pheromone_values"] = pheromone.values
+        else:
+            shared["pheromone"] = pheromone
+        parallel = ParallelAnts(n_workers, seed, **shared)
+        if sparse:
+            pheromone = CandidatePheromone(search_candidates, pheromone.outside, parallel.arrays["pheromone_values"])
+        else:
+            pheromone = parallel.arrays["pheromone"]
+        choice_candidates = parallel.arrays["choice_candidates"]
+    try:
+        for iteration in range(n_iterations):
+            np.power(pheromone.values if sparse else pheromone[rows, candidates], alpha, out=choice_candidates)
+            choice_candidates *= heuristic_candidates
+            if parallel is not None:
+                path_array, cost_array = parallel.construct(
+                    iteration, n_ants, alpha=alpha, beta=beta, neighbourhood=neighbourhood,
+                    outside=pheromone.outside if sparse else None,
+                )
+            else:
+                starts = rng.integers(n_cities, size=n_ants)
+                path_array = construct_solutions_candidates(
+                    choice_candidates, candidates, distances, pheromone, alpha, beta, starts, rng
+                )
+                path_array, cost_array = improve_paths(distances, path_array, neighbourhood, search_candidates)
+            paths = path_array.tolist()
+            costs = cost_array.tolist()
+
+            iteration_best = int(np.argmin(costs))
+            if costs[iteration_best] < best_cost:
+                best_cost = costs[iteration_best]
+                best_path = paths[iteration_best]
+                # Limites de la feromona segun la mejor ruta global
+                tau_max = 1 / (rho * best_cost)
+                tau_min = tau_max * (1 - p_dec) / ((n_cities / 2 - 1) * p_dec)
+                if iteration == 0:
+                    pheromone.fill(tau_max)
+
+            # Deposita la mejor hormiga de la iteracion, o la mejor global
+            if (iteration + 1) % global_best_every == 0:
+                deposit_path, deposit_cost = best_path, best_cost
+            else:
+                deposit_path, deposit_cost = paths[iteration_best], costs[iteration_best]
+
+            pheromone *= (1 - rho)
+            deposit_pheromone(pheromone, deposit_path, 1 / deposit_cost)
+            if sparse:
+                pheromone.clip(tau_min, tau_max)
+            else:
+                np.clip(pheromone, tau_min, tau_max, out=pheromone)
+    finally:
+        if parallel is not None:
+            pheromone = choice_candidates = None
+            parallel.close()
+
+    return best_cost, best_path
+
+def construct_solutions_candidates(choice_candidates, candidates, distances, pheromone, alpha, beta, starts, rng):
+    """
+    Construye los caminos de todas las hormigas a la vez, restringidos a las
+    listas de candidatos.
+
+    Cada hormiga sortea su siguiente ciudad entre los candidatos no visitados
+    de su ciudad actual, con pesos tau^alpha * eta^beta. Las hormigas sin
+    candidatos disponibles van a la ciudad no visitada con mayor peso, que
+    solo en ese caso se calcula sobre toda la fila.
+
+    Parámetros:
+    - choice_candidates: matriz (n, k) con tau^alpha * eta^beta de cada candidato
+    - candidates: matriz (n, k) con los candidatos de cada ciudad
+    - distances: matriz (n, n) de distancias u OraculoDistancia
+    - pheromone: matriz (n, n) de feromonas o CandidatePheromone
+    - alpha, beta: importancia de las feromonas y de la información heurística
+    - starts: ciudad inicial de cada hormiga
+    - rng: generador aleatorio de NumPy
+
+    Retorna:
+    - paths: arreglo (n_ants, n + 1) con los caminos cerrados
+    """
+    n_cities = len(distances)
+    n_ants = len(starts)
+    ants = np.arange(n_ants)
+    paths = np.empty((n_ants, n_cities + 1), dtype=np.int64)
+    paths[:, 0] = starts
+    paths[:, -1] = starts
+    unvisited = np.ones((n_ants, n_cities), dtype=bool)
+    unvisited[ants, starts] = False
+    current = np.asarray(starts)
+
+    for step in range(1, n_cities):
+        options = candidates[current]
+        weights = choice_candidates[current] * unvisited[ants[:, None], options]
+        cumulative = np.cumsum(weights, axis=1)
+        total = cumulative[:, -1]
+
+        r = rng.random(n_ants) * total
+        chosen = options[ants, np.argmax(cumulative > r[:, None], axis=1)]
+
+        # Hormigas sin candidatos disponibles: mejor ciudad no visitada
+        fallback = ~(total > 0)
+        if fallback.any():
+            rows = current[fallback]
+            with np.errstate(divide="ignore"):
+                row_weights = pheromone[rows] ** alpha / distances[rows[:, None], np.arange(n_cities)] ** beta
+            row_weights[~np.isfinite(row_weights)] = np.finfo(np.float64).max
+            row_weights[~unvisited[fallback]] = -1
+            chosen[fallback] = np.argmax(row_weights, axis=1)
+
+        current = chosen
+        paths[:, step] = current
+        unvisited[ants, current] = False
+
+    return paths
+
+# Arreglos compartidos vistos desde cada proceso de ParallelAnts
+_worker_arrays = {}
+_worker_blocks = []
+
+def _init_worker(specs):
+    # Inicializador de los procesos: se conecta una sola vez a la memoria
+    # compartida en lugar de recibir las matrices con cada tarea
+    arrays, blocks = conectar(specs)
+    _worker_arrays.update(arrays)
+    _worker_blocks.extend(blocks)
+    if "search_candidates" in _worker_arrays:
+        _worker_arrays["search_lists"] = candidatos_como_listas(_worker_arrays["search_candidates"])
+
+def _construct_ants(task):
+    # Tarea de un proceso: construye (y opcionalmente mejora) los caminos de
+    # un grupo de hormigas con su propio generador aleatorio
+    n_ants, entropy, spawn_key, options = task
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=spawn_key))
+    arrays = _worker_arrays
+    distances = arrays["distances"]
+    if "choice_candidates" in arrays:
+        if "pheromone_values" in arrays:
+            pheromone = CandidatePheromone(arrays["search_candidates"], options["outside"], arrays["pheromone_values"])
+        else:
+            pheromone = arrays["pheromone"]
+        starts = rng.integers(len(distances), size=n_ants)
+        paths = construct_solutions_candidates(
+            arrays["choice_candidates"], arrays["candidates"], distances, pheromone,
+            options["alpha"], options["beta"], starts, rng,
+        )
+    else:
+        paths = construct_solutions(arrays["choice"], n_ants, rng)
+    return improve_paths(distances, paths, options.get("neighbourhood"), arrays.get("search_lists"))
+
+class ParallelAnts:
+    """
+    Reparte la construcción de los caminos de las hormigas (y su búsqueda
+    local) entre los procesos de un ProcessPoolExecutor.
+
+    Los arreglos (distancias, feromona, matriz de decisión, candidatos) se
+    copian una vez a memoria compartida (ver utils/memoria_compartida.py), a
+    la que cada proceso se conecta al iniciar; en cada iteración el algoritmo escribe la
+    feromona y la matriz de decisión en el lugar (arrays[nombre]) y las
+    tareas solo llevan la cantidad de hormigas y la semilla.
+
+    Cada grupo de hormigas usa un generador con SeedSequence(entropy,
+    spawn_key=(iteracion, grupo)): los caminos no dependen de qué proceso
+    ejecute cada tarea ni del orden en que terminen, solo de la semilla y de
+    la cantidad de procesos (que fija cómo se agrupan las hormigas).
+
+    Parámetros:
+    - n_workers: cantidad de procesos
+    - seed: semilla; con None se toma una entropía aleatoria
+    - arrays: arreglos a compartir, por nombre. construct usa "distances" y
+      "choice" (Ant System) o "choice_candidates", "candidates" y
+      "pheromone" o "pheromone_values" (MAX-MIN, ver CandidatePheromone);
+      "search_candidates" son las listas de candidatos originales
+    """
+
+    def __init__(self, n_workers, seed=None, **arrays):
+        self.n_workers = n_workers
+        self.entropy = np.random.SeedSequence(seed).entropy
+        self.shared = ArreglosCompartidos(**arrays)
+        self.arrays = self.shared.arrays
+        try:
+            self.executor = ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(self.shared.specs,))
+        except BaseException:
+            self.shared.close()
+            raise
+
+    def construct(self, iteration, n_ants, **options):
+        """
+        Construye los caminos de n_ants hormigas, repartidas en n_workers
+        grupos. options (alpha, beta, neighbourhood y outside, la feromona de
+        las aristas no candidatas) se pasa a cada tarea.
+
+        Retorna:
+        - paths: arreglo (n_ants, n + 1) con los caminos cerrados
+        - costs: arreglo con el costo de cada camino
+        """
+        sizes = [len(group) for group in np.array_split(np.arange(n_ants), self.n_workers)]
+        tasks = [
+            (size, self.entropy, (iteration, group), options)
+            for group, size in enumerate(sizes) if size > 0
+        ]
+        results = list(self.executor.map(_construct_ants, tasks))
+        paths = np.concatenate([paths for paths, _ in results])
+        costs = np.concatenate([costs for _, costs in results])
+        return paths, costs
+
+    def close(self):
+        self.executor.shutdown()
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 # Ejemplo de uso
 # distance_matrix = ... # Tu matriz de distancias
 # best_path, best_cost = ant_colony_optimization(distance_matrix, n_ants=10, n_iterations=100, alpha=1, beta=2, rho=0.5, Q=100)
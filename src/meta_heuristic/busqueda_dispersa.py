@@ -4,10 +4,12 @@ from iteration_utilities import random_permutation
 
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..')) 
-from utils.calcular_distancia import calcular_distancia, calculate_total_distance
+from utils.calcular_distancia import calculate_total_distance, population_lengths, OraculoDistancia
+from utils.cache_distancias import cargar_matriz_distancias
 from utils.leer_archivo import obtener_ciudades
 from utils.graficar import plot_path
 from utils.operadores import *
+from heuristic.local_search_engine import local_search
 
 def initial_population(cities_list, tam_conjunto):
     """
@@ -38,134 +40,254 @@ def distancia_hamming(solucion1, solucion2):
     """
     Calcula la distancia de Hamming entre dos puntos de referencia.
 
+    Si solucion2 es un arreglo (m, n) de soluciones, calcula la distancia de
+    solucion1 a cada una en una sola operación vectorizada.
+
     Parámetros:
     ----------
     solucion1 (lista de ints): solucion representada con un arreglo.
-    solucion2 (lista de ints): solucion representada con un arreglo.
+    solucion2 (lista de ints / np.ndarray (m, n)): solucion (o soluciones) representada con un arreglo.
 
     Returns:
     ------
-    distancia (int): La distancia de Hamming entre los dos puntos de referencia.
+    distancia (int / np.ndarray de ints): La distancia de Hamming entre los puntos de referencia.
     """
-    
-    distancia = 0
-    for i in range(len(solucion1)):
-        if solucion1[i] != solucion2[i]:
-            distancia += 1
-    return distancia
+    distancias = (np.asarray(solucion2) != np.asarray(solucion1)).sum(axis=-1)
+    return distancias if distancias.ndim else int(distancias)
+
+# Constante para mezclar los bits de las claves de las aristas (2^64 / razon aurea)
+MEZCLA_HUELLA = np.uint64(0x9E3779B97F4A7C15)
 
-def seleccionar_mejores_soluciones(distancias, conjunto_referencia, tam_conjunto):
+def huellas_aristas(soluciones):
     """
-    Selecciona las mejores soluciones de una población para mantener la diversidad.
+    Huellas del conjunto de aristas de cada solución.
+
+    Para cada solución se calculan el sucesor y el predecesor de cada ciudad
+    y una huella de 64 bits: la suma (módulo 2^64) de un hash de cada arista
+    no dirigida. Las rotaciones e inversiones de una ruta tienen el mismo
+    conjunto de aristas y, por lo tanto, la misma huella, por lo que sirve
+    para descartar soluciones repetidas en O(1).
 
     Parámetros:
     ----------
-    distancias (lista de lista de floats): matriz de distancias entre las ciudades.
-    conjunto_referencia(lista de lista de ints): arreglo con las soluciones a evaluar.
-    tam_conjunto (int): cantidad de soluciones en el conjunto de referencia
+    soluciones (np.ndarray (m, n)): Soluciones, permutaciones de 0..n-1.
 
     Returns:
     ------
-    soluciones_seleccionadas (lista de lista de ints): arreglo de soluciones diversas y de mejor costo seleccionadas
+    tuple: (sucesores, predecesores, huellas), dos arreglos (m, n) de int32
+           y uno (m,) de uint64.
     """
-    # Metodo de mejora y de construccion de subconjuntos
-    soluciones_ordenadas = sorted(conjunto_referencia, key=lambda solucion: calculate_total_distance(solucion, distancias))
-
-    # Seleccionar soluciones adicionales para mantener la diversidad
-    soluciones_diversas = []
-    for solucion in soluciones_ordenadas:
-        if not soluciones_diversas:
-            soluciones_diversas.append(solucion)
-            continue
-
-        diverso = True
-        for solucion_diversa in soluciones_diversas:
-            distancia = distancia_hamming(solucion, solucion_diversa)
-            if distancia <= tam_conjunto / 3:  # Umbral de diversidad
-                diverso = False
-                break
-
-        if diverso:
-            soluciones_diversas.append(solucion)
-
+    soluciones = np.asarray(soluciones, dtype=np.int32)
+    m, n = soluciones.shape
+    filas = np.arange(m)[:, None]
+    siguientes = np.roll(soluciones, -1, axis=1)
+    sucesores = np.empty_like(soluciones)
+    predecesores = np.empty_like(soluciones)
+    sucesores[filas, soluciones] = siguientes
+    predecesores[filas, siguientes] = soluciones
+
+    claves = (np.minimum(soluciones, siguientes).astype(np.uint64) * np.uint64(n)
+              + np.maximum(soluciones, siguientes).astype(np.uint64))
+    claves *= MEZCLA_HUELLA
+    claves ^= claves >> np.uint64(29)
+    huellas = claves.sum(axis=1, dtype=np.uint64)
+    return sucesores, predecesores, huellas
+
+def distancia_aristas(sucesores_solucion, sucesores, predecesores):
+    """
+    Cantidad de aristas de una solución que no están en cada una de las
+    soluciones dadas (por sus sucesores y predecesores), en una sola
+    operación vectorizada O(m * n).
 
-    # Combinar las mejores soluciones por costo y las diversas
-    if len(soluciones_diversas) < tam_conjunto*3//4:
-        soluciones_seleccionadas = soluciones_diversas + soluciones_ordenadas[:tam_conjunto - len(soluciones_diversas) + 1]
-    else:
-        soluciones_seleccionadas = soluciones_ordenadas[:tam_conjunto//4] + soluciones_diversas[:(tam_conjunto*3//4)+1]
+    Parámetros:
+    ----------
+    sucesores_solucion (np.ndarray (n,)): Sucesor de cada ciudad en la solución.
+    sucesores, predecesores (np.ndarray (m, n)): Sucesores y predecesores de las soluciones.
 
-    return soluciones_seleccionadas
+    Returns:
+    ------
+    distancias (np.ndarray de ints): n menos la cantidad de aristas compartidas.
+    """
+    compartidas = (sucesores == sucesores_solucion) | (predecesores == sucesores_solucion)
+    return sucesores.shape[1] - compartidas.sum(axis=1)
 
-def path_relinking(distance_matrix, solucion_inicial, solucion_guia, conjunto_referencia):
+def seleccionar_mejores_soluciones(distancias, conjunto_referencia, tam_conjunto, costos=None, diversidad="hamming"):
     """
-    Realiza el re-enlazado de caminos desde la solucion inicial hasta la solucion guia.
+    Selecciona las mejores soluciones de una población para mantener la diversidad.
+
+    Las soluciones repetidas (la misma ruta, aunque esté rotada o invertida)
+    se descartan con sus huellas de aristas. Luego se recorren las soluciones
+    de menor a mayor costo y se marca como diversa cada una cuya distancia
+    a todas las diversas anteriores supera el umbral; la distancia mínima de
+    cada solución a las diversas se actualiza con una sola operación
+    vectorizada por cada solución diversa agregada.
 
     Parámetros:
     ----------
-        distance_matrix (lista de listas de floats): Matriz de distancias entre ciudades.
-        solucion_inicial (lista de ints): Solución inicial.
-        solucion_guia (lista de ints): Solución guía.
-        conjunto_referencia (lista de listas de ints): Conjunto de referencia.
+    distancias (lista de lista de floats): matriz de distancias entre las ciudades.
+    conjunto_referencia (np.ndarray (m, n) / lista de lista de ints): arreglo con las soluciones a evaluar.
+    tam_conjunto (int): cantidad de soluciones en el conjunto de referencia
+    costos (np.ndarray de floats, opcional): distancias ya calculadas de las soluciones.
+    diversidad (str): "hamming" (posiciones distintas) o "aristas" (aristas no compartidas).
 
     Returns:
     ------
-        mejor_solucion (lista de ints): Mejor solución encontrada por path-relinking.
+    tuple: (soluciones_seleccionadas, costos_seleccionados), un arreglo
+           (tam_conjunto, n) de int32 con las soluciones diversas y de mejor
+           costo seleccionadas, y sus distancias.
     """
-    
-    solucion_actual, mejor_solucion = solucion_inicial.copy(), solucion_inicial.copy()
-    menor_distancia = calculate_total_distance(solucion_inicial,distance_matrix)
+    conjunto_referencia = np.asarray(conjunto_referencia, dtype=np.int32)
+    if costos is None:
+        costos = population_lengths(conjunto_referencia, distancias)
+    costos = np.asarray(costos, dtype=np.float64)
 
-    while solucion_actual != solucion_guia:
-        
-        # Encuentra la mejor solución en el vecindario de la solucion
-        # Se utiliza 1-swap como vecindad
-        mejor_solucion_vecindad = obtener_mejor_solucion_vecindad(distance_matrix,
-                                                                  solucion_actual,
-                                                                  conjunto_referencia)
-        
-        # No hay mejores soluciones en la vecindad al aplicar 1-swap
-        if mejor_solucion_vecindad == solucion_actual:
-            break
-
-        # Actualiza la mejor solución y su costo si la solucion actual mejora
-        # caso contrario, se detiene el re-enlazado
-        if calculate_total_distance(mejor_solucion_vecindad,distance_matrix) < menor_distancia:
-            mejor_solucion, menor_distancia = mejor_solucion_vecindad, calculate_total_distance(mejor_solucion_vecindad,distance_matrix)
+    # Metodo de mejora y de construccion de subconjuntos
+    # Se ordenan por costo y se descartan las soluciones repetidas
+    orden = np.argsort(costos, kind="stable")
+    sucesores, predecesores, huellas = huellas_aristas(conjunto_referencia[orden])
+    _, primeras = np.unique(huellas, return_index=True)
+    unicas = np.sort(primeras)
+    orden = orden[unicas]
+    soluciones_ordenadas = conjunto_referencia[orden]
+    sucesores, predecesores = sucesores[unicas], predecesores[unicas]
+
+    # Seleccionar soluciones adicionales para mantener la diversidad
+    umbral = tam_conjunto / 3
+    distancia_minima = np.full(len(orden), np.inf)
+    diversas = []
+    for i in range(len(orden)):
+        if distancia_minima[i] <= umbral:
+            continue
+        diversas.append(i)
+        if diversidad == "hamming":
+            distancia = distancia_hamming(soluciones_ordenadas[i], soluciones_ordenadas)
+        elif diversidad == "aristas":
+            distancia = distancia_aristas(sucesores[i], sucesores, predecesores)
         else:
-            break
+            raise ValueError("Diversity measure not valid")
+        np.minimum(distancia_minima, distancia, out=distancia_minima)
 
-        # Actualiza la solución actual
-        solucion_actual = mejor_solucion_vecindad
+    # Combinar las mejores soluciones por costo y las diversas
+    if len(diversas) < tam_conjunto*3//4:
+        prioridad = diversas + list(range(len(orden)))
+    else:
+        prioridad = list(range(tam_conjunto//4)) + diversas + list(range(len(orden)))
+    seleccionadas = list(dict.fromkeys(prioridad))[:tam_conjunto]
 
-    return mejor_solucion
+    return soluciones_ordenadas[seleccionadas], costos[orden[seleccionadas]]
 
-def obtener_mejor_solucion_vecindad(distance_matrix, solucion, conjunto_referencia):
+def alinear_guia(solucion_inicial, solucion_guia):
+    """
+    Rota (y si conviene invierte) la solución guía para que empiece en la
+    misma ciudad que la inicial y coincida con ella en la mayor cantidad de
+    posiciones. Es la misma ruta, pero el camino de intercambios hacia ella
+    es más corto.
+    """
+    guia = np.asarray(solucion_guia, dtype=np.int32)
+    inicio = int(np.flatnonzero(guia == solucion_inicial[0])[0])
+    directa = np.roll(guia, -inicio)
+    invertida = np.roll(directa[::-1], 1)
+    if distancia_hamming(solucion_inicial, invertida) < distancia_hamming(solucion_inicial, directa):
+        return invertida
+    return directa
+
+def deltas_intercambio(distance_matrix, ruta, i, j):
+    """
+    Cambio en la distancia de la ruta al intercambiar las ciudades de las
+    posiciones i y j, para arreglos de pares de posiciones a la vez.
+    Considera el caso de posiciones consecutivas (en la ruta cíclica).
+    """
+    n = len(ruta)
+    a, b = ruta[i], ruta[j]
+    a_prev, a_next = ruta[i - 1], ruta[(i + 1) % n]
+    b_prev, b_next = ruta[j - 1], ruta[(j + 1) % n]
+    D = distance_matrix
+    quitadas = D[a_prev, a] + D[a, a_next] + D[b_prev, b] + D[b, b_next]
+    agregadas = D[a_prev, b] + D[b, a_next] + D[b_prev, a] + D[a, b_next]
+    deltas = agregadas - quitadas
+    # Posiciones consecutivas: la arista entre a y b se mantiene
+    j_sigue = j == (i + 1) % n
+    i_sigue = i == (j + 1) % n
+    deltas = np.where(j_sigue, D[a_prev, b] + D[a, b_next] - D[a_prev, a] - D[b, b_next], deltas)
+    deltas = np.where(i_sigue, D[b_prev, a] + D[b, a_next] - D[b_prev, b] - D[a, a_next], deltas)
+    return deltas
+
+def path_relinking(distance_matrix, solucion_inicial, solucion_guia, neighbourhood=None, candidates=None):
     """
-    Encuentra la mejor solución en la vecindad restringida de solucion utilizando 1-swap.
+    Realiza el re-enlazado de caminos desde la solucion inicial hasta la solucion guia.
+
+    En cada paso se intercambian dos ciudades de la solución actual para que
+    una posición más coincida con la guía (alineada con alinear_guia); de los
+    intercambios posibles se aplica el de menor costo, evaluado con la
+    variación de distancia (O(1) por intercambio, todos a la vez con NumPy) y
+    el arreglo de posiciones de las ciudades. La distancia de cada solución
+    intermedia se actualiza con esa variación. Al llegar a la guía se
+    reconstruye la mejor solución intermedia y, si se da neighbourhood, se le
+    aplica la búsqueda local.
 
     Parámetros:
     ----------
-        solucion (lista de ints): Solución actual.
+        distance_matrix (np.ndarray / OraculoDistancia): Distancias entre ciudades.
+        solucion_inicial (lista de ints): Solución inicial.
+        solucion_guia (lista de ints): Solución guía.
+        neighbourhood (str, opcional): Vecindario de la búsqueda local aplicada
+                                       a la mejor solución intermedia.
+        candidates (np.ndarray / lista de listas, opcional): Listas de candidatos de la búsqueda local.
 
     Returns:
     ------
-        mejor_solucion (lista de ints): Mejor solución encontrada en la vecindad.
-    """
-    mejor_solucion = solucion.copy()
-    mejor_costo = calculate_total_distance(solucion,distance_matrix)
-    # Se verifican las soluciones que se encuentran en el conjunto de referencia,
-    # que estan en la vecindad de solucion
-    for i in conjunto_referencia:
-        if distancia_hamming(solucion,i) != 2:
-            continue
-        if mejor_costo > calculate_total_distance(i,distance_matrix):
-            mejor_solucion = i
-            mejor_costo = calculate_total_distance(i,distance_matrix)
+        tuple: (distancia, mejor_solucion), la mejor solución intermedia
+               encontrada por path-relinking (lista de ints) y su distancia,
+               o (None, None) si las soluciones difieren en un solo intercambio.
 
-    return mejor_solucion
-
-def local_search_2opt(individual, distance_matrix):
+    Complejidad de tiempo:
+    O(h * h) operaciones vectorizadas, con h la distancia de Hamming entre
+    la solución inicial y la guía alineada.
+    """
+    if not isinstance(distance_matrix, (np.ndarray, OraculoDistancia)):
+        distance_matrix = np.asarray(distance_matrix, dtype=np.float64)
+    actual = np.array(solucion_inicial, dtype=np.int32)
+    guia = alinear_guia(actual, solucion_guia)
+    posiciones_ciudades = np.empty(len(actual), dtype=np.intp)
+    posiciones_ciudades[actual] = np.arange(len(actual))
+    distintas = actual != guia
+
+    distancia = float(population_lengths(actual, distance_matrix)[0])
+    mejor_distancia, mejor_paso = np.inf, 0
+    pasos = []
+    pendientes = np.flatnonzero(distintas)
+    while len(pendientes) > 0:
+        # Cada intercambio lleva a su posicion i la ciudad que tiene la guia
+        destinos = posiciones_ciudades[guia[pendientes]]
+        deltas = deltas_intercambio(distance_matrix, actual, pendientes, destinos)
+        k = int(np.argmin(deltas))
+        i, j = int(pendientes[k]), int(destinos[k])
+
+        actual[i], actual[j] = actual[j], actual[i]
+        posiciones_ciudades[actual[i]], posiciones_ciudades[actual[j]] = i, j
+        distintas[i] = False
+        distintas[j] = actual[j] != guia[j]
+        distancia += float(deltas[k])
+        pasos.append((i, j))
+        pendientes = np.flatnonzero(distintas)
+
+        # Solo cuentan las soluciones intermedias, no la guia
+        if len(pendientes) > 0 and distancia < mejor_distancia:
+            mejor_distancia, mejor_paso = distancia, len(pasos)
+
+    if mejor_paso == 0:
+        return None, None
+
+    # Se repiten los intercambios hasta la mejor solucion intermedia
+    mejor_solucion = list(solucion_inicial)
+    for i, j in pasos[:mejor_paso]:
+        mejor_solucion[i], mejor_solucion[j] = mejor_solucion[j], mejor_solucion[i]
+
+    if neighbourhood is not None:
+        return local_search(distance_matrix, mejor_solucion, neighbourhood, candidates=candidates)
+    return mejor_distancia, mejor_solucion
+
+def local_search_2opt(individual, distance_matrix, neighbourhood="2opt"):
     """
     Aplica la búsqueda local 2-opt a un individuo.
 
@@ -174,28 +296,17 @@ def local_search_2opt(individual, distance_matrix):
 
     individual (lista de ints): Individuo a ser mejorado.
     distance_matrix (lista de listas de floats): Matriz de distancias entre ciudades.
+    neighbourhood (str): Vecindario de la búsqueda local: "2opt" (por defecto),
+                         "or_opt", "2opt+or_opt", "3opt" o "lk" (Lin-Kernighan).
 
     Returns:
     ------
 
-    improved_individual (lista de ints): Individuo mejorado después de aplicar 2-opt.
+    improved_individual (lista de ints): Individuo mejorado después de aplicar 2-opt,
+                                         con la misma ciudad inicial.
     """
 
-    def two_opt_swap(route, i, k):
-        return route[:i] + route[i:k][::-1] + route[k:]
-
-    best = individual
-    improved = True
-    while improved:
-        improved = False
-        for i in range(1, len(best) - 2):
-            for k in range(i + 1, len(best)):
-                new_route = two_opt_swap(best, i, k)
-                if calculate_total_distance(
-                    new_route, distance_matrix
-                ) < calculate_total_distance(best, distance_matrix):
-                    best = new_route
-                    improved = True
+    _, best = local_search(distance_matrix, individual, neighbourhood)
     return best
 
 def run_scatter_search(cities_coords, 
@@ -208,7 +319,10 @@ def run_scatter_search(cities_coords,
                        crossover_method="triple",
                        mutation_method="edge_recombination",
                        crossover_rate=0.8,
-                       mutation_rate=0.2):
+                       mutation_rate=0.2,
+                       neighbourhood="2opt",
+                       selection_method="roulette",
+                       diversidad="hamming"):
     """
     Ejecuta el algoritmo Scatter Search para el problema TSP.
 
@@ -220,10 +334,17 @@ def run_scatter_search(cities_coords,
     tam_conjunto: Cantidad de elementos en el conjunto de referencia.
     porcentaje_re_enlazado: El porcentaje de pares de puntos de referencia para re-enlazado.
     save_every_10_iter: Guardar la mejor solución cada 10 iteraciones.
-    crossover_method: Método de cruce a utilizar.
+    crossover_method: Método de cruce a utilizar: "triple" (tres padres), o "pmx", "ox"
+                      o "erx" con los dos primeros padres de cada grupo (ver utils/operadores.py).
     mutation_method: Método de mutación a utilizar.
     crossover_rate: Tasa de cruce.
     mutation_rate: Tasa de mutación.
+    neighbourhood: Vecindario de la búsqueda local aplicada a los descendientes
+                   ("2opt", "or_opt", "2opt+or_opt", "3opt" o "lk").
+    selection_method: Selección de los padres: "roulette", "alias" o "tournament"
+                      (ver select_parents en utils/operadores.py).
+    diversidad: Medida de diversidad del conjunto de referencia: "hamming" o
+                "aristas" (ver seleccionar_mejores_soluciones).
 
     Returns:
     ----------
@@ -231,37 +352,48 @@ def run_scatter_search(cities_coords,
     """
 
     # Generar el conjunto de referencia inicial
-    conjunto_referencia = initial_population(range(len(cities_coords)), tam_conjunto)
+    # El conjunto se guarda como un arreglo (m, n) de int32 junto con las
+    # distancias de sus soluciones, que solo se calculan para las nuevas
+    conjunto_referencia = np.array(initial_population(range(len(cities_coords)), tam_conjunto), dtype=np.int32)
     cities_names = [i for i in range(len(distance_matrix))]
+    if not isinstance(distance_matrix, (np.ndarray, OraculoDistancia)):
+        distance_matrix = np.asarray(distance_matrix, dtype=np.float64)
+
+    selected_solutions = conjunto_referencia
+    selected_dist = population_lengths(conjunto_referencia, distance_matrix)
 
     for iter in range(max_iteraciones):
     
-        if iter == 0:
-            selected_solutions = conjunto_referencia
-        
-        random.shuffle(selected_solutions)
+        order = list(range(len(selected_solutions)))
+        random.shuffle(order)
+        selected_solutions, selected_dist = selected_solutions[order], selected_dist[order]
         aptitude_probabilities = aptitude_probability(
-            distance_matrix, selected_solutions
+            distance_matrix, selected_solutions, selected_dist
         )
 
-        # Selecciona los padres
-        parents_list = [
-            roulette_selection(selected_solutions, aptitude_probabilities)
-            for _ in range(int(crossover_rate * tam_conjunto))
-        ]
+        # Selecciona los padres, todos en una sola llamada
+        parents_indices = select_parents(aptitude_probabilities, int(crossover_rate * tam_conjunto), selection_method)
         
         # Asegura que el número de padres sea múltiplo de 3
         evolved_offspring = []
-        if len(parents_list) % 3 != 0:
-            parents_list = parents_list[: -(len(parents_list) % 3)]
-
-        for i in range(0, len(parents_list), 3):
-            # Recombina los padres para generar descendientes
-            if crossover_method == "triple":
-                offspring = triple_crossover(len(cities_names), parents_list[i : i + 3])
-            else:
-                raise ValueError("Crossover method not valid")
+        evolved_dist = []
+        if len(parents_indices) % 3 != 0:
+            parents_indices = parents_indices[: -(len(parents_indices) % 3)]
+
+        # Recombina los padres de todos los grupos en una sola llamada (ver
+        # crossover_population en utils/operadores.py)
+        parents = selected_solutions[parents_indices]
+        if crossover_method == "triple":
+            offsprings = crossover_population(parents, "triple")
+        elif crossover_method in ("pmx", "ox", "erx"):
+            # Los cruces de dos padres usan los dos primeros de cada grupo y
+            # se conserva el hijo que tiene al primero como padre principal
+            pairs = np.stack((parents[0::3], parents[1::3]), axis=1).reshape(-1, len(cities_names))
+            offsprings = crossover_population(pairs, crossover_method)[: len(pairs) // 2]
+        else:
+            raise ValueError("Crossover method not valid")
 
+        for offspring in offsprings.tolist():
             # Aplica mutación a los descendientes
             if random.random() < mutation_rate:
                 if mutation_method == "inversion":
@@ -274,35 +406,40 @@ def run_scatter_search(cities_coords,
                     raise ValueError("Mutation method not valid")
             
             # Aplica búsqueda local 2-opt a los descendientes
-            offspring = local_search_2opt(offspring, distance_matrix)
+            offspring_dist, offspring = local_search(distance_matrix, offspring, neighbourhood)
             evolved_offspring.append(offspring)
-            random.shuffle(selected_solutions)
-            
-            # Ejecutar re-enlazado de caminos
-            if random.random() < porcentaje_re_enlazado:
-                offspring_relinked = path_relinking(distance_matrix, offspring, random.shuffle(offspring), selected_solutions)
-                if offspring_relinked != offspring:
-                    evolved_offspring.append(offspring_relinked)
-
-        evolved_offspring += parents_list
-
-        selected_solutions = seleccionar_mejores_soluciones(distance_matrix, 
-                                                            selected_solutions + evolved_offspring, 
-                                                            tam_conjunto)
+            evolved_dist.append(offspring_dist)
+
+        # Ejecutar re-enlazado de caminos entre porcentaje_re_enlazado de los
+        # pares de soluciones del conjunto de referencia
+        pares = [(a, b) for a in range(len(selected_solutions)) for b in range(len(selected_solutions)) if a != b]
+        for a, b in random.sample(pares, int(round(porcentaje_re_enlazado * len(pares) / 2))):
+            relinked_dist, relinked = path_relinking(distance_matrix,
+                                                     selected_solutions[a].tolist(),
+                                                     selected_solutions[b],
+                                                     neighbourhood)
+            if relinked is not None:
+                evolved_offspring.append(relinked)
+                evolved_dist.append(relinked_dist)
+
+        # Los padres ya estan en el conjunto de referencia
+        evolved_offspring = np.array(evolved_offspring, dtype=np.int32).reshape(-1, len(cities_names))
+
+        selected_solutions, selected_dist = seleccionar_mejores_soluciones(distance_matrix, 
+                                                                           np.concatenate((selected_solutions, evolved_offspring)), 
+                                                                           tam_conjunto,
+                                                                           np.concatenate((selected_dist, evolved_dist)),
+                                                                           diversidad)
         
         # Guardar las soluciones cada 10 iteraciones
         if save_every_5_iter and ((iter+1)%5 == 0 or iter == 0):
             
-            distancias_soluciones = []
-            for i in range(tam_conjunto):
-                distancias_soluciones.append(calculate_total_distance(selected_solutions[i],distance_matrix))
-
-            index_minimum = np.argmin(distancias_soluciones)
-            minimum_distance = min(distancias_soluciones)
+            index_minimum = np.argmin(selected_dist)
+            minimum_distance = selected_dist[index_minimum]
             
             print(f"Iteración {iter+1} - Menor distancia: {minimum_distance}")
 
-            shortest_path = selected_solutions[index_minimum].copy()
+            shortest_path = selected_solutions[index_minimum].tolist()
             shortest_path.append(shortest_path[0])
             plot_path(cities_coords, 
                     shortest_path, 
@@ -311,88 +448,90 @@ def run_scatter_search(cities_coords,
                     display_graph = False,
                     route=f"scatter-search/{nombre}")
 
-    return selected_solutions
-
-# Parámetros del algoritmo
-#tam_conj_ref = [40,60,100]  # Tamaño de la población
-tam_conj_ref = [10,20,30]  # Tamaño de la población
-#max_iteraciones = [500, 1000, 2000]  # Número máximo de iteraciones
-max_iteraciones = [10,20,30]  # Número máximo de iteraciones
-porcentaje_re_enlazado = [0.1]  # Porcentaje de pares de puntos de referencia para re-enlazado
-cities_names = [
-    "berlin52",
-    "ch130",
-    "tsp225",
-    "pcb442",
-    "pr1002",
-    "pr2392",
-    "eg7146",
-    "gr9882",
-    "it16862",
-    "vm22775",
-    "rbz43748",
-    "sra104815"]
-
-# Ciclo para obtener los datos de las ciudades y ejecutar la busqueda dispersa
-# Se ejecuta la busqueda dispersa para las primeras 5 ciudades de la lista cities_names
-for i in [0,1,2,3,4]:
-    
-    # Se obtienen las coordenadas de las ciudades
-    cities_coords = obtener_ciudades(f"../../doc/Benchmarks/{cities_names[i]}.tsp")
-
-    nombre = cities_names[i]
-
-    # Se crea el archivo txt donde se almacenaran los resultados
-    # de la ciudad, si ya existe, se sobreescribe
-    with open(f"./solutions/scatter_search/{cities_names[i]}.txt", "w") as text_file:
-        text_file.write(f"Running scatter search with {cities_names[i]} data \n\n")
-
-    # Se calcula la matriz de distancias
-    distance_matrix = np.array(calcular_distancia(cities_coords))
-
-    # Guardar imagenes de la mejor solucion cada 100 generaciones
-    # Las imagenes se guardan actualmente en la carpeta de imagenes
-    # ubicada en el directorio del proyecto
-    save_every_5_iter = True
-    
-    # Se ejecuta para cada ciudad la busqueda dispersa
-    iter = 1
-    for j in range(len(tam_conj_ref)):
-        for k in range(len(max_iteraciones)):
-            for l in range(len(porcentaje_re_enlazado)):
-                
-                print(f"\nRunning scatter search for {cities_names[i]} (iter {iter}/{len(tam_conj_ref)*len(max_iteraciones)*len(porcentaje_re_enlazado)})")
-                print(f"Tam. conjunto de referencia: {tam_conj_ref[j]}")
-                print(f"Cantidad de iteraciones: {max_iteraciones[k]}")                
-                print(f"Re-link %: {porcentaje_re_enlazado[l]}")
-    
-                ## Busqueda dispersa
-                ss_solution = run_scatter_search(cities_coords, 
-                                                distance_matrix, 
-                                                max_iteraciones[k],
-                                                tam_conj_ref[j],
-                                                porcentaje_re_enlazado[l],
-                                                nombre,
-                                                save_every_5_iter
-                                                )
-
-                # Al finalizar el algoritmo memetico, se tiene una poblacion de soluciones
-                # Se calcula la distancia total de cada solucion y se selecciona la mejor
-                population_dist = []
-                for z in range(tam_conj_ref[j]):
-                    population_dist.append(calculate_total_distance(ss_solution[z],distance_matrix))
-
-                index_minimum = np.argmin(population_dist)
-                shortest_path = ss_solution[index_minimum]
-                minimum_distance = min(population_dist)
-
-                # Se escribe la informacion de la mejor solucion en un archivo txt
-                with open(f"./solutions/scatter_search/{cities_names[i]}.txt", "a") as text_file:
-                    text_file.write(f"Ref. set size: {tam_conj_ref[j]}\n")
-                    text_file.write(f"Num iterations: {max_iteraciones[k]}\n")                
-                    text_file.write(f"Re-link %: {porcentaje_re_enlazado[l]}\n")
-                    text_file.write(f"minimum_distance = {minimum_distance}\n")
-                    text_file.write(f"avg_distance = {np.mean(population_dist)}\n")
-                    text_file.write("---------------------------------------------\n\n")
-                print(f"saved solution data in ./solutions/scatter_search/{cities_names[i]}.txt")
-                iter += 1
+    return selected_solutions.tolist()
+
+if __name__ == "__main__":
+
+    # Parámetros del algoritmo
+    #tam_conj_ref = [40,60,100]  # Tamaño de la población
+    tam_conj_ref = [10,20,30]  # Tamaño de la población
+    #max_iteraciones = [500, 1000, 2000]  # Número máximo de iteraciones
+    max_iteraciones = [10,20,30]  # Número máximo de iteraciones
+    porcentaje_re_enlazado = [0.1]  # Porcentaje de pares de puntos de referencia para re-enlazado
+    cities_names = [
+        "berlin52",
+        "ch130",
+        "tsp225",
+        "pcb442",
+        "pr1002",
+        "pr2392",
+        "eg7146",
+        "gr9882",
+        "it16862",
+        "vm22775",
+        "rbz43748",
+        "sra104815"]
+
+    # Ciclo para obtener los datos de las ciudades y ejecutar la busqueda dispersa
+    # Se ejecuta la busqueda dispersa para las primeras 5 ciudades de la lista cities_names
+    for i in [0,1,2,3,4]:
+
+        # Se obtienen las coordenadas de las ciudades
+        cities_coords = obtener_ciudades(f"../../doc/Benchmarks/{cities_names[i]}.tsp")
+
+        nombre = cities_names[i]
+
+        # Se crea el archivo txt donde se almacenaran los resultados
+        # de la ciudad, si ya existe, se sobreescribe
+        with open(f"./solutions/scatter_search/{cities_names[i]}.txt", "w") as text_file:
+            text_file.write(f"Running scatter search with {cities_names[i]} data \n\n")
+
+        # Se calcula la matriz de distancias
+        distance_matrix = cargar_matriz_distancias(f"../../doc/Benchmarks/{cities_names[i]}.tsp", cities_coords)
+
+        # Guardar imagenes de la mejor solucion cada 100 generaciones
+        # Las imagenes se guardan actualmente en la carpeta de imagenes
+        # ubicada en el directorio del proyecto
+        save_every_5_iter = True
+
+        # Se ejecuta para cada ciudad la busqueda dispersa
+        iter = 1
+        for j in range(len(tam_conj_ref)):
+            for k in range(len(max_iteraciones)):
+                for l in range(len(porcentaje_re_enlazado)):
+
+                    print(f"\nRunning scatter search for {cities_names[i]} (iter {iter}/{len(tam_conj_ref)*len(max_iteraciones)*len(porcentaje_re_enlazado)})")
+                    print(f"Tam. conjunto de referencia: {tam_conj_ref[j]}")
+                    print(f"Cantidad de iteraciones: {max_iteraciones[k]}")                
+                    print(f"Re-link %: {porcentaje_re_enlazado[l]}")
+
+                    ## Busqueda dispersa
+                    ss_solution = run_scatter_search(cities_coords, 
+                                                    distance_matrix, 
+                                                    max_iteraciones[k],
+                                                    tam_conj_ref[j],
+                                                    porcentaje_re_enlazado[l],
+                                                    nombre,
+                                                    save_every_5_iter
+                                                    )
+
+                    # Al finalizar el algoritmo memetico, se tiene una poblacion de soluciones
+                    # Se calcula la distancia total de cada solucion y se selecciona la mejor
+                    population_dist = []
+                    for z in range(tam_conj_ref[j]):
+                        population_dist.append(calculate_total_distance(ss_solution[z],distance_matrix))
+
+                    index_minimum = np.argmin(population_dist)
+                    shortest_path = ss_solution[index_minimum]
+                    minimum_distance = min(population_dist)
+
+                    # Se escribe la informacion de la mejor solucion en un archivo txt
+                    with open(f"./solutions/scatter_search/{cities_names[i]}.txt", "a") as text_file:
+                        text_file.write(f"Ref. set size: {tam_conj_ref[j]}\n")
+                        text_file.write(f"Num iterations: {max_iteraciones[k]}\n")                
+                        text_file.write(f"Re-link %: {porcentaje_re_enlazado[l]}\n")
+                        text_file.write(f"minimum_distance = {minimum_distance}\n")
+                        text_file.write(f"avg_distance = {np.mean(population_dist)}\n")
+                        text_file.write("---------------------------------------------\n\n")
+                    print(f"saved solution data in ./solutions/scatter_search/{cities_names[i]}.txt")
+                    iter += 1
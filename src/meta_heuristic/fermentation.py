@@ -9,10 +9,11 @@ import pandas as pd
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 from utils.calcular_distancia import (
-    calcular_distancia,
     calculate_total_distance,
     calcular_costo_ruta,
 )
+from utils.cache_distancias import cargar_matriz_distancias
+from heuristic.local_search_engine import two_opt
 from utils.graficar import graficar_recorrido
 from utils.leer_archivo import obtener_ciudades, obtener_mejor_ruta
 
@@ -73,23 +74,9 @@ def adapt_and_mutate(solution, mutation_rate):
 def local_search(solution, distance_matrix):
     """
     Mejor local utilizando el operador 2-opt
+    (ver heuristic/local_search_engine.py)
     """
-    best = solution
-    improved = True
-    while improved:
-        improved = False
-        for i in range(1, len(solution) - 1):
-            for j in range(i + 1, len(solution)):
-                if j - i == 1:
-                    continue
-                new_solution = solution[:]
-                new_solution[i:j] = reversed(solution[i:j])
-                if calculate_total_distance(
-                    new_solution, distance_matrix
-                ) < calculate_total_distance(best, distance_matrix):
-                    best = new_solution
-                    improved = True
-        solution = best
+    _, best = two_opt(distance_matrix, solution)
     return best
 
 
@@ -203,7 +190,9 @@ for i in range(4):
     )
 
     # Obtiene la matriz de distancias
-    distance_matrix = np.array(calcular_distancia(cities_coords))
+    distance_matrix = cargar_matriz_distancias(
+        PROJECT_DIR / f"doc/Benchmarks/{cities_names[i]}.tsp", cities_coords
+    )
 
     # Optimiza la solucion
     start = time.time()
@@ -1,12 +1,19 @@
 import random
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from iteration_utilities import random_permutation
 
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..')) 
-from utils.calcular_distancia import calcular_distancia, calculate_total_distance
+from utils.calcular_distancia import calculate_total_distance, population_lengths, OraculoDistancia
+from utils.cache_distancias import cargar_matriz_distancias
 from utils.leer_archivo import obtener_ciudades
 from utils.graficar import plot_path
+from utils.operadores import pmx_crossover, order_crossover, edge_recombination_crossover, crossover_population, roulette_indices, select_parents
+from utils.memoria_compartida import ArreglosCompartidos, conectar
+from utils.indice_espacial import obtener_candidatos, candidatos_como_listas
+from heuristic.local_search_engine import local_search, K_CANDIDATOS
 
 # Se obtiene la poblacion inicial de manera aleatoria
 # Los individuos son permutaciones de las ciudades
@@ -44,7 +51,7 @@ def initial_population(cities_list, population_size):
 # Calcula la aptitud de cada individuo en la población y en base a esta se calcula la probabilidad
 # Los individuos con mayor aptitud tienen una mayor probabilidad
 # de ser seleccionados como padres para producir descendientes en la siguiente generación
-def aptitude_probability(distance_matrix,population):
+def aptitude_probability(distance_matrix,population,population_dist=None):
     
     """
     Método para obtener la probabilidad de aptitud de una población.
@@ -54,11 +61,14 @@ def aptitude_probability(distance_matrix,population):
 
     Parámetros:
     ----------
-    distance_matrix (lista de listas de enteros): Matriz de distancias entre ciudades. 
+    distance_matrix (lista de listas de enteros / np.ndarray): Matriz de distancias entre ciudades. 
                                        Cada entrada (i, j) representa la distancia 
                                        entre la ciudad i y la ciudad j.
-    population (lista de listas de enteros): Población de individuos. Cada individuo es una permutación 
-                                  de las ciudades 
+    population (np.ndarray (p, n) / lista de listas de enteros): Población de individuos. Cada individuo
+                                  es una permutación de las ciudades 
+    population_dist (np.ndarray de floats, opcional): Distancias ya calculadas de los individuos
+                                  (ver run_ga); si no se dan se calculan todas a la vez
+                                  con population_lengths.
 
     Returns:
     ------
@@ -66,18 +76,18 @@ def aptitude_probability(distance_matrix,population):
                                                 para cada individuo en la población.
 
     Complejidad de tiempo:
-    O(n), donde n es la cantidad de individuos en la población.
+    O(p * n), con p la cantidad de individuos en la población y n la de ciudades,
+    en una sola operación vectorizada (O(p) si se dan las distancias).
     """
     # Se calcula la aptitud de cada individuo, como la distancia total recorrida
-    population_dist = []
-    for i in range (len(population)):
-        population_dist.append(calculate_total_distance(population[i],distance_matrix))
+    if population_dist is None:
+        population_dist = population_lengths(population, distance_matrix)
 
     # Se calcula la aptitud relativa de cada individuo y
     # se normaliza para obtener la probabilidad de aptitud  
     max_dist = max(population_dist)
     population_aptitudes = max_dist - population_dist
-    population_apt_probs = population_aptitudes / sum(population_aptitudes)
+    population_apt_probs = population_aptitudes / population_aptitudes.sum()
     return population_apt_probs
 
 # Mecanismo de seleccion de la ruleta
@@ -104,7 +114,9 @@ def roulette_selection(population, aptitude_probabilities):
     selected_individual (lista de ints): Individuo seleccionado según el método de la ruleta
 
     Complejidad de tiempo:
-    O(n), donde n es la cantidad de individuos en la población.
+    O(n), donde n es la cantidad de individuos en la población. Para
+    seleccionar todos los padres de una generación se usa select_parents
+    (ver utils/operadores.py), que calcula la suma acumulativa una sola vez.
     """
 
     # Calcula la suma acumulativa de las probabilidades de aptitud
@@ -113,11 +125,8 @@ def roulette_selection(population, aptitude_probabilities):
     # Valor aleatorio entre 0 y 1 para seleccionar un individuo
     random_value = random.random()
 
-    # Encuentra el índice del primer valor acumulativo mayor que el valor aleatorio
-    selected_individual_index = len(cumulative_sum_probs[cumulative_sum_probs < random_value]) - 1
-
     # Retorna el individuo seleccionado
-    return population[selected_individual_index]
+    return population[int(roulette_indices(cumulative_sum_probs, random_value))]
 
 def simple_crossover(numCities, parents):
 
@@ -151,15 +160,17 @@ def simple_crossover(numCities, parents):
     # En el caso del primero descendiente, se comienza llenando con los elementos del primer padre
     # y se termina con los elementos del segundo padre
     offsprings1 = parents[0][0:c]
+    usadas = set(offsprings1)
     for city in parents[1]:
-        if city not in offsprings1:
+        if city not in usadas:
             offsprings1.append(city)
     
     # Rellena el segundo descendiente con los elementos del segundo padre hasta el corte
     # y lo termina con los elementos del primer padre
     offsprings2 = parents[1][0:c]
+    usadas = set(offsprings2)
     for city in parents[0]:
-        if city not in offsprings2:
+        if city not in usadas:
             offsprings2.append(city)
 
     return [offsprings1, offsprings2]
@@ -174,7 +185,7 @@ def partially_matched_crossover(numCities, parents):
     Parámetros:
     ----------
     numCities (int): Cantidad total de ciudades/individuos en el problema.
-    parents (lista de lista de ints): Padres que seran cruzados.
+    parents (lista de lista de ints / Tour): Padres que seran cruzados.
 
     Returns:
     ------
@@ -187,35 +198,57 @@ def partially_matched_crossover(numCities, parents):
 
     # Se calculan dos puntos de corte aleatorios
     c1, c2 = sorted(random.sample(range(len(numCities)), 2))
-    
-    # Se inicializan los descendientes con -1
-    offspring1 = [-1] * len(numCities)
-    offspring2 = [-1] * len(numCities)
-
-    offspring1[c1:c2] = parents[0][c1:c2]
-    offspring2[c1:c2] = parents[1][c1:c2]
-
-    for i in range(c1, c2):
-        if parents[1][i] not in offspring1:
-            j = i
-            while offspring1[j] != -1:
-                j = parents[1].index(parents[0][j])
-            offspring1[j] = parents[1][i]
-
-        if parents[0][i] not in offspring2:
-            j = i
-            while offspring2[j] != -1:
-                j = parents[0].index(parents[1][j])
-            offspring2[j] = parents[0][i]
-    
-    for i in range(len(numCities)):
-        if offspring1[i] == -1:
-            offspring1[i] = parents[1][i]
-        if offspring2[i] == -1:
-            offspring2[i] = parents[0][i]
+
+    # Cada descendiente toma el segmento de un padre y el resto del otro
+    # (ver utils/operadores.pmx_crossover)
+    offspring1 = pmx_crossover(parents[0], parents[1], c1, c2)
+    offspring2 = pmx_crossover(parents[1], parents[0], c1, c2)
     
     return [offspring1, offspring2]
 
+def order_based_crossover(numCities, parents):
+
+    """
+    Operador de cruce para combinar dos padres utilizando el cruce de orden (OX).
+    Cada descendiente conserva un segmento de un padre y el orden relativo de
+    las demás ciudades en el otro (ver utils/operadores.order_crossover).
+
+    Parámetros:
+    ----------
+    numCities (int): Cantidad total de ciudades/individuos en el problema.
+    parents (lista de lista de ints): Padres que seran cruzados.
+
+    Returns:
+    ------
+    offsprings (lista de listas de enteros): Descendientes generados después del cruce.
+
+    Complejidad de tiempo:
+    O(n), donde n es la cantidad de ciudades en el problema.
+    """
+    c1, c2 = sorted(random.sample(range(len(numCities)), 2))
+    return [order_crossover(parents[0], parents[1], c1, c2), order_crossover(parents[1], parents[0], c1, c2)]
+
+def edge_crossover(numCities, parents):
+
+    """
+    Operador de cruce para combinar dos padres utilizando la recombinación de
+    aristas (ERX): los descendientes se arman casi solo con aristas de los
+    padres (ver utils/operadores.edge_recombination_crossover).
+
+    Parámetros:
+    ----------
+    numCities (int): Cantidad total de ciudades/individuos en el problema.
+    parents (lista de lista de ints): Padres que seran cruzados.
+
+    Returns:
+    ------
+    offsprings (lista de listas de enteros): Descendientes generados después del cruce.
+
+    Complejidad de tiempo:
+    O(n), donde n es la cantidad de ciudades en el problema.
+    """
+    return [edge_recombination_crossover(parents[0], parents[1]), edge_recombination_crossover(parents[1], parents[0])]
+
 def swap_mutation(individual):
     
     """
@@ -269,7 +302,202 @@ def inversion_mutation(individual):
     
     return individual
 
-def run_ga(cities_coords, distance_matrix, population_size, numGenerations,crossover_rate, mutation_rate, save_every_10_gen=False, crossover_method="pmx", mutation_method="inversion"):
+def canonical_tour(individual):
+    """
+    Forma canónica de una ruta como bytes: empieza en la ciudad 0 y se
+    recorre en el sentido en que la segunda ciudad es la menor. Las
+    rotaciones e inversiones de una misma ruta tienen la misma forma, por
+    lo que sirve como clave (hash) de la ruta en un diccionario.
+    """
+    individual = np.asarray(individual, dtype=np.int32)
+    start = int(np.argmin(individual))
+    individual = np.roll(individual, -start)
+    if len(individual) > 2 and individual[-1] < individual[1]:
+        individual = np.roll(individual[::-1], 1)
+    return individual.tobytes()
+
+class Memetic:
+    """
+    Modo memético de run_ga: aplica búsqueda local con listas de vecinos
+    (ver heuristic/local_search_engine.py) a una fracción de los hijos de
+    cada generación, con un presupuesto de tiempo de CPU por generación.
+
+    Los óptimos locales se guardan en una cache indexada por la forma
+    canónica de la ruta (ver canonical_tour): un hijo repetido, o que ya es
+    un óptimo local conocido, no se vuelve a optimizar. Al agotarse el
+    presupuesto, los hijos restantes solo se mejoran si están en la cache.
+
+    Parámetros:
+    ----------
+    distance_matrix (np.ndarray / OraculoDistancia): Distancias entre ciudades.
+    fraction (float): Fracción de los hijos a los que se aplica la búsqueda local.
+    time_budget (float): Segundos de CPU por generación para la búsqueda local.
+                         Con None no hay límite.
+    neighbourhood (str): Vecindario de local_search ("2opt", "or_opt", "2opt+or_opt", ...).
+    k (int): Cantidad de candidatos por ciudad.
+    cache_size (int): Cantidad máxima de rutas en la cache; se descartan las más antiguas.
+    """
+
+    def __init__(self, distance_matrix, fraction=0.2, time_budget=0.1, neighbourhood="2opt+or_opt", k=K_CANDIDATOS, cache_size=10000):
+        self.distance_matrix = distance_matrix
+        self.fraction = fraction
+        self.time_budget = time_budget
+        self.neighbourhood = neighbourhood
+        self.candidates = candidatos_como_listas(obtener_candidatos(distance_matrix, k))
+        self.cache_size = cache_size
+        self.cache = {}
+        self.searches = 0
+        self.hits = 0
+
+    def remember(self, key, individual, distance):
+        self.cache[key] = (individual, distance)
+        if len(self.cache) > self.cache_size:
+            # Los diccionarios conservan el orden de insercion
+            del self.cache[next(iter(self.cache))]
+
+    def improve(self, offspring, offspring_dist):
+        """
+        Mejora en el lugar una fracción de los hijos, elegidos al azar.
+
+        Parámetros:
+        ----------
+        offspring (np.ndarray int32 (m, n)): Hijos de la generación.
+        offspring_dist (np.ndarray de floats): Distancias de los hijos.
+
+        Returns:
+        ------
+        offspring, offspring_dist: Los mismos arreglos, con los hijos mejorados.
+        """
+        n_improved = int(round(self.fraction * len(offspring)))
+        if n_improved <= 0:
+            return offspring, offspring_dist
+        deadline = None if self.time_budget is None else time.process_time() + self.time_budget
+        for i in random.sample(range(len(offspring)), n_improved):
+            key = canonical_tour(offspring[i])
+            if key in self.cache:
+                self.hits += 1
+                offspring[i], offspring_dist[i] = self.cache[key]
+                continue
+            if deadline is not None and time.process_time() >= deadline:
+                continue
+            distance, individual = local_search(self.distance_matrix, offspring[i].tolist(), self.neighbourhood, candidates=self.candidates)
+            individual = np.array(individual, dtype=np.int32)
+            self.searches += 1
+            # El optimo local tambien es su propio resultado
+            self.remember(key, individual, distance)
+            self.remember(canonical_tour(individual), individual, distance)
+            offspring[i], offspring_dist[i] = individual, distance
+        return offspring, offspring_dist
+
+def shuffle_population(individuals, distances):
+    # Mezcla los individuos junto con sus distancias
+    order = list(range(len(individuals)))
+    random.shuffle(order)
+    return individuals[order], distances[order]
+
+def evolve_generation(distance_matrix, population, population_dist, selected_individuals, selected_dist,
+                      population_size, crossover_rate, mutation_rate, crossover_method="pmx", mutation_method="inversion",
+                      memetic=None, selection_method="roulette", tournament_size=2):
+
+    """
+    Evoluciona una generación del algoritmo genético.
+
+    Se seleccionan padres (por defecto por ruleta) entre selected_individuals, se cruzan y
+    mutan, y la siguiente selección se forma con el 80% de mejor aptitud
+    entre hijos y padres más un 20% tomado al azar de population.
+
+    Parámetros:
+    ----------
+    distance_matrix (np.ndarray / OraculoDistancia): Distancias entre ciudades.
+    population (np.ndarray int32 (p, n)): Población de la que se toma el 20% al azar.
+    population_dist (np.ndarray de floats): Distancias de population.
+    selected_individuals (np.ndarray int32 (s, n)): Selección actual.
+    selected_dist (np.ndarray de floats): Distancias de selected_individuals.
+    population_size (int): Tamaño de la población.
+    crossover_rate (float): Proporción de individuos seleccionados para el cruce.
+    mutation_rate (float): Probabilidad de aplicar la mutación a un individuo.
+    crossover_method (str): Método de cruce a utilizar. Puede ser "pmx", "ox", "erx" o "simple".
+    mutation_method (str): Método de mutación a utilizar. Puede ser "inversion" o "swap".
+    memetic (Memetic, opcional): Búsqueda local a aplicar a los hijos.
+    selection_method (str): Selección de los padres: "roulette", "alias" o
+                            "tournament" (ver select_parents en utils/operadores.py).
+    tournament_size (int): Cantidad de individuos por torneo.
+
+    Returns:
+    ------
+    selected_individuals (np.ndarray int32): Nueva selección, ya mezclada para la siguiente generación.
+    selected_dist (np.ndarray de floats): Distancias de la nueva selección.
+    """
+    cities_names = [i for i in range(population.shape[1])]
+
+    # Proceso de seleccion
+    # Se calcula la probabilidad de seleccionar cada individuo a partir de su aptitud
+    aptitude_probabilities = aptitude_probability(distance_matrix,selected_individuals,selected_dist)
+    # Se seleccionan los padres para el cruce, todos en una sola llamada
+    # La cantidad de padres seleccionados es proporcional a crossover_rate
+    parents_indices = select_parents(aptitude_probabilities,
+                                     int(crossover_rate * population_size),
+                                     selection_method,
+                                     tournament_size=tournament_size)
+
+    # Proceso de cruce y mutacion
+    # Se seleccionan los padres de dos en dos y se cruzan para generar dos hijos por pareja
+    if len(parents_indices) % 2 != 0:
+        parents_indices = parents_indices[:-1]
+    if crossover_method in ("pmx", "ox", "erx"):
+        # Todas las parejas se cruzan en una sola llamada (ver crossover_population);
+        # los hijos de la pareja g son las filas g y g + pairs, se intercalan
+        # para que los dos hijos de cada pareja queden juntos
+        evolved_offspring = crossover_population(selected_individuals[parents_indices], crossover_method)
+        pairs = len(evolved_offspring) // 2
+        evolved_offspring = evolved_offspring.reshape(2, pairs, len(cities_names)).swapaxes(0, 1).reshape(2 * pairs, len(cities_names))
+    else:
+        parents_list = selected_individuals[parents_indices].tolist()
+        evolved_offspring = []
+        for i in range(0,len(parents_list), 2):
+            evolved_offspring.extend(simple_crossover(cities_names,parents_list[i:i+2]))
+        evolved_offspring = np.array(evolved_offspring, dtype=np.int32).reshape(-1, len(cities_names))
+
+    for i in range(0, len(evolved_offspring), 2):
+        # Se determina si se aplica mutacion a los hijos (en el lugar)
+        if(random.random() < mutation_rate):
+            if mutation_method == "inversion":
+                inversion_mutation(evolved_offspring[i])
+                inversion_mutation(evolved_offspring[i + 1])
+            elif mutation_method == "swap":
+                swap_mutation(evolved_offspring[i])
+                swap_mutation(evolved_offspring[i + 1])
+
+    # Se mezclan los padres y los hijos evolucionados
+    # Solo se calculan las distancias de los hijos, las de los padres ya se conocen
+    evolved_dist = population_lengths(evolved_offspring, distance_matrix)
+    if memetic is not None:
+        evolved_offspring, evolved_dist = memetic.improve(evolved_offspring, evolved_dist)
+    evolved_dist = np.concatenate((evolved_dist, selected_dist[parents_indices]))
+    evolved_offspring = np.concatenate((evolved_offspring, selected_individuals[parents_indices]))
+    aptitude_probabilities = aptitude_probability(distance_matrix,evolved_offspring,evolved_dist)
+    
+    # Se seleccionan los individuos con mejor aptitud para la siguiente generacion
+    # Se selecciona el 80% de los individuos con mejor aptitud
+    sorted_indices = np.argsort(aptitude_probabilities)[::-1]
+    best_individual_indices = sorted_indices[0:int(0.8*population_size)]
+    
+    # Se selecciona el 20% restante de los individuos con peor aptitud
+    previous_population_indices = [random.randint(0, (population_size - 1)) for _ in range(int(0.2*population_size))]
+
+    selected_individuals = np.concatenate((
+        evolved_offspring[best_individual_indices],
+        population[previous_population_indices],
+    ))
+    selected_dist = np.concatenate((
+        evolved_dist[best_individual_indices],
+        population_dist[previous_population_indices],
+    ))
+    
+    return shuffle_population(selected_individuals, selected_dist)
+
+def run_ga(cities_coords, distance_matrix, population_size, numGenerations,crossover_rate, mutation_rate, save_every_10_gen=False, crossover_method="pmx", mutation_method="inversion",
+           memetic_fraction=0.0, memetic_time_budget=0.1, neighbourhood="2opt+or_opt", selection_method="roulette", tournament_size=2):
     
     """
     Método para ejecutar el algoritmo genético (GA)
@@ -286,8 +514,14 @@ def run_ga(cities_coords, distance_matrix, population_size, numGenerations,cross
     crossover_rate (float): Proporción de individuos seleccionados para el cruce.
     mutation_rate (float): Probabilidad de aplicar la mutación a un individuo.
     save_every_10_gen (bool): Si se deben guardar en un grafico los resultados cada 10 generaciones.
-    crossover_method (str): Método de cruce a utilizar. Puede ser "pmx" o "simple".
+    crossover_method (str): Método de cruce a utilizar. Puede ser "pmx", "ox", "erx" o "simple".
     mutation_method (str): Método de mutación a utilizar. Puede ser "inversion" o "swap".
+    memetic_fraction (float): Fracción de los hijos de cada generación a los que se
+                              aplica búsqueda local (ver Memetic). Con 0 no se aplica.
+    memetic_time_budget (float): Segundos de CPU por generación para la búsqueda local.
+    neighbourhood (str): Vecindario de la búsqueda local.
+    selection_method (str): Selección de los padres: "roulette", "alias" o "tournament".
+    tournament_size (int): Cantidad de individuos por torneo.
 
     Returns:
     ------
@@ -299,181 +533,403 @@ def run_ga(cities_coords, distance_matrix, population_size, numGenerations,cross
     """
     # Obtiene los "nombres" de las ciudades
     cities_names = [i for i in range(len(distance_matrix))]
+    if not isinstance(distance_matrix, (np.ndarray, OraculoDistancia)):
+        distance_matrix = np.asarray(distance_matrix, dtype=np.float64)
+
+    # La poblacion es un arreglo (population_size, n) de int32; junto a cada
+    # conjunto de individuos se guardan sus distancias, que solo se calculan
+    # (todas a la vez) para los hijos nuevos de cada generacion
+    population = np.array(initial_population(cities_names, population_size), dtype=np.int32)
+    population_dist = population_lengths(population, distance_matrix)
+
+    memetic = None
+    if memetic_fraction > 0:
+        memetic = Memetic(distance_matrix, memetic_fraction, memetic_time_budget, neighbourhood)
 
-    population = initial_population(cities_names, population_size)
+    # La primera seleccion es la poblacion inicial mezclada; las siguientes
+    # se mezclan al final de cada generacion (ver evolve_generation)
+    population, population_dist = shuffle_population(population, population_dist)
+    selected_individuals, selected_dist = population, population_dist
 
     for generation in range(0, numGenerations):
         
         if (generation%10 == 0):
             print("Generation ", generation)
-        
-        if generation == 0:
-            selected_individuals = population
-        
-        random.shuffle(selected_individuals)
-        
-        # Proceso de seleccion
-        # Se calcula la probabilidad de seleccionar cada individuo a partir de su aptitud
-        aptitude_probabilities = aptitude_probability(distance_matrix,selected_individuals)
-        parents_list = []
-        # Se seleccionan los padres para el cruce
-        # La cantidad de padres seleccionados es proporcional a crossover_rate
-        for _ in range(0, int(crossover_rate * population_size)):
-            parents_list.append(roulette_selection(selected_individuals,aptitude_probabilities))
-
-        # Proceso de cruce y mutacion
-        # Se seleccionan los padres de dos en dos y se cruzan para generar dos hijos por pareja
-        evolved_offspring = []
-        if len(parents_list) % 2 != 0:
-            parents_list.pop()
-        for i in range(0,len(parents_list), 2):
-            # Se llama a la funcion de cruce con los dos padres
-            if crossover_method == "pmx":
-                offsprings = partially_matched_crossover(cities_names,parents_list[i:i+2])
-            else:
-                offsprings = simple_crossover(cities_names,parents_list[i:i+2])
-
-            # Se determina si se aplica mutacion a los hijos
-            if(random.random() < mutation_rate):
-                if mutation_method == "inversion":
-                    offsprings[0] = inversion_mutation(offsprings[0])
-                    offsprings[1] = inversion_mutation(offsprings[1])
-                elif mutation_method == "swap":
-                    offsprings[0] = swap_mutation(offsprings[0])
-                    offsprings[1] = swap_mutation(offsprings[1])
-
-            evolved_offspring.append(offsprings[0])
-            evolved_offspring.append(offsprings[1])
-
-        # Se mezclan los padres y los hijos evolucionados
-        evolved_offspring += parents_list
-        aptitude_probabilities = aptitude_probability(distance_matrix,evolved_offspring)
-        
-        # Se seleccionan los individuos con mejor aptitud para la siguiente generacion
-        # Se selecciona el 80% de los individuos con mejor aptitud
-        sorted_indices = np.argsort(aptitude_probabilities)[::-1]
-        best_individual_indices = sorted_indices[0:int(0.8*population_size)]
-
-        selected_individuals = []
-        for i in best_individual_indices:
-            selected_individuals.append(evolved_offspring[i])
-        
-        # Se selecciona el 20% restante de los individuos con peor aptitud
-        previous_population_indices = [random.randint(0, (population_size - 1)) for _ in range(int(0.2*population_size))]
-        for i in previous_population_indices:
-            selected_individuals.append(population[i])
+
+        selected_individuals, selected_dist = evolve_generation(distance_matrix,
+                                                                population,
+                                                                population_dist,
+                                                                selected_individuals,
+                                                                selected_dist,
+                                                                population_size,
+                                                                crossover_rate,
+                                                                mutation_rate,
+                                                                crossover_method,
+                                                                mutation_method,
+                                                                memetic,
+                                                                selection_method,
+                                                                tournament_size)
         
         if save_every_10_gen:
             if (generation%10 == 0):
-                total_dist_all_individuals = []
-                for i in range(0, population_size):
-                    total_dist_all_individuals.append(calculate_total_distance(selected_individuals[i],distance_matrix))
-
-                index_minimum = np.argmin(total_dist_all_individuals)
-                minimum_distance = min(total_dist_all_individuals)
+                index_minimum = np.argmin(selected_dist)
+                minimum_distance = selected_dist[index_minimum]
 
-                shortest_path = selected_individuals[index_minimum]
+                shortest_path = selected_individuals[index_minimum].tolist()
                 shortest_path.append(shortest_path[0])
                 plot_path(cities_coords, shortest_path, minimum_distance, title=f"GA_{crossover_method}_{mutation_method}_gen{generation}", display_graph = False)
             
-    return selected_individuals
-
-##### Parametros del algoritmo genetico
-
-# Tamaño de la poblacion
-population_size = [100, 500, 1000]
-# Tasa de cruce, es decir, la proporcion de individuos seleccionados de la poblacion
-# en cada generacion para el cruce
-crossover_rate = [0.5, 0.7, 0.9]
-# Tasa de mutacion, es decir, la probabilidad de que ocurra una mutacion
-mutation_rate = [0.2, 0.4, 0.6]
-# Numero de generaciones, es decir, el numero de iteraciones del algoritmo genetico
-numGenerations = [200]
-
-crossover_method = "pmx"
-
-mutation_method = "inversion"
-
-# Nombres de algunos de los problemas TSP disponibles
-cities_names = [
-    "berlin52",
-    "ch130",
-    "tsp225",
-    "pcb442",
-    "pr1002",
-    "pr2392",
-    "eg7146",
-    "gr9882",
-    "it16862",
-    "vm22775",
-    "rbz43748",
-    "sra104815"]
-
-# Ciclo para obtener los datos de las ciudades y ejecutar el algoritmo genetico
-# Se ejecuta el algoritmo genetico para las primeras 5 ciudades de la lista cities_names
-for i in range(len(cities_names)):
-    # Se obtienen las coordenadas de las ciudades
-    cities_coords = obtener_ciudades(f"../../doc/Benchmarks/{cities_names[i]}.tsp")
-
-    # Se crea el archivo txt donde se almacenaran los resultados
-    # de la ciudad, si ya existe, se sobreescribe
-    with open(f"./solutions/{cities_names[i]}_{crossover_method}_{mutation_method}.txt", "w") as text_file:
-        text_file.write(f"Running GA with {cities_names[i]} data \n\n")
-
-    # Se calcula la matriz de distancias
-    distance_matrix = np.array(calcular_distancia(cities_coords))
-
-    # Guardar imagenes de la mejor solucion cada 10 generaciones
-    # Las imagenes se guardan actualmente en la carpeta de imagenes
-    # ubicada en el directorio del proyecto
-    save_every_10_gen = False
+    return selected_individuals.tolist()
+
+# Modelo de islas
+# Cada isla es una poblacion de run_ga que evoluciona por separado; cada
+# migration_every generaciones las islas envian sus mejores individuos a
+# otra isla segun la topologia (anillo o aleatoria).
+# Las poblaciones de todas las islas viven en memoria compartida (arreglos
+# int32), asi que entre procesos solo viajan el numero de isla y la semilla.
+
+_island_arrays = {}
+_island_blocks = []
+
+def _init_island_worker(specs, distance_matrix=None):
+    # Inicializador de los procesos: se conecta una sola vez a la memoria
+    # compartida; un OraculoDistancia (si lo hay) se recibe una sola vez aqui
+    arrays, blocks = conectar(specs)
+    _island_arrays.update(arrays)
+    _island_blocks.extend(blocks)
+    if distance_matrix is not None:
+        _island_arrays["distances"] = distance_matrix
+
+def _evolve_island_task(task):
+    # Tarea de un proceso: evoluciona una isla sobre la memoria compartida
+    return evolve_island(_island_arrays, _island_arrays["distances"], *task)
+
+def island_seed(entropy, spawn_key):
+    # Semilla del modulo random para una isla (y epoca): no depende de que
+    # proceso ejecute la tarea
+    return int(np.random.SeedSequence(entropy, spawn_key=spawn_key).generate_state(1)[0])
+
+def evolve_island(arrays, distance_matrix, island, seed, generations, options):
+
+    """
+    Evoluciona una isla durante varias generaciones con evolve_generation.
+
+    La isla se lee y se escribe en el lugar en arrays, que contiene para
+    todas las islas "population" (k, p, n) y "population_dist" (k, p), la
+    población fija de la que se toma el 20% al azar, y "selected" (k, p, n),
+    "selected_dist" (k, p) y "selected_size" (k,), la selección actual.
+
+    Parámetros:
+    ----------
+    arrays (dict de np.ndarray): Arreglos de las islas (en memoria compartida o no).
+    distance_matrix (np.ndarray / OraculoDistancia): Distancias entre ciudades.
+    island (int): Índice de la isla.
+    seed (int): Semilla del módulo random para estas generaciones.
+    generations (int): Cantidad de generaciones a evolucionar.
+    options (dict): Parámetros de evolve_generation (population_size,
+                    crossover_rate, mutation_rate, crossover_method, ...).
+
+    Returns:
+    ------
+    float: Distancia del mejor individuo de la isla.
+    """
+    random.seed(seed)
+    population = arrays["population"][island]
+    population_dist = arrays["population_dist"][island]
+    size = int(arrays["selected_size"][island])
+    selected_individuals = arrays["selected"][island, :size]
+    selected_dist = arrays["selected_dist"][island, :size]
+
+    for _ in range(generations):
+        selected_individuals, selected_dist = evolve_generation(distance_matrix,
+                                                                population,
+                                                                population_dist,
+                                                                selected_individuals,
+                                                                selected_dist,
+                                                                **options)
+
+    # evolve_generation retorna copias, por lo que se pueden escribir sobre
+    # la seleccion anterior
+    size = len(selected_individuals)
+    arrays["selected"][island, :size] = selected_individuals
+    arrays["selected_dist"][island, :size] = selected_dist
+    arrays["selected_size"][island] = size
+    return float(selected_dist.min())
+
+def migrate(arrays, n_migrants, topology="ring", rng=None):
+
+    """
+    Envía los n_migrants mejores individuos de cada isla a otra isla, donde
+    reemplazan a sus n_migrants peores individuos.
+
+    Todas las islas emigran a la vez (se toman las élites antes de
+    reemplazar). Con topology="ring" la isla i envía a la isla i + 1; con
+    "random" cada isla envía a otra isla distinta elegida con rng.
+
+    Parámetros:
+    ----------
+    arrays (dict de np.ndarray): Arreglos de las islas (ver evolve_island).
+    n_migrants (int): Cantidad de individuos que envía cada isla.
+    topology (str): "ring" o "random".
+    rng (np.random.Generator): Generador para la topología aleatoria.
+    """
+    n_islands = len(arrays["selected_size"])
+    if n_islands < 2 or n_migrants <= 0:
+        return
+    if topology == "ring":
+        destinations = (np.arange(n_islands) + 1) % n_islands
+    elif topology == "random":
+        destinations = (np.arange(n_islands) + rng.integers(1, n_islands, n_islands)) % n_islands
+    else:
+        raise ValueError(f"Topología desconocida: {topology}")
+
+    emigrants = []
+    for island in range(n_islands):
+        size = int(arrays["selected_size"][island])
+        elite = np.argsort(arrays["selected_dist"][island, :size], kind="stable")[:n_migrants]
+        emigrants.append((arrays["selected"][island, elite], arrays["selected_dist"][island, elite]))
+
+    for island, destination in enumerate(destinations):
+        individuals, distances = emigrants[island]
+        size = int(arrays["selected_size"][destination])
+        worst = np.argsort(arrays["selected_dist"][destination, :size], kind="stable")[::-1][:len(individuals)]
+        arrays["selected"][destination, worst] = individuals[:len(worst)]
+        arrays["selected_dist"][destination, worst] = distances[:len(worst)]
+
+def final_individuals(arrays):
+    # Selecciones de todas las islas como lista de listas (copia los datos)
+    return np.concatenate([
+        arrays["selected"][island, :size]
+        for island, size in enumerate(arrays["selected_size"])
+    ]).tolist()
+
+def island_ga(distance_matrix, population_size, numGenerations, crossover_rate, mutation_rate, n_islands=4,
+              migration_every=10, n_migrants=2, topology="ring", crossover_method="pmx", mutation_method="inversion",
+              n_workers=None, seed=None, selection_method="roulette", tournament_size=2):
+
+    """
+    Algoritmo genético con modelo de islas.
+
+    Evoluciona n_islands poblaciones de population_size individuos como en
+    run_ga y cada migration_every generaciones aplica migrate. Con
+    n_workers > 1 las islas evolucionan en los procesos de un
+    ProcessPoolExecutor; sus poblaciones (int32) y la matriz de distancias se
+    copian una vez a memoria compartida (ver utils/memoria_compartida.py).
+
+    Cada isla usa en cada época la semilla SeedSequence(entropy,
+    spawn_key=(epoca, isla)), por lo que el resultado no depende de n_workers.
+    El estado del módulo random del llamador se restaura al terminar.
+
+    Parámetros:
+    ----------
+    distance_matrix (np.ndarray / OraculoDistancia): Distancias entre ciudades.
+    population_size (int): Tamaño de la población de cada isla.
+    numGenerations (int): Cantidad de generaciones a evolucionar.
+    crossover_rate (float): Proporción de individuos seleccionados para el cruce.
+    mutation_rate (float): Probabilidad de aplicar la mutación a un individuo.
+    n_islands (int): Cantidad de islas.
+    migration_every (int): Generaciones entre migraciones.
+    n_migrants (int): Cantidad de individuos que envía cada isla en cada migración.
+    topology (str): "ring" o "random" (ver migrate).
+    crossover_method (str): Método de cruce a utilizar. Puede ser "pmx", "ox", "erx" o "simple".
+    mutation_method (str): Método de mutación a utilizar. Puede ser "inversion" o "swap".
+    n_workers (int): Cantidad de procesos. Con None o 1 se evoluciona en este proceso.
+    seed (int): Semilla; con None se toma una entropía aleatoria.
+    selection_method (str): Selección de los padres: "roulette", "alias" o "tournament".
+    tournament_size (int): Cantidad de individuos por torneo.
+
+    Returns:
+    ------
+    individuals (lista de listas de int): Individuos seleccionados de todas
+                                          las islas después de la evolución.
+    """
+    if not isinstance(distance_matrix, (np.ndarray, OraculoDistancia)):
+        distance_matrix = np.asarray(distance_matrix, dtype=np.float64)
+    if topology not in ("ring", "random"):
+        raise ValueError(f"Topología desconocida: {topology}")
+    num_cities = len(distance_matrix)
+    cities_names = [i for i in range(num_cities)]
+    entropy = np.random.SeedSequence(seed).entropy
+    rng = np.random.default_rng(np.random.SeedSequence(entropy))
+    options = dict(population_size=population_size,
+                   crossover_rate=crossover_rate,
+                   mutation_rate=mutation_rate,
+                   crossover_method=crossover_method,
+                   mutation_method=mutation_method,
+                   selection_method=selection_method,
+                   tournament_size=tournament_size)
+
+    state = random.getstate()
+    try:
+        # Poblaciones iniciales, como en run_ga (mezcladas, y la primera
+        # seleccion es la propia poblacion)
+        arrays = {
+            "population": np.empty((n_islands, population_size, num_cities), dtype=np.int32),
+            "population_dist": np.empty((n_islands, population_size)),
+            "selected_size": np.full(n_islands, population_size, dtype=np.int64),
+        }
+        for island in range(n_islands):
+            random.seed(island_seed(entropy, (island,)))
+            population = np.array(initial_population(cities_names, population_size), dtype=np.int32)
+            population, population_dist = shuffle_population(population, population_lengths(population, distance_matrix))
+            arrays["population"][island] = population
+            arrays["population_dist"][island] = population_dist
+        arrays["selected"] = arrays["population"].copy()
+        arrays["selected_dist"] = arrays["population_dist"].copy()
+
+        epochs = [min(migration_every, numGenerations - start) for start in range(0, numGenerations, migration_every)]
+
+        if n_workers is None or n_workers <= 1:
+            for epoch, generations in enumerate(epochs):
+                best = min(
+                    evolve_island(arrays, distance_matrix, island, island_seed(entropy, (epoch, island)), generations, options)
+                    for island in range(n_islands)
+                )
+                print(f"Generation {epoch * migration_every + generations}: {best}")
+                if epoch + 1 < len(epochs):
+                    migrate(arrays, n_migrants, topology, rng)
+            individuals = final_individuals(arrays)
+        else:
+            oracle = distance_matrix if isinstance(distance_matrix, OraculoDistancia) else None
+            if oracle is None:
+                arrays["distances"] = distance_matrix
+            shared = ArreglosCompartidos(**arrays)
+            try:
+                arrays = shared.arrays
+                with ProcessPoolExecutor(n_workers, initializer=_init_island_worker, initargs=(shared.specs, oracle)) as executor:
+                    for epoch, generations in enumerate(epochs):
+                        tasks = [(island, island_seed(entropy, (epoch, island)), generations, options) for island in range(n_islands)]
+                        best = min(executor.map(_evolve_island_task, tasks))
+                        print(f"Generation {epoch * migration_every + generations}: {best}")
+                        if epoch + 1 < len(epochs):
+                            migrate(arrays, n_migrants, topology, rng)
+                individuals = final_individuals(arrays)
+            finally:
+                # Se sueltan las vistas antes de liberar la memoria compartida
+                arrays = None
+                shared.close()
+    finally:
+        random.setstate(state)
+
+    return individuals
+
+if __name__ == "__main__":
+
+    ##### Parametros del algoritmo genetico
+
+    # Tamaño de la poblacion
+    population_size = [100, 500, 1000]
+    # Tasa de cruce, es decir, la proporcion de individuos seleccionados de la poblacion
+    # en cada generacion para el cruce
+    crossover_rate = [0.5, 0.7, 0.9]
+    # Tasa de mutacion, es decir, la probabilidad de que ocurra una mutacion
+    mutation_rate = [0.2, 0.4, 0.6]
+    # Numero de generaciones, es decir, el numero de iteraciones del algoritmo genetico
+    numGenerations = [200]
+
+    crossover_method = "pmx"
+
+    mutation_method = "inversion"
+
+    # Modelo de islas (ver island_ga): con n_islands > 1 se evolucionan
+    # n_islands poblaciones de population_size individuos, cada una en su
+    # proceso, que intercambian sus mejores individuos cada migration_every
+    # generaciones
+    n_islands = 1
+    migration_every = 10
+    topology = "ring"
+
+    # Nombres de algunos de los problemas TSP disponibles
+    cities_names = [
+        "berlin52",
+        "ch130",
+        "tsp225",
+        "pcb442",
+        "pr1002",
+        "pr2392",
+        "eg7146",
+        "gr9882",
+        "it16862",
+        "vm22775",
+        "rbz43748",
+        "sra104815"]
+
+    # Ciclo para obtener los datos de las ciudades y ejecutar el algoritmo genetico
+    # Se ejecuta el algoritmo genetico para las primeras 5 ciudades de la lista cities_names
+    for i in range(len(cities_names)):
+        # Se obtienen las coordenadas de las ciudades
+        cities_coords = obtener_ciudades(f"../../doc/Benchmarks/{cities_names[i]}.tsp")
+
+        # Se crea el archivo txt donde se almacenaran los resultados
+        # de la ciudad, si ya existe, se sobreescribe
+        with open(f"./solutions/{cities_names[i]}_{crossover_method}_{mutation_method}.txt", "w") as text_file:
+            text_file.write(f"Running GA with {cities_names[i]} data \n\n")
+
+        # Se calcula la matriz de distancias
+        distance_matrix = cargar_matriz_distancias(f"../../doc/Benchmarks/{cities_names[i]}.tsp", cities_coords)
+
+        # Guardar imagenes de la mejor solucion cada 10 generaciones
+        # Las imagenes se guardan actualmente en la carpeta de imagenes
+        # ubicada en el directorio del proyecto
+        save_every_10_gen = False
     
-    # Se ejecuta para cada ciudad el algoritmo genetico con los parametros especificados
-    iter = 1
-    for j in range(len(population_size)):
-        for k in range(len(crossover_rate)):
-            for l in range(len(mutation_rate)):
-                for m in range(len(numGenerations)):
-                    print(f"\nRunning GA for {cities_names[i]} (iter {iter}/{len(population_size)*len(crossover_rate)*len(mutation_rate)*len(numGenerations)})")
-                    print(f"Num generations: {numGenerations[m]}")
-                    print(f"Population size: {population_size[j]}")
-                    print(f"Crossover rate: {crossover_rate[k]}")
-                    print(f"Mutation rate: {mutation_rate[l]}")
+        # Se ejecuta para cada ciudad el algoritmo genetico con los parametros especificados
+        iter = 1
+        for j in range(len(population_size)):
+            for k in range(len(crossover_rate)):
+                for l in range(len(mutation_rate)):
+                    for m in range(len(numGenerations)):
+                        print(f"\nRunning GA for {cities_names[i]} (iter {iter}/{len(population_size)*len(crossover_rate)*len(mutation_rate)*len(numGenerations)})")
+                        print(f"Num generations: {numGenerations[m]}")
+                        print(f"Population size: {population_size[j]}")
+                        print(f"Crossover rate: {crossover_rate[k]}")
+                        print(f"Mutation rate: {mutation_rate[l]}")
                     
-                    ga_solution = run_ga(cities_coords, 
-                                        distance_matrix, 
-                                        population_size[j],
-                                        numGenerations[m], 
-                                        crossover_rate[k], 
-                                        mutation_rate[l], 
-                                        save_every_10_gen,
-                                        crossover_method,
-                                        mutation_method)
-
-                    # Al finalizar el algoritmo genetico, se tiene una poblacion de soluciones
-                    # Se calcula la distancia total de cada solucion y se selecciona la mejor
-                    population_dist = []
-                    for z in range(population_size[j]):
-                        population_dist.append(calculate_total_distance(ga_solution[z],distance_matrix))
-
-                    index_minimum = np.argmin(population_dist)
-                    shortest_path = ga_solution[index_minimum]
-                    minimum_distance = min(population_dist)
-
-                    # Se escribe la informacion de la mejor solucion en un archivo txt
-                    with open(f"./solutions/{cities_names[i]}_{crossover_method}_{mutation_method}.txt", "a") as text_file:
-                        text_file.write(f"num_generations = {numGenerations[m]}\n")
-                        text_file.write(f"population_size = {population_size[j]}\n")
-                        text_file.write(f"crossover_rate = {crossover_rate[k]}\n")
-                        text_file.write(f"mutation_rate = {mutation_rate[l]}\n")
-                        text_file.write(f"minimum_distance = {minimum_distance}\n")
-                        text_file.write(f"avg_distance = {np.mean(population_dist)}\n")
-                        text_file.write("---------------------------------------------\n\n")
-                    print(f"saved solution data in ./solutions/{cities_names[i]}_{crossover_method}_{mutation_method}.txt")
-
-                    # Mostrar el grafico de la mejor obtenida por el algoritmo genetico
-                    show_best_route = False
-                    shortest_path.append(shortest_path[0])
-                    #plot_path(cities_coords,shortest_path, minimum_distance, f"{cities_names[i]}_gen{numGenerations[m]}_ps{population_size[j]}_cr{crossover_rate[k]}_mr{mutation_rate[l]}",show_best_route)
-                    #print(f"saved {cities_names[i]} best route graph in ../../img/genetic-algorithm/{cities_names[i]}_gen{numGenerations[m]}_ps{population_size[j]}_cr{crossover_rate[k]}_mr{mutation_rate[l]}.png")
-                    iter += 1
\ No newline at end of file
+                        if n_islands > 1:
+                            ga_solution = island_ga(distance_matrix,
+                                                    population_size[j],
+                                                    numGenerations[m],
+                                                    crossover_rate[k],
+                                                    mutation_rate[l],
+                                                    n_islands=n_islands,
+                                                    migration_every=migration_every,
+                                                    topology=topology,
+                                                    crossover_method=crossover_method,
+                                                    mutation_method=mutation_method,
+                                                    n_workers=n_islands)
+                        else:
+                            ga_solution = run_ga(cities_coords, 
+                                                distance_matrix, 
+                                                population_size[j],
+                                                numGenerations[m], 
+                                                crossover_rate[k], 
+                                                mutation_rate[l], 
+                                                save_every_10_gen,
+                                                crossover_method,
+                                                mutation_method)
+
+                        # Al finalizar el algoritmo genetico, se tiene una poblacion de soluciones
+                        # Se calcula la distancia total de cada solucion y se selecciona la mejor
+                        population_dist = population_lengths(ga_solution, distance_matrix)
+
+                        index_minimum = np.argmin(population_dist)
+                        shortest_path = ga_solution[index_minimum]
+                        minimum_distance = population_dist[index_minimum]
+
+                        # Se escribe la informacion de la mejor solucion en un archivo txt
+                        with open(f"./solutions/{cities_names[i]}_{crossover_method}_{mutation_method}.txt", "a") as text_file:
+                            text_file.write(f"num_generations = {numGenerations[m]}\n")
+                            text_file.write(f"population_size = {population_size[j]}\n")
+                            text_file.write(f"crossover_rate = {crossover_rate[k]}\n")
+                            text_file.write(f"mutation_rate = {mutation_rate[l]}\n")
+                            text_file.write(f"minimum_distance = {minimum_distance}\n")
+                            text_file.write(f"avg_distance = {np.mean(population_dist)}\n")
+                            text_file.write("---------------------------------------------\n\n")
+                        print(f"saved solution data in ./solutions/{cities_names[i]}_{crossover_method}_{mutation_method}.txt")
+
+                        # Mostrar el grafico de la mejor obtenida por el algoritmo genetico
+                        show_best_route = False
+                        shortest_path.append(shortest_path[0])
+                        #plot_path(cities_coords,shortest_path, minimum_distance, f"{cities_names[i]}_gen{numGenerations[m]}_ps{population_size[j]}_cr{crossover_rate[k]}_mr{mutation_rate[l]}",show_best_route)
+                        #print(f"saved {cities_names[i]} best route graph in ../../img/genetic-algorithm/{cities_names[i]}_gen{numGenerations[m]}_ps{population_size[j]}_cr{crossover_rate[k]}_mr{mutation_rate[l]}.png")
+                        iter += 1
\ No newline at end of file
@@ -1,7 +1,9 @@
 import random
 import math
+from heuristic.local_search_engine import local_search as improve_tour
+from utils.indice_espacial import candidatos_como_listas
 
-def grasp(distance_matrix, city, alpha=0.5):
+def grasp(distance_matrix, city, alpha=0.5, candidates=None, neighbourhood="2opt"):
     """
     Implementación del algoritmo GRASP para el problema del agente viajero (TSP).
 
@@ -12,6 +14,11 @@ def grasp(distance_matrix, city, alpha=0.5):
     max_iterations (int): Número máximo de iteraciones de GRASP.
     alpha (float): Parámetro que controla la aleatoriedad de la construcción voraz (0 <= alpha <= 1).
     show_iterations (bool): Si True, muestra las iteraciones de la búsqueda local.
+    candidates (np.ndarray / lista de listas, opcional): Listas de candidatos de cada
+                           nodo (ver utils/indice_espacial.py), restringen la RCL
+                           y los intercambios de la búsqueda local.
+    neighbourhood (str): Vecindario de la búsqueda local: "2opt" (por defecto),
+                         "or_opt", "2opt+or_opt", "3opt" o "lk" (Lin-Kernighan).
 
     Retorna:
     --------
@@ -23,13 +30,14 @@ def grasp(distance_matrix, city, alpha=0.5):
     best_distance = float('inf')
     best_tour = None
     max_iterations= 50
+    candidates = candidatos_como_listas(candidates)
     
     for _ in range(max_iterations):
         # Construcción voraz aleatorizada
-        distance, tour = greedy_randomized_construction(distance_matrix, city, alpha)
+        distance, tour = greedy_randomized_construction(distance_matrix, city, alpha, candidates)
         
-        # Búsqueda local (2-opt)
-        current_distance, current_tour = local_search(distance_matrix, distance, tour)
+        # Búsqueda local (2-opt por defecto)
+        current_distance, current_tour = local_search(distance_matrix, distance, tour, candidates, neighbourhood)
         
         # Actualizar la mejor solución encontrada
         if current_distance < best_distance:
@@ -38,7 +46,7 @@ def grasp(distance_matrix, city, alpha=0.5):
     
     return best_distance, best_tour
 
-def greedy_randomized_construction(distance_matrix, city, alpha):
+def greedy_randomized_construction(distance_matrix, city, alpha, candidates=None):
     """
     Construcción voraz aleatorizada para generar una solución inicial.
 
@@ -47,6 +55,9 @@ def greedy_randomized_construction(distance_matrix, city, alpha):
     distance_matrix ([[int/float]]): Matriz de distancias entre los nodos del problema.
     city (list): Lista de nombres o identificadores de las ciudades o nodos.
     alpha (float): Parámetro que controla la aleatoriedad de la construcción voraz (0 <= alpha <= 1).
+    candidates (lista de listas, opcional): Listas de candidatos de cada nodo. Si se dan,
+                   la RCL se construye con los candidatos no visitados de la ciudad
+                   actual y solo se usan todas las ciudades restantes si no queda ninguno.
 
     Retorna:
     --------
@@ -57,10 +68,15 @@ def greedy_randomized_construction(distance_matrix, city, alpha):
 
     remaining_cities = [i for i in range(1, n)] # Lista de ciudades restantes
     tour = [0]  # Inicializar la ruta con la primera ciudad
+    visited = [False] * n
+    visited[0] = True
 
     while remaining_cities:
         #Obtenemos la lista RCL
-        candidate_list = restricted_candidate_list(distance_matrix, city, tour[-1], remaining_cities, alpha)
+        options = remaining_cities
+        if candidates is not None:
+            options = [c for c in candidates[tour[-1]] if not visited[c]] or remaining_cities
+        candidate_list = restricted_candidate_list(distance_matrix, city, tour[-1], options, alpha)
 
         #Escojemos un candidato aleatorio
         next_city = random.choice(candidate_list)
@@ -68,6 +84,7 @@ def greedy_randomized_construction(distance_matrix, city, alpha):
         # Agregamos a nuestra solucion y elimnamos de los de los posibles candidatos
         tour.append(next_city)
         remaining_cities.remove(next_city)
+        visited[next_city] = True
         
     tour.append(0)
     distancia_total = sum(distance_matrix[tour[i]][tour[i + 1]] for i in range(n))
@@ -90,60 +107,24 @@ def restricted_candidate_list(distance_matrix, city, current_index, remaining_ci
     list: La lista restringida de candidatos (RCL).
     """
     
-    n = len(distance_matrix)
-
-    distances = [0] * n 
-    for c in remaining_cities:
-        distances[c] = distance_matrix[current_index][c] 
+    distances = [distance_matrix[current_index][c] for c in remaining_cities]
 
-    min_distance = min([d for d in distances if d != 0])
+    min_distance = min(distances)
     max_distance = max(distances)
     # print(remaining_cities)
     bias = min_distance + alpha * (max_distance - min_distance)
 
     rcl = []
 
-    for i, d in enumerate(distances):
-        if d <= bias and d != 0:
-            rcl.append(i)
+    for c, d in zip(remaining_cities, distances):
+        if d <= bias:
+            rcl.append(c)
 
     return rcl
 
-def local_search(distance_matrix, distance, tour):
-
-    n = len(distance_matrix)
-   
-    improved = True
-    itr = 0
-    while improved:
-
-        improved = False
-        for i in range(n):
-            for j in range(i + 1, n):
-                # Obtener los dos bordes actuales de la ruta
-                cur1 = (tour[i], tour[(i + 1) % n])
-                cur2 = (tour[j], tour[(j + 1) % n])
-                cur_length = (
-                    distance_matrix[tour[i]][tour[(i + 1) % n]]
-                    + distance_matrix[tour[j]][tour[(j + 1) % n]]
-                )
-
-                # Obtener los dos 'nuevos' bordes para la ruta
-                new1 = (tour[i], tour[j])
-                new2 = (tour[(i + 1) % n], tour[(j + 1) % n])
-                new_length = (
-                    distance_matrix[tour[i]][tour[j]]
-                    + distance_matrix[tour[(i + 1) % n]][tour[(j + 1) % n]]
-                )
-
-                # Actualizar la ruta, si se mejora
-                if new_length < cur_length:
-                    # print(f"Intercambiando bordes {cur1} y {cur2} por {new1} y {new2}")
-                    tour[i + 1 : j + 1] = tour[i + 1 : j + 1][::-1]
-                    improved = True
-
-                itr += 1
-    # Calcular la distancia total de la ruta
-    distancia_total = sum(distance_matrix[tour[i]][tour[i + 1]] for i in range(n))
-
-    return distancia_total, tour
+def local_search(distance_matrix, distance, tour, candidates=None, neighbourhood="2opt"):
+    """
+    Mejora la ruta construida con el motor de búsqueda local común
+    (ver heuristic/local_search_engine.py).
+    """
+    return improve_tour(distance_matrix, tour, neighbourhood, candidates)
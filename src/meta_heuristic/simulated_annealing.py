@@ -1,9 +1,15 @@
 import random
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 
 import sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..')) 
-from utils.calcular_distancia import calcular_distancia, calculate_total_distance
+from utils.calcular_distancia import calculate_total_distance, OraculoDistancia
+from utils.indice_espacial import obtener_candidatos
+from utils.memoria_compartida import ArreglosCompartidos, conectar
+from utils.cache_distancias import cargar_matriz_distancias
 from utils.leer_archivo import obtener_ciudades
 from utils.graficar import plot_path
 
@@ -12,6 +18,26 @@ from heuristic.greedy import greedy_insertion
 from heuristic.nearest_neighbour import nearest_neighbour
 from heuristic.two_opt import two_opt_local_search
 from heuristic.double_bridge import iterative_local_search
+from heuristic.local_search_engine import EPSILON, K_CANDIDATOS, finish, make_2opt_move, prepare
+
+# Probabilidad de que la ciudad propuesta para un movimiento sea un candidato
+# de la primera (el resto de las veces es una ciudad al azar, para que
+# cualquier movimiento sea alcanzable)
+PROB_CANDIDATO = 0.9
+
+# Iteraciones máximas entre actualizaciones de la temperatura (y consultas
+# del reloj). Con max_iterations se usa max_iterations // NIVELES_TEMPERATURA
+# si es menor, para que la búsqueda tenga al menos NIVELES_TEMPERATURA
+# temperaturas distintas
+BLOQUE_TEMPERATURA = 1000
+NIVELES_TEMPERATURA = 100
+
+# Cociente por defecto entre la temperatura final y la inicial
+COCIENTE_TEMPERATURA = 1e-3
+
+# Cociente mínimo entre la temperatura final y la inicial: por debajo la
+# búsqueda ya es voraz, y evita que la temperatura llegue a 0
+COCIENTE_TEMPERATURA_MINIMO = 1e-12
 
 
 def simulated_annealing(distance_matrix, initial_solution, initial_temperature, cooling_rate, max_iterations):
@@ -75,8 +101,258 @@ def simulated_annealing(distance_matrix, initial_solution, initial_temperature,
 
     return best_solution, best_distance
 
-def run_sa(algorithm, distance_matrix, cities_names, initial_temperature, cooling_rate, max_iterations):
+def delta_simulated_annealing(distance_matrix, initial_solution, initial_temperature=None, final_temperature=None,
+                              max_iterations=None, time_limit=None, or_opt_probability=0.5, candidates=None, seed=None):
+    """
+    Simulated Annealing con movimientos 2-opt y Or-opt evaluados en O(1).
+
+    Cada iteración propone un movimiento y calcula su costo solo con las
+    aristas que cambian; si se acepta, se aplica en el lugar sobre la ruta
+    (un Tour o una TwoLevelList, ver heuristic/local_search_engine.prepare),
+    sin copiarla ni recalcular su distancia (ver AnnealingChain).
+
+    La temperatura baja geométricamente de initial_temperature a
+    final_temperature según el avance de la búsqueda, que es la fracción de
+    max_iterations realizadas o de time_limit transcurrido (la mayor de las
+    dos si se dan ambas):
+        T = T0 * (Tf / T0) ** avance
+    La temperatura se actualiza cada BLOQUE_TEMPERATURA movimientos, o cada
+    max_iterations // NIVELES_TEMPERATURA si es menor. final_temperature no
+    baja de initial_temperature * COCIENTE_TEMPERATURA_MINIMO.
+
+    Parámetros:
+    ----------
+    distance_matrix (lista de listas de floats / np.ndarray / OraculoDistancia): Distancias entre ciudades.
+    initial_solution (lista de ints): Solucion inicial al problema del TSP, abierta o cerrada.
+    initial_temperature (float, opcional): Temperatura inicial. Por defecto
+                        se estima para aceptar la mitad de los movimientos que
+                        empeoran la solución inicial. Con un valor <= 0 solo
+                        se aceptan los movimientos que no empeoran la ruta.
+    final_temperature (float, opcional): Temperatura final. Por defecto
+                        initial_temperature * COCIENTE_TEMPERATURA.
+    max_iterations (int, opcional): Numero maximo de movimientos propuestos.
+    time_limit (float, opcional): Tiempo maximo de ejecucion, en segundos.
+    or_opt_probability (float): Probabilidad de proponer un movimiento Or-opt en lugar de uno 2-opt.
+    candidates (np.ndarray / lista de listas, opcional): Listas de candidatos de cada ciudad.
+    seed (int, opcional): Semilla del generador aleatorio.
+
+    Returns:
+    ------
+    best_solution (lista de ints): Mejor ruta encontrada, con la misma ciudad
+                                   inicial y forma (abierta o cerrada) que initial_solution.
+    best_distance (float): Distancia total de la mejor solucion encontrada.
+    """
+    if max_iterations is None and time_limit is None:
+        raise ValueError("Se debe indicar max_iterations o time_limit")
+
+    rng = random.Random(seed)
+    d, candidates, structure, closed, start = prepare(distance_matrix, initial_solution, candidates)
+    chain = AnnealingChain(structure, d, candidates, rng, or_opt_probability)
+
+    if initial_temperature is None:
+        initial_temperature = estimate_temperature(structure, d, candidates, rng)
+    if final_temperature is None:
+        final_temperature = initial_temperature * COCIENTE_TEMPERATURA
+    ratio = 1.0
+    if initial_temperature > 0:
+        ratio = max(final_temperature / initial_temperature, COCIENTE_TEMPERATURA_MINIMO)
+
+    max_block = BLOQUE_TEMPERATURA
+    if max_iterations is not None:
+        max_block = max(1, min(max_block, max_iterations // NIVELES_TEMPERATURA))
+
+    iteration = 0
+    start_time = time.perf_counter()
+    while True:
+        progress = 0.0
+        if max_iterations is not None:
+            progress = iteration / max_iterations
+        if time_limit is not None:
+            progress = max(progress, (time.perf_counter() - start_time) / time_limit)
+        if progress >= 1:
+            break
+
+        block = max_block
+        if max_iterations is not None:
+            block = min(block, max_iterations - iteration)
+        iteration += block
+        chain.run(initial_temperature * ratio ** progress, block)
+
+    best_distance, best_solution = finish(d, chain.best_structure(len(distance_matrix)), closed, start)
+    return best_solution, best_distance
+
+class AnnealingChain:
+    """
+    Cadena de Metropolis sobre una ruta con movimientos 2-opt y Or-opt.
+
+    Cada movimiento propuesto (ver propose_2opt y propose_or_opt) se evalúa
+    en O(1) con las aristas que cambian y, si se acepta, se aplica en el
+    lugar sobre structure. La distancia actual se actualiza con la
+    diferencia de cada movimiento. La mejor ruta solo se copia cuando la
+    ruta actual deja de serlo.
+
+    Parámetros:
+    ----------
+    structure (Tour / TwoLevelList): Ruta inicial, se modifica en el lugar.
+    d (function): Función de distancia d(i, j).
+    candidates (lista de listas): Candidatos de cada ciudad.
+    rng (random.Random): Generador aleatorio.
+    or_opt_probability (float): Probabilidad de proponer un movimiento Or-opt en lugar de uno 2-opt.
+    """
+
+    def __init__(self, structure, d, candidates, rng, or_opt_probability=0.5):
+        self.structure = structure
+        self.d = d
+        self.candidates = candidates
+        self.rng = rng
+        self.or_opt_probability = or_opt_probability
+        self.distance = finish(d, structure, False, None)[0]
+        self.best_distance = self.distance
+        self._best_order = None
+        self._current_is_best = True
+
+    def run(self, temperature, n_moves):
+        """
+        Propone n_moves movimientos a temperatura constante. Con
+        temperature <= 0 solo acepta los que no empeoran la ruta.
+        """
+        structure, d, candidates, rng = self.structure, self.d, self.candidates, self.rng
+        n = len(structure)
+        propose = (propose_2opt, propose_or_opt)
+        or_opt_probability = self.or_opt_probability
+        current_distance = self.distance
+        best_distance = self.best_distance
+        current_is_best = self._current_is_best
+
+        for _ in range(n_moves):
+            move = propose[rng.random() < or_opt_probability](structure, d, candidates, n, rng)
+            if move is None:
+                continue
+            delta, moves = move
+
+            # Criterio de Metropolis
+            if delta > 0 and (temperature <= 0 or rng.random() >= math.exp(-delta / temperature)):
+                continue
+
+            if delta > 0 and current_is_best:
+                # La ruta actual deja de ser la mejor: se guarda antes de cambiarla
+                self._best_order = structure.tolist()
+                current_is_best = False
+            for a, b, c, e in moves:
+                make_2opt_move(structure, a, b, c, e)
+            current_distance += delta
+            if current_distance < best_distance - EPSILON:
+                best_distance = current_distance
+                current_is_best = True
+
+        self.distance = current_distance
+        self.best_distance = best_distance
+        self._current_is_best = current_is_best
+
+    def best_order(self):
+        """
+        Ciudades de la mejor ruta encontrada, como lista.
+        """
+        return self.structure.tolist() if self._current_is_best else list(self._best_order)
+
+    def best_structure(self, num_cities):
+        """
+        La mejor ruta con la misma representación que structure (la misma
+        estructura si la ruta actual es la mejor).
+        """
+        if self._current_is_best:
+            return self.structure
+        return type(self.structure)(self._best_order, num_cities)
+
+def propose_2opt(structure, d, candidates, n, rng):
+    """
+    Propone un movimiento 2-opt al azar: elimina (a, b) y (c, e) y agrega
+    (a, c) y (b, e), con b y e los sucesores (o los predecesores) de a y c.
+
+    Returns:
+    ------
+    tuple / None: (delta, [(a, b, c, e)]) o None si el movimiento no es válido.
+    """
+    a = int(rng.random() * n)
+    c = random_partner(candidates, a, n, rng)
+    if rng.random() < 0.5:
+        b, e = structure.next(a), structure.next(c)
+    else:
+        b, e = structure.prev(a), structure.prev(c)
+    if c == a or c == b or e == a:
+        return None
+    return d(a, c) + d(b, e) - d(a, b) - d(c, e), [(a, b, c, e)]
+
+def propose_or_opt(structure, d, candidates, n, rng, max_segment=3):
+    """
+    Propone un movimiento Or-opt al azar: el segmento de 1 a max_segment
+    ciudades que empieza en a se reubica junto a la ciudad x, en la
+    orientación más barata de las dos (ver local_search_engine.or_opt_move).
+
+    Returns:
+    ------
+    tuple / None: (delta, movimientos 2-opt) o None si el movimiento no es válido.
+    """
+    if n < max_segment + 5:
+        return None
+    a = int(rng.random() * n)
+    x = random_partner(candidates, a, n, rng)
+    if rng.random() < 0.5:
+        succ, pred = structure.next, structure.prev
+    else:
+        succ, pred = structure.prev, structure.next
+
+    p = pred(a)
+    s_last = a
+    for _ in range(int(rng.random() * max_segment)):
+        s_last = succ(s_last)
+        if s_last == x:
+            return None
+    q = succ(s_last)
+    if x == a or x == p or x == q:
+        return None
+    removal_gain = d(p, a) + d(s_last, q) - d(p, q)
+    d_ax = d(a, x)
 
+    # Sin invertir: x, a, ..., s_last, e
+    e = succ(x)
+    forward = d_ax + d(s_last, e) - d(x, e) - removal_gain if e != p else math.inf
+    # Invertido: c, s_last, ..., a, x
+    c = pred(x)
+    backward = d_ax + d(c, s_last) - d(c, x) - removal_gain
+    if forward <= backward:
+        return forward, [(p, a, x, e), (p, x, q, s_last), (x, s_last, a, e)]
+    return backward, [(p, a, c, x), (p, c, q, s_last)]
+
+def random_partner(candidates, a, n, rng):
+    # Un candidato de a al azar o, con probabilidad 1 - PROB_CANDIDATO, una
+    # ciudad cualquiera
+    options = candidates[a]
+    if options and rng.random() < PROB_CANDIDATO:
+        return options[int(rng.random() * len(options))]
+    return int(rng.random() * n)
+
+def estimate_temperature(structure, d, candidates, rng, samples=1000, acceptance=0.5):
+    """
+    Temperatura con la que un movimiento promedio que empeora la ruta se
+    acepta con probabilidad acceptance, estimada con movimientos 2-opt al azar.
+    """
+    n = len(structure)
+    uphill = []
+    for _ in range(samples):
+        move = propose_2opt(structure, d, candidates, n, rng)
+        if move is not None and move[0] > 0:
+            uphill.append(move[0])
+    if not uphill:
+        return 1.0
+    return -(sum(uphill) / len(uphill)) / math.log(acceptance)
+
+def build_initial_solution(algorithm, distance_matrix, cities_names):
+    """
+    Solucion inicial para Simulated Annealing generada con la heuristica indicada:
+    "random", "greedy", "nearest_neighbour", "two_opt_nn", "two_opt_greedy",
+    "double_bridge_nn", "double_bridge_greedy" o "double_bridge_random".
+    """
     if algorithm == "random":
         _, initial_solution = random_tour(distance_matrix, cities_names, False)
     elif algorithm == "greedy":
@@ -100,6 +376,40 @@ def run_sa(algorithm, distance_matrix, cities_names, initial_temperature, coolin
         _, initial_solution = iterative_local_search(distance_matrix, initial_solution,random_tour, False,0)
     else:
         raise ValueError("Algoritmo no válido")
+    return initial_solution
+
+def run_sa(algorithm, distance_matrix, cities_names, initial_temperature, cooling_rate, max_iterations, engine="delta", time_limit=None, seed=None):
+    """
+    Simulated Annealing partiendo de la solucion inicial del algoritmo dado
+    (ver build_initial_solution).
+
+    Con engine="delta" (por defecto) se usa delta_simulated_annealing con
+    final_temperature = initial_temperature * cooling_rate ** max_iterations,
+    la temperatura a la que llega simulated_annealing (la temperatura se
+    actualiza por bloques de movimientos, no en cada uno). Si se da
+    time_limit, la búsqueda también termina al agotarlo; si solo se da
+    time_limit, la temperatura baja según el tiempo transcurrido hasta
+    initial_temperature * COCIENTE_TEMPERATURA. Con engine="swap" se usa
+    simulated_annealing (intercambios de ciudades evaluados en O(n)), que
+    requiere max_iterations.
+    """
+    if engine == "swap" and max_iterations is None:
+        raise ValueError("El motor swap requiere max_iterations")
+    initial_solution = build_initial_solution(algorithm, distance_matrix, cities_names)
+
+    if engine == "delta":
+        final_temperature = None
+        if initial_temperature is not None and max_iterations is not None:
+            final_temperature = initial_temperature * cooling_rate ** max_iterations
+        return delta_simulated_annealing(distance_matrix,
+                                         initial_solution,
+                                         initial_temperature,
+                                         final_temperature,
+                                         max_iterations,
+                                         time_limit,
+                                         seed=seed)
+    if engine != "swap":
+        raise ValueError(f"Motor no válido: {engine}")
 
     best_solution, best_distance = simulated_annealing(distance_matrix, 
                                                        initial_solution, 
@@ -108,62 +418,250 @@ def run_sa(algorithm, distance_matrix, cities_names, initial_temperature, coolin
                                                        max_iterations)
     return best_solution, best_distance
 
-cities_names = [
-    "berlin52",
-    "ch130",
-    "tsp225",
-    "pcb442",
-    "pr1002",
-    "pr2392",
-    "eg7146",
-    "gr9882",
-    "it16862",
-    "vm22775",
-    "rbz43748",
-    "sra104815"]
-
-algorithms = ["random", 
-              "greedy",  
-              "nearest_neighbour",
-              "two_opt_nn",
-              "two_opt_greedy",
-              "double_bridge_nn",
-              "double_bridge_greedy",
-              "double_bridge_random"]
-
-for i in range(5):
+def run_parallel_tempering(algorithm, distance_matrix, cities_names, n_replicas=4, **kwargs):
+    """
+    parallel_tempering partiendo de la solucion inicial de run_sa para el
+    algoritmo dado (ver build_initial_solution). kwargs se pasa a parallel_tempering.
+    """
+    initial_solution = build_initial_solution(algorithm, distance_matrix, cities_names)
+    return parallel_tempering(distance_matrix, initial_solution, n_replicas, **kwargs)
+
+def parallel_tempering(distance_matrix, initial_solution, n_replicas=4, min_temperature=None, max_temperature=None,
+                       exchange_every=10000, max_iterations=None, time_limit=None, n_workers=None,
+                       or_opt_probability=0.5, k=K_CANDIDATOS, seed=None):
+    """
+    Simulated Annealing con intercambio de réplicas (parallel tempering).
+
+    n_replicas cadenas de Metropolis (ver AnnealingChain) corren a
+    temperatura constante, una por cada escalón de una escala geométrica
+    entre min_temperature y max_temperature. Cada exchange_every movimientos
+    las réplicas en escalones vecinos intercambian sus temperaturas con
+    probabilidad min(1, exp((1/Ti - 1/Tj) * (Ei - Ej))), alternando los pares
+    pares e impares; así las rutas buenas bajan hacia las temperaturas frías
+    y las frías pueden escapar de sus óptimos locales subiendo.
+
+    Con n_workers > 1 las réplicas de cada ronda se reparten entre los
+    procesos de un ProcessPoolExecutor. Las rutas actuales y las mejores de
+    cada réplica (y la matriz de distancias) viven en memoria compartida
+    (ver utils/memoria_compartida.py): las tareas solo llevan el número de
+    réplica, su temperatura y su semilla, y cada réplica usa un generador con
+    SeedSequence(entropy, spawn_key=(ronda, réplica)), por lo que el
+    resultado no depende de la cantidad de procesos. El intercambio de
+    temperaturas no mueve ninguna ruta.
+
+    Parámetros:
+    ----------
+    distance_matrix (lista de listas de floats / np.ndarray / OraculoDistancia): Distancias entre ciudades.
+    initial_solution (lista de ints): Solucion inicial de todas las réplicas, abierta o cerrada.
+    n_replicas (int): Cantidad de réplicas.
+    min_temperature (float, opcional): Temperatura de la réplica más fría. Por
+                    defecto max_temperature * COCIENTE_TEMPERATURA.
+    max_temperature (float, opcional): Temperatura de la réplica más caliente.
+                    Por defecto se estima como en delta_simulated_annealing.
+    exchange_every (int): Movimientos de cada réplica entre intercambios.
+    max_iterations (int, opcional): Movimientos máximos de cada réplica.
+    time_limit (float, opcional): Tiempo maximo de ejecucion, en segundos.
+    n_workers (int, opcional): Cantidad de procesos. Con None o 1 las réplicas
+                               corren en este proceso.
+    or_opt_probability (float): Probabilidad de proponer un movimiento Or-opt en lugar de uno 2-opt.
+    k (int): Cantidad de candidatos por ciudad.
+    seed (int, opcional): Semilla.
+
+    Returns:
+    ------
+    best_solution (lista de ints): Mejor ruta encontrada por todas las réplicas,
+                                   con la misma ciudad inicial y forma que initial_solution.
+    best_distance (float): Distancia total de la mejor solucion encontrada.
+    """
+    if max_iterations is None and time_limit is None:
+        raise ValueError("Se debe indicar max_iterations o time_limit")
+
+    entropy = np.random.SeedSequence(seed).entropy
+    rng = random.Random(entropy)
+    candidates = obtener_candidatos(distance_matrix, k)
+    d, candidate_lists, structure, closed, start = prepare(distance_matrix, initial_solution, candidates)
+    if max_temperature is None:
+        max_temperature = estimate_temperature(structure, d, candidate_lists, rng)
+    if min_temperature is None:
+        min_temperature = max_temperature * COCIENTE_TEMPERATURA
+    if n_replicas > 1:
+        ratio = (max_temperature / min_temperature) ** (1 / (n_replicas - 1))
+        ladder = [min_temperature * ratio ** i for i in range(n_replicas)]
+    else:
+        ladder = [min_temperature]
+
+    order = np.asarray(structure.tolist(), dtype=np.int32)
+    arrays = {
+        "tours": np.tile(order, (n_replicas, 1)),
+        "best_tours": np.tile(order, (n_replicas, 1)),
+        "candidates": candidates,
+    }
+    oracle = None
+    if isinstance(distance_matrix, OraculoDistancia):
+        # El oraculo solo guarda las coordenadas: se envia una vez a cada proceso
+        oracle = distance_matrix
+    else:
+        arrays["distances"] = np.asarray(distance_matrix, dtype=np.float64)
+
+    # slot[r]: escalón de la escala de temperaturas de la réplica r
+    slot = list(range(n_replicas))
+    energy = [finish(d, structure, False, None)[0]] * n_replicas
+    best_distances = list(energy)
+
+    # La memoria compartida y los procesos se crean dentro del try para que
+    # se liberen aunque falle el inicio del pool o de un proceso
+    shared = executor = None
+    try:
+        if n_workers is not None and n_workers > 1:
+            shared = ArreglosCompartidos(**arrays)
+            arrays = shared.arrays
+            executor = ProcessPoolExecutor(n_workers, initializer=_init_replica_worker, initargs=(shared.specs, oracle))
+            run_round = lambda tasks: list(executor.map(_replica_task, tasks))
+        else:
+            context = _replica_context(arrays, oracle)
+            run_round = lambda tasks: [_run_replica(context, *task) for task in tasks]
+
+        round_number = 0
+        start_time = time.perf_counter()
+        while True:
+            progress = 0.0
+            if max_iterations is not None:
+                progress = round_number * exchange_every / max_iterations
+            if time_limit is not None:
+                progress = max(progress, (time.perf_counter() - start_time) / time_limit)
+            if progress >= 1:
+                break
+
+            n_moves = exchange_every
+            if max_iterations is not None:
+                n_moves = min(n_moves, max_iterations - round_number * exchange_every)
+            tasks = [
+                (r, ladder[slot[r]], n_moves, entropy, (round_number, r), best_distances[r], or_opt_probability)
+                for r in range(n_replicas)
+            ]
+            for r, (current, best) in enumerate(run_round(tasks)):
+                energy[r] = current
+                best_distances[r] = min(best_distances[r], best)
+
+            # Intercambio de temperaturas entre escalones vecinos
+            replica_at = sorted(range(n_replicas), key=lambda r: slot[r])
+            for i in range(round_number % 2, n_replicas - 1, 2):
+                cold, hot = replica_at[i], replica_at[i + 1]
+                exponent = (1 / ladder[i] - 1 / ladder[i + 1]) * (energy[cold] - energy[hot])
+                if exponent >= 0 or rng.random() < math.exp(exponent):
+                    slot[cold], slot[hot] = slot[hot], slot[cold]
+            round_number += 1
+
+        best_replica = min(range(n_replicas), key=lambda r: best_distances[r])
+        best_order = arrays["best_tours"][best_replica].tolist()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if shared is not None:
+            arrays = None
+            shared.close()
+
+    best_distance, best_solution = finish(d, type(structure)(best_order, len(distance_matrix)), closed, start)
+    return best_solution, best_distance
+
+# Contexto de las réplicas en cada proceso de parallel_tempering
+_replica_worker = {}
+
+def _init_replica_worker(specs, oracle):
+    # Inicializador de los procesos: se conecta una vez a la memoria compartida
+    arrays, blocks = conectar(specs)
+    _replica_worker.update(_replica_context(arrays, oracle))
+    _replica_worker["blocks"] = blocks
+
+def _replica_context(arrays, oracle):
+    # Funcion de distancia, listas de candidatos y estructura de la ruta,
+    # preparadas una vez por proceso: cada ronda solo recarga la ruta de la
+    # réplica en la estructura
+    distances = oracle if oracle is not None else arrays["distances"]
+    d, candidates, structure, _, _ = prepare(distances, arrays["tours"][0].tolist(), arrays["candidates"])
+    return {"arrays": arrays, "d": d, "candidates": candidates, "structure": structure}
+
+def _replica_task(task):
+    return _run_replica(_replica_worker, *task)
+
+def _run_replica(context, replica, temperature, n_moves, entropy, spawn_key, best_distance, or_opt_probability):
+    # Una ronda de la réplica: continua su ruta en memoria compartida a
+    # temperatura constante y guarda su mejor ruta si mejora la anterior
+    state = np.random.SeedSequence(entropy, spawn_key=spawn_key).generate_state(2)
+    rng = random.Random(int.from_bytes(state.tobytes(), "little"))
+    arrays = context["arrays"]
+    structure = context["structure"]
+    structure.load(arrays["tours"][replica].tolist())
+    chain = AnnealingChain(structure, context["d"], context["candidates"], rng, or_opt_probability)
+    chain.run(temperature, n_moves)
+
+    arrays["tours"][replica] = structure.tolist()
+    if chain.best_distance < best_distance:
+        arrays["best_tours"][replica] = chain.best_order()
+    return chain.distance, chain.best_distance
+
+if __name__ == "__main__":
+
+    cities_names = [
+        "berlin52",
+        "ch130",
+        "tsp225",
+        "pcb442",
+        "pr1002",
+        "pr2392",
+        "eg7146",
+        "gr9882",
+        "it16862",
+        "vm22775",
+        "rbz43748",
+        "sra104815"]
+
+    algorithms = ["random", 
+                  "greedy",  
+                  "nearest_neighbour",
+                  "two_opt_nn",
+                  "two_opt_greedy",
+                  "double_bridge_nn",
+                  "double_bridge_greedy",
+                  "double_bridge_random"]
+
+    for i in range(5):
     
-    print(f"\nProcesando {cities_names[i]}")
-    cities_coords = obtener_ciudades(f"../../doc/Benchmarks/{cities_names[i]}.tsp")
-    distance_matrix = np.array(calcular_distancia(cities_coords))
-
-    with open(f"./solutions/{cities_names[i]}_SA.txt", "w") as text_file:
-        text_file.write(f"Running SA with {cities_names[i]} data \n\n")
-
-    #initial_temperature = [100, 1000, 5000]
-    initial_temperature = [100]
-    #cooling_rate = [0.8, 0.9, 0.99]
-    cooling_rate = [0.99]
-    max_iterations = 10000
+        print(f"\nProcesando {cities_names[i]}")
+        cities_coords = obtener_ciudades(f"../../doc/Benchmarks/{cities_names[i]}.tsp")
+        distance_matrix = cargar_matriz_distancias(f"../../doc/Benchmarks/{cities_names[i]}.tsp", cities_coords)
+
+        with open(f"./solutions/{cities_names[i]}_SA.txt", "w") as text_file:
+            text_file.write(f"Running SA with {cities_names[i]} data \n\n")
+
+        #initial_temperature = [100, 1000, 5000]
+        initial_temperature = [100]
+        #cooling_rate = [0.8, 0.9, 0.99]
+        cooling_rate = [0.99]
+        max_iterations = 10000
+        # Motor de SA: "delta" (movimientos 2-opt y Or-opt evaluados en O(1))
+        # o "swap" (intercambios de ciudades evaluados en O(n))
+        engine = "delta"
     
-    for algorithm in algorithms:
-        for k in range(len(initial_temperature)):
-            for l in range(len(cooling_rate)):
-                print(f"Running SA with {algorithm} algorithm")
-
-                best_solution, best_distance = run_sa(algorithm, 
-                                                      distance_matrix, 
-                                                      cities_coords, 
-                                                      initial_temperature[k], 
-                                                      cooling_rate[l], 
-                                                      max_iterations)
-
-                with open(f"./solutions/{cities_names[i]}_SA.txt", "a") as text_file:
-                    text_file.write(f"Algorithm: {algorithm} \n")
-                    text_file.write(f"Initial temperature: {initial_temperature[k]} \n")
-                    text_file.write(f"Cooling rate: {cooling_rate[l]} \n")
-                    text_file.write(f"Max iterations: {max_iterations} \n")
-                    text_file.write(f"Mejor distancia: {best_distance} \n")  
-                    text_file.write("---------------------------------------------\n\n")
-
-                plot_path(cities_coords, best_solution, best_distance, f"SA_{cities_names[i]}_{algorithm}")
+        for algorithm in algorithms:
+            for k in range(len(initial_temperature)):
+                for l in range(len(cooling_rate)):
+                    print(f"Running SA with {algorithm} algorithm")
+
+                    best_solution, best_distance = run_sa(algorithm, 
+                                                          distance_matrix, 
+                                                          cities_coords, 
+                                                          initial_temperature[k], 
+                                                          cooling_rate[l], 
+                                                          max_iterations,
+                                                          engine)
+
+                    with open(f"./solutions/{cities_names[i]}_SA.txt", "a") as text_file:
+                        text_file.write(f"Algorithm: {algorithm} \n")
+                        text_file.write(f"Initial temperature: {initial_temperature[k]} \n")
+                        text_file.write(f"Cooling rate: {cooling_rate[l]} \n")
+                        text_file.write(f"Max iterations: {max_iterations} \n")
+                        text_file.write(f"Mejor distancia: {best_distance} \n")  
+                        text_file.write("---------------------------------------------\n\n")
+
+                    plot_path(cities_coords, best_solution, best_distance, f"SA_{cities_names[i]}_{algorithm}")
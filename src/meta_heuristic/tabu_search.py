@@ -1,17 +1,21 @@
 import random
 import math
-from collections import deque
 from heuristic.nearest_neighbour import nearest_neighbour
-from heuristic.double_bridge import calculate_total_distance
+from heuristic.local_search_engine import EPSILON, finish, local_search, make_2opt_move, prepare
+from utils.tour import Tour
 
-def two_opt_swap(tour, i, j):
-    new_tour = tour[:i] + tour[i:j+1][::-1] + tour[j+1:]
-    return new_tour
-
-def tabu_search(distance_matrix, city, algorithm_func, max_iterations=50):
+def tabu_search(distance_matrix, city, algorithm_func, max_iterations=50, neighbourhood=None, candidates=None, tabu_tenure=None):
     """
     Busqueda tabú para resolver el problema del agente viajero.
 
+    En cada iteración se aplica el mejor movimiento 2-opt admisible, aunque
+    empeore la ruta. Los movimientos se evalúan en O(1) por la diferencia de
+    las 4 aristas que cambian, restringidos a las listas de candidatos, y
+    solo se guarda el mejor (ver best_admissible_move). Las aristas
+    eliminadas por un movimiento quedan tabú: no pueden volver a agregarse
+    durante tabu_tenure iteraciones, salvo que el movimiento mejore la mejor
+    ruta encontrada (criterio de aspiración).
+
     Parámetros:
     -----------
 
@@ -21,7 +25,15 @@ def tabu_search(distance_matrix, city, algorithm_func, max_iterations=50):
     algorithm_func (function): Función de heurística que genera una ruta inicial
     (por ejemplo, nearest_neighbour).
     max_iterations (int, opcional): Número máximo de iteraciones para detener
-    el algoritmo. Por defecto es 1000.
+    el algoritmo. Por defecto es 50.
+    neighbourhood (str, opcional): Si se da ("2opt", "or_opt", "2opt+or_opt",
+    "3opt" o "lk"), la solución inicial y la mejor solución encontrada se
+    mejoran con esa búsqueda local (ver heuristic/local_search_engine.py).
+    candidates (np.ndarray / lista de listas, opcional): Listas de candidatos
+    de cada nodo (ver utils/indice_espacial.py). Por defecto los
+    K_CANDIDATOS más cercanos.
+    tabu_tenure (int, opcional): Iteraciones que una arista eliminada
+    permanece tabú. Por defecto sqrt(n).
 
     Return:
     ------
@@ -35,17 +47,22 @@ def tabu_search(distance_matrix, city, algorithm_func, max_iterations=50):
     n = len(distance_matrix)
 
     # Calcula el tamaño de la lista tabú
-    tabu_tenure = int(math.sqrt(n))
+    if tabu_tenure is None:
+        tabu_tenure = int(math.sqrt(n))
 
-    # Inicializa la lista tabú
-    tabu_list = deque(maxlen=tabu_tenure)
+    # Iteración hasta la que cada arista (i, j), con i < j, es tabú
+    tabu_until = {}
     
     # Calcula la solución inicial x y su distancia
     best_distance, best_tour = algorithm_func(distance_matrix, city)
+    if neighbourhood is not None:
+        best_distance, best_tour = local_search(distance_matrix, best_tour, neighbourhood)
     
-    # Inicializa la solución actual y su distancia
-    current_tour = best_tour
+    # Inicializa la solución actual y su distancia. Los movimientos se
+    # aplican en el lugar sobre current; la mejor ruta se guarda como lista
+    d, candidates, current, closed, start = prepare(distance_matrix, best_tour, candidates)
     current_distance = best_distance
+    best_order = current.tolist()
 
     patience = 50                 # paciencia
     improvement_threshold = 0.01 # umbral de mejora
@@ -53,36 +70,33 @@ def tabu_search(distance_matrix, city, algorithm_func, max_iterations=50):
     iteration = 0                # iteraciones
 
     while iteration < max_iterations:
-        neighborhood = []
-        
-        for i in range(1, n-1):
-            for j in range(i+1, n):
-                if (i, j) not in tabu_list and (j, i) not in tabu_list:
-                    new_tour = two_opt_swap(current_tour, i, j)
-                    new_distance = calculate_total_distance(new_tour, distance_matrix)
-                    neighborhood.append((new_tour, new_distance, (i, j)))
-
-        # Ordena los movimientos en el vecindario por distancia
-        neighborhood.sort(key=lambda x: x[1])
-
-        # Obtiene el mejor movimiento en el vecindario
-        best_candidate = neighborhood[0]
-        
-        new_tour, new_distance, move = best_candidate
+        # Cada tabu_tenure iteraciones se descartan las aristas que ya no
+        # son tabú, para que el diccionario no crezca con las iteraciones
+        if iteration % max(tabu_tenure, 1) == 0:
+            tabu_until = {key: until for key, until in tabu_until.items() if until > iteration}
+
+        # Mejor movimiento no tabú, o tabú que mejore la mejor ruta
+        move = best_admissible_move(
+            current, d, candidates, tabu_until, iteration, best_distance - current_distance
+        )
+        if move is None:
+            # Todos los movimientos son tabú
+            no_improvement_iters += 1
+            iteration += 1
+            continue
 
-        # Verifica el criterio de aspiración
-        if move not in tabu_list or new_distance < best_distance:
-            current_tour = new_tour
-            current_distance = new_distance
+        delta, (a, b, c, e) = move
+        make_2opt_move(current, a, b, c, e)
+        current_distance += delta
 
-            # Verifica si el movimiento es mejor que la mejor solución global
-            if new_distance < best_distance:
-                best_tour = new_tour
-                best_distance = new_distance
-            else:
-                no_improvement_iters += 1
+        # Las aristas eliminadas no pueden volver a agregarse por un tiempo
+        tabu_until[edge(a, b)] = iteration + tabu_tenure
+        tabu_until[edge(c, e)] = iteration + tabu_tenure
 
-            tabu_list.append(move)
+        # Verifica si el movimiento es mejor que la mejor solución global
+        if current_distance < best_distance - EPSILON:
+            best_distance = current_distance
+            best_order = current.tolist()
         else:
             no_improvement_iters += 1
         iteration += 1
@@ -91,4 +105,60 @@ def tabu_search(distance_matrix, city, algorithm_func, max_iterations=50):
         if no_improvement_iters >= patience and (best_distance - current_distance) / best_distance < improvement_threshold:
             break
 
+    best_distance, best_tour = finish(d, Tour(best_order, n), closed, start)
+
+    # Intensifica la mejor solución encontrada
+    if neighbourhood is not None:
+        best_distance, best_tour = local_search(distance_matrix, best_tour, neighbourhood)
+
     return best_distance, best_tour
+
+def edge(i, j):
+    # Clave de la arista no dirigida (i, j)
+    return (i, j) if i < j else (j, i)
+
+def best_admissible_move(structure, d, candidates, tabu_until, iteration, aspiration):
+    """
+    Busca el mejor movimiento 2-opt admisible sobre las listas de candidatos.
+
+    Para cada ciudad a y candidato c, con b y e los sucesores (o los
+    predecesores) de a y c, el movimiento elimina (a, b) y (c, e) y agrega
+    (a, c) y (b, e); su costo se evalúa en O(1) con esas 4 aristas. Un
+    movimiento que agrega una arista tabú solo es admisible si su diferencia
+    es menor que aspiration (es decir, si mejora la mejor ruta).
+
+    Parámetros:
+    ----------
+    structure (Tour / TwoLevelList): Ruta actual.
+    d (function): Función de distancia d(i, j).
+    candidates (lista de listas): Candidatos de cada ciudad.
+    tabu_until (dict): Iteración hasta la que es tabú cada arista (ver edge).
+    iteration (int): Iteración actual.
+    aspiration (float): Diferencia bajo la cual se ignora el estado tabú.
+
+    Returns:
+    ------
+    tuple / None: (delta, (a, b, c, e)) del mejor movimiento, que puede ser
+                  positivo, o None si no hay ninguno admisible.
+
+    Complejidad de tiempo:
+    O(n·k) para k candidatos por ciudad.
+    """
+    best, best_delta = None, math.inf
+    for a in structure:
+        for successor in (True, False):
+            b = structure.next(a) if successor else structure.prev(a)
+            d_ab = d(a, b)
+            for c in candidates[a]:
+                e = structure.next(c) if successor else structure.prev(c)
+                if c == b or e == a:
+                    continue
+                delta = d(a, c) + d(b, e) - d_ab - d(c, e)
+                if delta >= best_delta:
+                    continue
+                if delta >= aspiration - EPSILON and (
+                    tabu_until.get(edge(a, c), -1) > iteration or tabu_until.get(edge(b, e), -1) > iteration
+                ):
+                    continue
+                best, best_delta = (a, b, c, e), delta
+    return (best_delta, best) if best is not None else None
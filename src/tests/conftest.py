@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+
+# Los modulos del proyecto se importan como en los scripts, desde src/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+# Utilidades comunes de las pruebas: se importan con "from conftest import ..."
+
+
+def coordenadas_aleatorias(n, semilla):
+    # n ciudades al azar en el cuadrado [0, 1000)^2
+    return np.random.default_rng(semilla).random((n, 2)) * 1000
+
+
+def distancias(coordenadas, dtype=np.float64):
+    # Matriz de distancias euclidianas calculada directamente, como referencia
+    diferencias = coordenadas[:, None, :] - coordenadas[None, :, :]
+    return np.sqrt((diferencias ** 2).sum(axis=2)).astype(dtype)
+
+
+def instancia(n, semilla, dtype=np.float64):
+    return distancias(coordenadas_aleatorias(n, semilla), dtype)
+
+
+def longitud(dm, ruta):
+    # Longitud de la ruta abierta ruta (la última ciudad vuelve a la primera)
+    return sum(float(dm[ruta[i - 1]][ruta[i]]) for i in range(len(ruta)))
+
+
+def aristas(ruta):
+    # Aristas no dirigidas de la ruta
+    return {frozenset((ruta[i - 1], ruta[i])) for i in range(len(ruta))}
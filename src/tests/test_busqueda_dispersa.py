@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pytest
+
+from conftest import aristas, coordenadas_aleatorias, distancias, instancia, longitud
+from meta_heuristic.busqueda_dispersa import (
+    deltas_intercambio,
+    distancia_aristas,
+    huellas_aristas,
+    path_relinking,
+    seleccionar_mejores_soluciones,
+)
+from utils.calcular_distancia import OraculoDistancia
+
+
+def rutas_aleatorias(m, n, semilla):
+    rng = random.Random(semilla)
+    return [rng.sample(range(n), n) for _ in range(m)]
+
+
+def test_rotaciones_e_inversiones_se_descartan():
+    n = 20
+    dm = instancia(n, 0)
+    ruta, otra = rutas_aleatorias(2, n, 1)
+    conjunto = [ruta, ruta[7:] + ruta[:7], ruta[::-1], otra, otra[::-1][3:] + otra[::-1][:3]]
+
+    huellas = huellas_aristas(conjunto)[2]
+    assert len(set(huellas.tolist())) == 2
+    seleccionadas, _ = seleccionar_mejores_soluciones(dm, conjunto, 5)
+    assert sorted(map(frozenset, map(aristas, seleccionadas.tolist()))) == sorted({frozenset(aristas(ruta)), frozenset(aristas(otra))})
+
+
+def test_distancia_aristas_cuenta_aristas_no_compartidas():
+    n = 15
+    rutas = rutas_aleatorias(8, n, 2)
+    rutas.append(rutas[0][::-1])
+    sucesores, predecesores, _ = huellas_aristas(rutas)
+    for i, ruta in enumerate(rutas):
+        distancias = distancia_aristas(sucesores[i], sucesores, predecesores)
+        esperado = [n - len(aristas(ruta) & aristas(otra)) for otra in rutas]
+        assert distancias.tolist() == esperado
+    # Una ruta invertida comparte todas sus aristas
+    assert distancia_aristas(sucesores[0], sucesores, predecesores)[-1] == 0
+
+
+@pytest.mark.parametrize("diversidad", ["hamming", "aristas"])
+def test_costos_corresponden_a_las_seleccionadas(diversidad):
+    n = 25
+    dm = instancia(n, 3)
+    conjunto = rutas_aleatorias(30, n, 4)
+    seleccionadas, costos = seleccionar_mejores_soluciones(dm, conjunto, 10, diversidad=diversidad)
+    assert len(seleccionadas) == len(costos) == 10
+    for solucion, costo in zip(seleccionadas.tolist(), costos.tolist()):
+        assert sorted(solucion) == list(range(n))
+        assert costo == pytest.approx(longitud(dm, solucion))
+
+
+def test_deltas_intercambio_con_posiciones_consecutivas():
+    n = 10
+    dm = instancia(n, 5)
+    ruta = np.array(rutas_aleatorias(1, n, 6)[0], dtype=np.int32)
+    # Todos los pares, incluidos los consecutivos (i, i + 1) y los que
+    # cierran el ciclo (0, n - 1) y (n - 1, 0)
+    i, j = np.array([(i, j) for i in range(n) for j in range(n) if i != j]).T
+    deltas = deltas_intercambio(dm, ruta, i, j)
+    inicial = longitud(dm, ruta.tolist())
+    for a, b, delta in zip(i.tolist(), j.tolist(), deltas.tolist()):
+        nueva = ruta.tolist()
+        nueva[a], nueva[b] = nueva[b], nueva[a]
+        assert delta == pytest.approx(longitud(dm, nueva) - inicial)
+
+
+def test_path_relinking_a_un_intercambio_de_la_guia():
+    n = 12
+    dm = instancia(n, 7)
+    inicial = rutas_aleatorias(1, n, 8)[0]
+    guia = list(inicial)
+    guia[3], guia[8] = guia[8], guia[3]
+    assert path_relinking(dm, inicial, guia) == (None, None)
+
+
+@pytest.mark.parametrize("oraculo", [False, True])
+def test_path_relinking_distancia_incremental(oraculo):
+    n = 30
+    coordenadas = coordenadas_aleatorias(n, 9)
+    dm = distancias(coordenadas)
+    matriz = OraculoDistancia(coordenadas) if oraculo else dm
+    rutas = rutas_aleatorias(20, n, 10)
+    for inicial, guia in zip(rutas[::2], rutas[1::2]):
+        distancia, solucion = path_relinking(matriz, inicial, guia)
+        assert sorted(solucion) == list(range(n))
+        assert distancia == pytest.approx(longitud(dm, solucion))
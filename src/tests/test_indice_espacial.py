@@ -0,0 +1,87 @@
+import gc
+
+import numpy as np
+import pytest
+
+from conftest import distancias
+from utils import indice_espacial
+from utils.indice_espacial import IndiceEspacial, listas_candidatas, obtener_candidatos
+
+
+def distancias_fuerza_bruta(coords, k):
+    # Distancias de los k vecinos más cercanos de cada ciudad, por fuerza bruta
+    diferencia = coords[:, None, :] - coords[None, :, :]
+    distancias = np.sqrt((diferencia * diferencia).sum(axis=2))
+    np.fill_diagonal(distancias, np.inf)
+    return np.sort(distancias, axis=1)[:, :k]
+
+
+def distancias_vecinos(coords, vecinos):
+    diferencia = coords[:, None, :] - coords[vecinos]
+    return np.sqrt((diferencia * diferencia).sum(axis=2))
+
+
+CASOS = {
+    "uniforme": np.random.default_rng(0).random((500, 2)) * 1000,
+    "agrupado": np.concatenate([
+        np.random.default_rng(1).normal(c, 5, size=(100, 2)) for c in ((0, 0), (500, 20), (900, 900))
+    ]),
+    "colineal_vertical": np.column_stack((np.zeros(300), np.arange(300.0))),
+    "colineal_horizontal": np.column_stack((np.arange(300.0) * 7, np.full(300, 3.0))),
+    "casi_colineal": np.column_stack((np.arange(400.0), np.random.default_rng(2).random(400) * 1e-6)),
+    "duplicados": np.repeat(np.random.default_rng(3).random((50, 2)) * 100, 4, axis=0),
+    "todos_iguales": np.ones((30, 2)),
+}
+
+
+@pytest.mark.parametrize("nombre", sorted(CASOS))
+@pytest.mark.parametrize("k", [1, 5, 10])
+def test_k_vecinos_igual_a_fuerza_bruta(nombre, k):
+    coords = CASOS[nombre]
+    vecinos = IndiceEspacial(coords).k_vecinos(k)
+
+    assert vecinos.shape == (len(coords), k)
+    # Ninguna ciudad es su propia vecina ni tiene vecinos repetidos
+    assert not (vecinos == np.arange(len(coords))[:, None]).any()
+    assert all(len(set(fila)) == k for fila in vecinos.tolist())
+    # Con empates los índices pueden variar, las distancias no
+    np.testing.assert_allclose(distancias_vecinos(coords, vecinos), distancias_fuerza_bruta(coords, k))
+
+
+def test_rejilla_acotada_con_ciudades_colineales():
+    indice = IndiceEspacial(CASOS["colineal_vertical"])
+    assert indice.nx * indice.ny <= len(CASOS["colineal_vertical"])
+
+
+def test_listas_candidatas_colineales_pocas_ciudades():
+    candidatos = listas_candidatas([[0, 0], [0, 1], [0, 2], [0, 3]], 2)
+    assert candidatos.tolist() == [[1, 2], [0, 2], [1, 3], [2, 1]]
+
+
+def test_listas_candidatas_con_cuadrantes():
+    coords = CASOS["uniforme"]
+    candidatos = listas_candidatas(coords, 5, cuadrantes=2)
+    # Los primeros candidatos siguen siendo los 5 más cercanos
+    np.testing.assert_allclose(distancias_vecinos(coords, candidatos[:, :5]), distancias_fuerza_bruta(coords, 5))
+    for i, fila in enumerate(candidatos.tolist()):
+        validos = [c for c in fila if c >= 0]
+        assert i not in validos and len(set(validos)) == len(validos)
+
+
+def test_obtener_candidatos_no_retiene_la_matriz():
+    coords = CASOS["uniforme"][:50]
+    matriz = distancias(coords)
+    candidatos = obtener_candidatos(matriz, 5)
+    assert obtener_candidatos(matriz, 5) is candidatos
+    clave = id(matriz)
+    assert clave in indice_espacial._cache_candidatos
+    del matriz
+    gc.collect()
+    assert clave not in indice_espacial._cache_candidatos
+
+
+def test_obtener_candidatos_no_guarda_listas():
+    antes = dict(indice_espacial._cache_candidatos)
+    matriz = [[0, 1, 2], [1, 0, 1], [2, 1, 0]]
+    assert obtener_candidatos(matriz, 1).tolist() == [[1], [0], [1]]
+    assert indice_espacial._cache_candidatos == antes
@@ -0,0 +1,91 @@
+import random
+
+import numpy as np
+import pytest
+
+from conftest import coordenadas_aleatorias, distancias, instancia, longitud
+from heuristic.local_search_engine import (
+    NEIGHBOURHOODS,
+    lin_kernighan_move,
+    local_search,
+    make_2opt_move,
+    or3opt_move,
+    or_opt_move,
+    prepare,
+    two_opt_move,
+)
+from utils.calcular_distancia import OraculoDistancia
+from utils.tour import Tour
+
+
+@pytest.mark.parametrize("find_move", [two_opt_move, or_opt_move, or3opt_move, lin_kernighan_move])
+@pytest.mark.parametrize("representation", ["array", "two_level"])
+@pytest.mark.parametrize("first", [True, False])
+def test_delta_coincide_con_recalculo(find_move, representation, first):
+    n = 60
+    dm = instancia(n, 3, np.float32)
+    ruta = random.Random(5).sample(range(n), n)
+    d, candidates, structure, _, _ = prepare(dm, ruta, representation=representation)
+
+    aplicados = 0
+    for a in range(n):
+        move = find_move(structure, d, candidates, a, first)
+        if move is None:
+            continue
+        delta, movimientos = move
+        assert delta < 0
+        antes = longitud(dm, structure.tolist())
+        for two_opt in movimientos:
+            make_2opt_move(structure, *two_opt)
+        despues = structure.tolist()
+        assert sorted(despues) == list(range(n))
+        assert longitud(dm, despues) - antes == pytest.approx(delta, abs=1e-3)
+        aplicados += 1
+    assert aplicados > 0
+
+
+@pytest.mark.parametrize("neighbourhood", sorted(NEIGHBOURHOODS))
+@pytest.mark.parametrize("representation", ["array", "two_level"])
+@pytest.mark.parametrize("strategy", ["first", "best"])
+def test_local_search_devuelve_ruta_valida(neighbourhood, representation, strategy):
+    n = 80
+    dm = instancia(n, 7)
+    ruta = random.Random(11).sample(range(n), n)
+    inicial = longitud(dm, ruta)
+
+    distancia, mejorada = local_search(dm, ruta, neighbourhood, strategy=strategy, representation=representation)
+    assert mejorada[0] == ruta[0]
+    assert sorted(mejorada) == list(range(n))
+    assert distancia == pytest.approx(longitud(dm, mejorada))
+    assert distancia < inicial
+
+    # Una ruta cerrada sigue cerrada y llega al mismo resultado
+    distancia_cerrada, cerrada = local_search(dm, ruta + [ruta[0]], neighbourhood, strategy=strategy, representation=representation)
+    assert cerrada[0] == cerrada[-1] == ruta[0]
+    assert cerrada[:-1] == mejorada
+    assert distancia_cerrada == pytest.approx(distancia)
+
+
+def test_local_search_con_oraculo_y_tour():
+    n = 80
+    coordenadas = coordenadas_aleatorias(n, 13)
+    dm = distancias(coordenadas)
+    ruta = random.Random(17).sample(range(n), n)
+
+    esperado = local_search(dm, ruta, "2opt+or_opt")
+    assert local_search(OraculoDistancia(coordenadas), ruta, "2opt+or_opt")[1] == esperado[1]
+
+    # Un Tour se mejora en el lugar y se devuelve la misma estructura
+    tour = Tour(ruta, n)
+    distancia, resultado = local_search(dm, tour, "2opt+or_opt")
+    assert resultado is tour
+    assert distancia == pytest.approx(esperado[0])
+    assert tour.sequence(ruta[0]) == esperado[1]
+
+
+def test_local_search_rutas_pequenas():
+    dm = instancia(3, 1)
+    for ruta in ([0], [0, 1], [2, 0, 1], [2, 0, 1, 2]):
+        distancia, resultado = local_search(dm, ruta, "lk")
+        assert resultado == ruta
+        assert distancia == pytest.approx(longitud(dm, ruta[:-1] if len(ruta) > 3 else ruta))
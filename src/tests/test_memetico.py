@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+import pytest
+
+from conftest import instancia, longitud
+from meta_heuristic import genetic_algorithm
+from meta_heuristic.genetic_algorithm import Memetic, canonical_tour
+
+
+def hijos(m, n, semilla):
+    rng = random.Random(semilla)
+    return np.array([rng.sample(range(n), n) for _ in range(m)], dtype=np.int32)
+
+
+def test_canonical_tour_de_rotaciones_e_inversiones():
+    ruta = random.Random(0).sample(range(12), 12)
+    clave = canonical_tour(ruta)
+    for k in range(12):
+        rotada = ruta[k:] + ruta[:k]
+        assert canonical_tour(rotada) == clave
+        assert canonical_tour(rotada[::-1]) == clave
+    otra = list(ruta)
+    otra[2], otra[7] = otra[7], otra[2]
+    assert canonical_tour(otra) != clave
+
+
+@pytest.fixture
+def busquedas(monkeypatch):
+    # Cuenta las llamadas a la búsqueda local del modo memético
+    llamadas = []
+    local_search = genetic_algorithm.local_search
+
+    def contar(*args, **kwargs):
+        llamadas.append(args[1])
+        return local_search(*args, **kwargs)
+
+    monkeypatch.setattr(genetic_algorithm, "local_search", contar)
+    return llamadas
+
+
+def test_improve_usa_la_cache(busquedas):
+    n = 30
+    dm = instancia(n, 1)
+    memetico = Memetic(dm, fraction=1, time_budget=None)
+    offspring = hijos(4, n, 2)
+    distancias = np.array([longitud(dm, hijo) for hijo in offspring.tolist()])
+
+    mejorados, mejoradas = memetico.improve(offspring.copy(), distancias.copy())
+    assert len(busquedas) == memetico.searches == 4
+    for hijo, distancia in zip(mejorados.tolist(), mejoradas.tolist()):
+        assert distancia == pytest.approx(longitud(dm, hijo))
+
+    # Los mismos hijos (rotados) y sus óptimos locales salen de la cache
+    rotados = np.roll(offspring, 5, axis=1)
+    otra_vez, _ = memetico.improve(rotados, distancias.copy())
+    assert len(busquedas) == 4 and memetico.hits == 4
+    assert sorted(map(canonical_tour, otra_vez)) == sorted(map(canonical_tour, mejorados))
+    memetico.improve(mejorados.copy(), mejoradas.copy())
+    assert len(busquedas) == 4 and memetico.hits == 8
+
+
+def test_remember_descarta_las_mas_antiguas():
+    memetico = Memetic(instancia(10, 3), cache_size=2)
+    for clave in (b"a", b"b", b"c"):
+        memetico.remember(clave, None, 0.0)
+    assert list(memetico.cache) == [b"b", b"c"]
+    memetico.remember(b"d", None, 0.0)
+    assert list(memetico.cache) == [b"c", b"d"]
+
+
+def test_improve_sin_presupuesto(busquedas):
+    n = 20
+    dm = instancia(n, 4)
+    memetico = Memetic(dm, fraction=1, time_budget=0)
+    offspring = hijos(5, n, 5)
+    distancias = np.array([longitud(dm, hijo) for hijo in offspring.tolist()])
+    mejorados, mejoradas = memetico.improve(offspring.copy(), distancias.copy())
+    assert busquedas == [] and memetico.searches == 0
+    assert np.array_equal(mejorados, offspring) and np.array_equal(mejoradas, distancias)
@@ -0,0 +1,83 @@
+import random
+
+import numpy as np
+import pytest
+
+from conftest import aristas
+from utils.operadores import (
+    crossover_population,
+    edge_recombination_crossover,
+    order_crossover,
+    pmx_crossover,
+    select_parents,
+)
+
+
+def es_permutacion(individuo, n):
+    return sorted(individuo) == list(range(n))
+
+
+@pytest.mark.parametrize("n", [2, 3, 10, 101])
+def test_kernels_producen_permutaciones(n):
+    rng = random.Random(n)
+    for _ in range(50):
+        p1, p2 = rng.sample(range(n), n), rng.sample(range(n), n)
+        c1, c2 = sorted(rng.sample(range(n + 1), 2))
+        hijo = pmx_crossover(p1, p2, c1, c2)
+        assert es_permutacion(hijo, n) and hijo[c1:c2] == p1[c1:c2]
+        hijo = order_crossover(p1, p2, c1, c2)
+        assert es_permutacion(hijo, n) and hijo[c1:c2] == p1[c1:c2]
+        hijo = edge_recombination_crossover(p1, p2, rng)
+        assert es_permutacion(hijo, n)
+
+
+def test_erx_hereda_aristas_de_padres_iguales():
+    ruta = random.Random(0).sample(range(50), 50)
+    hijo = edge_recombination_crossover(ruta, ruta, random.Random(1))
+    assert aristas(hijo) == aristas(ruta)
+
+
+@pytest.mark.parametrize("method", ["ox", "pmx", "erx", "triple"])
+def test_crossover_population_produce_permutaciones(method):
+    n = 60
+    rng = np.random.default_rng(0)
+    parents = np.array([rng.permutation(n) for _ in range(13)], dtype=np.int32)
+    offspring = crossover_population(parents, method, np.random.default_rng(1))
+    esperados = 13 // 3 if method == "triple" else 2 * (13 // 2)
+    assert offspring.shape == (esperados, n) and offspring.dtype == np.int32
+    assert all(es_permutacion(hijo, n) for hijo in offspring.tolist())
+
+
+@pytest.mark.parametrize("method,kernel", [("ox", order_crossover), ("pmx", pmx_crossover)])
+def test_crossover_population_igual_al_kernel(method, kernel):
+    # Con el mismo generador se repiten los puntos de corte y se compara
+    # cada hijo con el operador escalar
+    n, m = 40, 10
+    rng = np.random.default_rng(3)
+    parents = np.array([rng.permutation(n) for _ in range(m)], dtype=np.int32)
+    offspring = crossover_population(parents, method, np.random.default_rng(7))
+
+    cuts = np.sort(np.random.default_rng(7).integers(0, n, size=(m // 2, 2)), axis=1)
+    first, second = parents[0::2].tolist(), parents[1::2].tolist()
+    esperados = [kernel(a, b, int(c1), int(c2) + 1) for a, b, (c1, c2) in zip(first, second, cuts)]
+    esperados += [kernel(b, a, int(c1), int(c2) + 1) for a, b, (c1, c2) in zip(first, second, cuts)]
+    assert offspring.tolist() == esperados
+
+
+def test_crossover_population_sin_padres():
+    assert crossover_population(np.empty((1, 5), dtype=np.int32), "ox").shape == (0, 5)
+
+
+@pytest.mark.parametrize("method", ["roulette", "alias"])
+def test_select_parents_sigue_las_probabilidades(method):
+    probabilidades = np.array([0.0, 0.1, 0.2, 0.3, 0.4])
+    indices = select_parents(probabilidades, 200000, method, np.random.default_rng(0))
+    frecuencias = np.bincount(indices, minlength=5) / len(indices)
+    assert frecuencias[0] == 0
+    np.testing.assert_allclose(frecuencias, probabilidades, atol=0.01)
+
+
+def test_select_parents_torneo_prefiere_al_mejor():
+    probabilidades = np.array([0.1, 0.5, 0.4])
+    indices = select_parents(probabilidades, 10000, "tournament", np.random.default_rng(0), tournament_size=3)
+    assert np.bincount(indices, minlength=3).argmax() == 1
@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from conftest import coordenadas_aleatorias, instancia, longitud
+from meta_heuristic.ant_colony import ant_colony_optimization, max_min_ant_system
+from meta_heuristic.genetic_algorithm import island_ga
+from meta_heuristic.simulated_annealing import parallel_tempering
+from utils.calcular_distancia import OraculoDistancia, matriz_distancias
+from utils.memoria_compartida import ArreglosCompartidos, conectar
+
+
+def bloques_compartidos():
+    if not os.path.isdir("/dev/shm"):
+        return None
+    return {nombre for nombre in os.listdir("/dev/shm") if nombre.startswith("psm_")}
+
+
+@pytest.fixture
+def sin_fugas():
+    # Los bloques de memoria compartida deben liberarse al terminar
+    antes = bloques_compartidos()
+    yield
+    assert bloques_compartidos() == antes
+
+
+def _escribir(specs):
+    arrays, blocks = conectar(specs)
+    arrays["valores"][:] *= 2
+    total = float(arrays["valores"].sum())
+    del arrays
+    for block in blocks:
+        block.close()
+    return total
+
+
+def test_arreglos_compartidos(sin_fugas):
+    compartidos = ArreglosCompartidos(valores=np.arange(10, dtype=np.float64), vacio=np.empty(0))
+    try:
+        with ProcessPoolExecutor(1) as executor:
+            assert executor.submit(_escribir, compartidos.specs).result() == 90.0
+        # Lo que escribe el otro proceso se ve en este
+        assert compartidos.arrays["valores"].tolist() == [2.0 * i for i in range(10)]
+        assert compartidos.arrays["vacio"].shape == (0,)
+    finally:
+        compartidos.close()
+
+
+@pytest.mark.parametrize("construction", ["ant_system", "max_min"])
+def test_hormigas_en_paralelo_reproducibles(construction, sin_fugas):
+    n = 30
+    dm = instancia(n, 1)
+    resultados = []
+    for _ in range(2):
+        if construction == "ant_system":
+            cost, path = ant_colony_optimization(dm, 8, 5, 1, 2, 0.5, 1, seed=3, n_workers=2)
+        else:
+            cost, path = max_min_ant_system(dm, 8, 5, k=10, seed=3, n_workers=2)
+        path = list(path)
+        assert path[0] == path[-1] and sorted(path[:-1]) == list(range(n))
+        assert cost == pytest.approx(longitud(dm, path[:-1]))
+        resultados.append((cost, path))
+    assert resultados[0] == resultados[1]
+
+
+def test_hormigas_con_oraculo_igual_que_con_matriz():
+    coords = coordenadas_aleatorias(25, 4)
+    dm = matriz_distancias(coords)
+    con_matriz = ant_colony_optimization(dm, 6, 4, 1, 2, 0.5, 1, seed=2)
+    con_oraculo = ant_colony_optimization(OraculoDistancia(coords), 6, 4, 1, 2, 0.5, 1, seed=2)
+    assert con_oraculo == con_matriz
+
+
+def test_parallel_tempering_no_depende_de_los_procesos(sin_fugas):
+    n = 40
+    dm = instancia(n, 2)
+    inicial = list(range(n)) + [0]
+    serie = parallel_tempering(dm, inicial, n_replicas=3, exchange_every=200, max_iterations=1000, seed=5)
+    paralelo = parallel_tempering(dm, inicial, n_replicas=3, exchange_every=200, max_iterations=1000, seed=5, n_workers=2)
+    assert serie == paralelo
+    solucion, distancia = serie
+    assert solucion[0] == solucion[-1] == 0 and sorted(solucion[:-1]) == list(range(n))
+    assert distancia == pytest.approx(longitud(dm, solucion[:-1]))
+
+
+def test_island_ga_no_depende_de_los_procesos(sin_fugas):
+    n = 25
+    dm = instancia(n, 4)
+    opciones = dict(n_islands=3, migration_every=3, n_migrants=1, seed=7)
+    serie = island_ga(dm, 12, 6, 0.8, 0.2, **opciones)
+    paralelo = island_ga(dm, 12, 6, 0.8, 0.2, n_workers=2, **opciones)
+    assert serie == paralelo
+    assert serie and all(sorted(individuo) == list(range(n)) for individuo in serie)
@@ -0,0 +1,38 @@
+import pytest
+
+from conftest import instancia, longitud
+from meta_heuristic.simulated_annealing import delta_simulated_annealing, run_sa
+
+
+def comprobar_solucion(dm, solucion, distancia):
+    n = len(dm)
+    assert solucion[0] == solucion[-1] and sorted(solucion[:-1]) == list(range(n))
+    assert distancia == pytest.approx(longitud(dm, solucion[:-1]))
+
+
+@pytest.mark.parametrize("cooling_rate", [0.8, 0.9, 0.99])
+def test_run_sa_delta_con_temperatura_final_nula(cooling_rate):
+    # 100 * cooling_rate ** 10000 es 0.0 para 0.8 y 0.9
+    dm = instancia(30, 0)
+    solucion, distancia = run_sa("nearest_neighbour", dm, list(range(30)), 100, cooling_rate, 10000, seed=1)
+    comprobar_solucion(dm, solucion, distancia)
+
+
+def test_run_sa_delta_solo_con_time_limit():
+    dm = instancia(30, 1)
+    solucion, distancia = run_sa("nearest_neighbour", dm, list(range(30)), 100, 0.99, None, time_limit=0.05, seed=1)
+    comprobar_solucion(dm, solucion, distancia)
+
+
+def test_run_sa_swap_requiere_max_iterations():
+    dm = instancia(10, 2)
+    with pytest.raises(ValueError):
+        run_sa("nearest_neighbour", dm, list(range(10)), 100, 0.99, None, engine="swap", time_limit=0.05)
+
+
+def test_delta_sa_voraz_no_empeora():
+    dm = instancia(40, 3)
+    inicial = list(range(40)) + [0]
+    solucion, distancia = delta_simulated_annealing(dm, inicial, 0, max_iterations=2000, seed=4)
+    comprobar_solucion(dm, solucion, distancia)
+    assert distancia <= longitud(dm, inicial[:-1]) + 1e-9
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from conftest import instancia, longitud
+from heuristic.local_search_engine import make_2opt_move, prepare
+from heuristic.nearest_neighbour import nearest_neighbour
+from meta_heuristic.tabu_search import best_admissible_move, edge, tabu_search
+
+
+def agregadas(move):
+    a, b, c, e = move
+    return {edge(a, c), edge(b, e)}
+
+
+@pytest.mark.parametrize("representation", ["array", "two_level"])
+def test_delta_coincide_con_recalculo(representation):
+    n = 50
+    dm = instancia(n, 1)
+    ruta = random.Random(2).sample(range(n), n)
+    d, candidates, structure, _, _ = prepare(dm, ruta, representation=representation)
+    for _ in range(20):
+        # Sin aristas tabú se aplica el mejor movimiento, aunque empeore la ruta
+        delta, move = best_admissible_move(structure, d, candidates, {}, 0, 0)
+        antes = longitud(dm, structure.tolist())
+        make_2opt_move(structure, *move)
+        assert sorted(structure.tolist()) == list(range(n))
+        assert longitud(dm, structure.tolist()) - antes == pytest.approx(delta)
+
+
+def test_arista_tabu_solo_con_aspiracion():
+    n = 40
+    dm = instancia(n, 3)
+    ruta = random.Random(4).sample(range(n), n)
+    d, candidates, structure, _, _ = prepare(dm, ruta)
+    delta, move = best_admissible_move(structure, d, candidates, {}, 0, 0)
+    tabu = {arista: 10 for arista in agregadas(move)}
+
+    # Sin aspiración suficiente el movimiento se rechaza
+    otro_delta, otro = best_admissible_move(structure, d, candidates, tabu, 5, delta)
+    assert not agregadas(otro) & set(tabu)
+    assert otro_delta >= delta
+
+    # Si mejora la aspiración se acepta aunque sea tabú
+    assert best_admissible_move(structure, d, candidates, tabu, 5, delta + 1) == (delta, move)
+
+    # Pasado su plazo la arista deja de ser tabú
+    assert best_admissible_move(structure, d, candidates, tabu, 10, delta) == (delta, move)
+
+
+def test_tabu_search_devuelve_ruta_valida():
+    n = 60
+    dm = instancia(n, 5)
+    inicial, _ = nearest_neighbour(dm, list(range(n)))
+    distancia, ruta = tabu_search(dm, list(range(n)), nearest_neighbour, max_iterations=200)
+    abierta = ruta[:-1] if ruta[0] == ruta[-1] else ruta
+    assert sorted(abierta) == list(range(n))
+    assert distancia == pytest.approx(longitud(dm, abierta))
+    assert distancia <= inicial + 1e-9
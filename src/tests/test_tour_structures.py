@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from conftest import aristas
+from utils.tour import Tour
+from utils.two_level_list import TwoLevelList
+
+
+def comprobar_consistencia(estructura, n):
+    # next, prev, between y sequence deben coincidir con el orden de tolist
+    orden = estructura.tolist()
+    assert sorted(orden) == list(range(n))
+    pos = {c: i for i, c in enumerate(orden)}
+    for i, c in enumerate(orden):
+        assert estructura.next(c) == orden[(i + 1) % n]
+        assert estructura.prev(c) == orden[i - 1]
+    inicio = orden[n // 2]
+    assert estructura.sequence(inicio) == orden[n // 2:] + orden[:n // 2]
+    rng = random.Random(n)
+    for _ in range(50):
+        a, b, c = rng.sample(orden, 3)
+        esperado = (pos[b] - pos[a]) % n <= (pos[c] - pos[a]) % n
+        assert estructura.between(a, b, c) == esperado
+
+
+@pytest.mark.parametrize("n, tam_segmento", [(5, 2), (37, 4), (100, 7), (200, None)])
+def test_two_level_list_equivale_a_tour(n, tam_segmento):
+    rng = random.Random(n)
+    ciudades = rng.sample(range(n), n)
+    tour = Tour(ciudades, n)
+    lista = TwoLevelList(ciudades, n, tam_segmento)
+    comprobar_consistencia(lista, n)
+
+    for paso in range(300):
+        # Ambas pueden invertir el complemento, que recorre el mismo ciclo
+        # en sentido contrario: si los sentidos difieren, el camino de a a b
+        # en el Tour es el camino de b a a en la lista
+        a, b = rng.sample(range(n), 2)
+        mismo_sentido = tour.next(a) == lista.next(a)
+        tour.reverse_path(a, b)
+        if mismo_sentido:
+            lista.reverse_path(a, b)
+        else:
+            lista.reverse_path(b, a)
+        assert aristas(tour.tolist()) == aristas(lista.tolist())
+        if paso % 25 == 0:
+            comprobar_consistencia(tour, n)
+            comprobar_consistencia(lista, n)
+    comprobar_consistencia(tour, n)
+    comprobar_consistencia(lista, n)
+
+
+@pytest.mark.parametrize("estructura", [Tour, TwoLevelList])
+def test_reverse_path_invierte_el_camino(estructura):
+    n = 50
+    rng = random.Random(1)
+    ciudades = rng.sample(range(n), n)
+    ruta = estructura(ciudades, n)
+    for _ in range(200):
+        a, b = rng.sample(range(n), 2)
+        orden = ruta.sequence(a)
+        camino = orden[:orden.index(b) + 1]
+        resto = orden[orden.index(b) + 1:]
+        ruta.reverse_path(a, b)
+        # El ciclo resultante es camino invertido seguido del resto, en
+        # alguno de los dos sentidos
+        nuevo = camino[::-1] + resto
+        assert aristas(ruta.tolist()) == aristas(nuevo)
+
+
+@pytest.mark.parametrize("estructura", [Tour, TwoLevelList])
+def test_load_reemplaza_la_ruta(estructura):
+    n = 60
+    rng = random.Random(2)
+    ruta = estructura(rng.sample(range(n), n), n)
+    for _ in range(20):
+        a, b = rng.sample(range(n), 2)
+        ruta.reverse_path(a, b)
+    nueva = rng.sample(range(n), n)
+    ruta.load(nueva + [nueva[0]])
+    assert ruta.tolist() == nueva
+    comprobar_consistencia(ruta, n)
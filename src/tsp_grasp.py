@@ -10,7 +10,8 @@ from utils.generate_timelapse import generate_timelapse
 from utils.file_names import FILE_NAMES, LABEL_NAMES
 from utils.graficar import graficar_ciudades, graficar_recorrido
 from utils.display_table import display_table, display_summary_table
-from utils.calcular_distancia import calcular_distancia, calcular_costo_ruta
+from utils.calcular_distancia import calcular_costo_ruta
+from utils.cache_distancias import cargar_matriz_distancias
 from utils.leer_archivo import obtener_ciudades, obtener_mejor_ruta
 from heuristic.random import random_tour
 from heuristic.greedy import greedy_insertion, greedy_insertion_mejor_inicio
@@ -190,7 +191,7 @@ if __name__ == "__main__":
         best_tour = obtener_mejor_ruta(f"../doc/Benchmarks/{currentCity}.opt.tour")
 
         # Calculamos las distacion entre nodos y calculamos el costo de la mejor ruta del bechnmark
-        distance_matrix = calcular_distancia(nodes)
+        distance_matrix = cargar_matriz_distancias(f"../doc/Benchmarks/{currentCity}.tsp", nodes)
         best_distance_tour = calcular_costo_ruta(best_tour, distance_matrix)
 
         print(f"Distancia minima posible para {currentCity}: {best_distance_tour}")
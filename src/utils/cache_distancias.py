@@ -0,0 +1,89 @@
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+from utils.calcular_distancia import (
+    UMBRAL_ORACULO,
+    OraculoDistancia,
+    matriz_distancias,
+)
+from utils.leer_archivo import obtener_ciudades
+
+
+def hash_archivo(filename, tam_lectura=1 << 20):
+    """
+    Calcula el hash (sha1) del contenido de un archivo, leyéndolo por bloques.
+    """
+    sha1 = hashlib.sha1()
+    with open(filename, "rb") as file:
+        for bloque in iter(lambda: file.read(tam_lectura), b""):
+            sha1.update(bloque)
+    return sha1.hexdigest()
+
+
+def ruta_cache(filename, dtype=np.float64, euc_2d=False):
+    """
+    Ruta del archivo .npy de la cache para una instancia.
+
+    El nombre incluye el hash del archivo de la instancia, la métrica y el
+    tipo de dato, de modo que un cambio en cualquiera de ellos invalida la cache:
+    <instancia>.<hash>.<metrica>.<dtype>.npy junto al archivo .tsp.
+    """
+    filename = Path(filename)
+    metrica = "euc2d" if euc_2d else "euclid"
+    nombre = f"{filename.stem}.{hash_archivo(filename)[:16]}.{metrica}.{np.dtype(dtype).name}.npy"
+    return filename.with_name(nombre)
+
+
+def cargar_matriz_distancias(filename, cities=None, dtype=np.float64, euc_2d=False, umbral=UMBRAL_ORACULO):
+    """
+    Obtiene la matriz de distancias de una instancia usando una cache en disco.
+
+    La primera vez la matriz se calcula directamente sobre un archivo .npy
+    mapeado en memoria junto a la instancia; las siguientes ejecuciones la
+    abren con np.load(mmap_mode="r"), sin copiarla ni recalcularla. Para
+    instancias de umbral ciudades o más se devuelve un OraculoDistancia.
+
+    Parámetros:
+    ----------
+    filename (str / Path): Ruta del archivo .tsp de la instancia.
+    cities (lista de listas de floats, opcional): Coordenadas ya leídas de
+                                                  la instancia, evita leer el archivo.
+    dtype (np.dtype): Tipo de la matriz (np.float64 o np.float32).
+    euc_2d (bool): Si es True, redondea las distancias como TSPLIB EUC_2D.
+    umbral (int): Cantidad de ciudades a partir de la cual se usa el oráculo.
+
+    Returns:
+    ------
+    distance_matrix (np.memmap / OraculoDistancia): Matriz de solo lectura.
+    """
+    if cities is None:
+        cities = obtener_ciudades(filename)
+    if len(cities) >= umbral:
+        return OraculoDistancia(cities, euc_2d)
+
+    ruta = ruta_cache(filename, dtype, euc_2d)
+    if not ruta.exists():
+        n = len(cities)
+        # Se escribe en un archivo temporal y luego se renombra, para que
+        # otra ejecución nunca abra una matriz a medio calcular
+        temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+        matriz = np.lib.format.open_memmap(temporal, mode="w+", dtype=dtype, shape=(n, n))
+        matriz_distancias(cities, dtype, euc_2d, out=matriz)
+        matriz.flush()
+        del matriz
+        os.replace(temporal, ruta)
+        _eliminar_caches_viejas(ruta)
+
+    return np.load(ruta, mmap_mode="r")
+
+
+def _eliminar_caches_viejas(ruta):
+    # Elimina las matrices de la misma instancia, métrica y tipo
+    # calculadas a partir de una versión anterior del archivo
+    stem, _, metrica, dtype, _ = ruta.name.rsplit(".", 4)
+    for vieja in ruta.parent.glob(f"{stem}.*.{metrica}.{dtype}.npy"):
+        if vieja != ruta:
+            vieja.unlink(missing_ok=True)
@@ -1,19 +1,186 @@
 import math
+import numpy as np
+
+# A partir de esta cantidad de ciudades no se construye la matriz completa
+# de distancias (n^2 flotantes), sino que se usa un oraculo bajo demanda.
+UMBRAL_ORACULO = 20000
+
+# Cantidad máxima de elementos de los arreglos temporales usados al
+# construir la matriz por bloques de filas (~32 MB en float64).
+ELEMENTOS_POR_BLOQUE = 1 << 22
 
 
 # Utilidad para calcular la matriz de distancias entre las ciudades.
 # Recibe una matriz con las coordenadas de las ciudades.
+# Devuelve listas de listas: las heurísticas en Python puro acceden a
+# m[i][j] elemento por elemento, mucho más rápido en listas que en un
+# np.ndarray. Para obtener un arreglo se usa matriz_distancias.
 def calcular_distancia(cities):
-    distance_matrix = [
-        [
-            math.sqrt(
-                (start_city[0] - end_city[0]) ** 2 + (start_city[1] - end_city[1]) ** 2
-            )
-            for end_city in cities
-        ]
-        for start_city in cities
-    ]
-    return distance_matrix
+    return matriz_distancias(cities).tolist()
+
+
+def matriz_distancias(cities, dtype=np.float64, euc_2d=False, tam_bloque=None, out=None):
+    """
+    Construye la matriz de distancias euclidianas de forma vectorizada.
+
+    La matriz se calcula por bloques de filas, de modo que la memoria
+    temporal está acotada por tam_bloque * n elementos sin importar el
+    tamaño de la instancia.
+
+    Parámetros:
+    ----------
+    cities (lista de listas de floats / np.ndarray): Coordenadas (x, y) de las ciudades.
+    dtype (np.dtype): Tipo de la matriz resultante (np.float64 o np.float32).
+    euc_2d (bool): Si es True, redondea las distancias al entero más cercano
+                   como lo define TSPLIB para EUC_2D.
+    tam_bloque (int, opcional): Cantidad de filas por bloque. Por defecto se
+                                elige para no superar ELEMENTOS_POR_BLOQUE.
+    out (np.ndarray, opcional): Arreglo (n, n) donde se escribe el resultado,
+                                por ejemplo un np.memmap.
+
+    Returns:
+    ------
+    distance_matrix (np.ndarray): Matriz (n, n) contigua de distancias.
+
+    Complejidad de tiempo:
+    O(n^2), con memoria adicional O(tam_bloque * n).
+    """
+    coordenadas = np.asarray(cities, dtype=np.float64).reshape(-1, 2)
+    n = len(coordenadas)
+    x = coordenadas[:, 0]
+    y = coordenadas[:, 1]
+
+    if out is None:
+        out = np.empty((n, n), dtype=dtype)
+    if tam_bloque is None:
+        tam_bloque = max(1, ELEMENTOS_POR_BLOQUE // max(n, 1))
+
+    for inicio in range(0, n, tam_bloque):
+        fin = min(inicio + tam_bloque, n)
+        dx = x[inicio:fin, None] - x[None, :]
+        dy = y[inicio:fin, None] - y[None, :]
+        bloque = np.sqrt(dx * dx + dy * dy)
+        if euc_2d:
+            np.floor(bloque + 0.5, out=bloque)
+        out[inicio:fin] = bloque
+
+    return out
+
+
+class OraculoDistancia:
+    """
+    Oráculo de distancias euclidianas calculadas bajo demanda.
+
+    Sustituye a la matriz de distancias en instancias grandes: solo almacena
+    las coordenadas de las ciudades, por lo que la memoria es O(n) en lugar
+    de O(n^2). Admite las mismas formas de acceso que la matriz
+    (len(oraculo), oraculo[i][j]) además de índices vectorizados de NumPy
+    (oraculo[I, J]), por lo que puede pasarse a cualquier heurística o
+    metaheurística en lugar de distance_matrix.
+
+    Parámetros:
+    ----------
+    cities (lista de listas de floats / np.ndarray): Coordenadas (x, y) de las ciudades.
+    euc_2d (bool): Si es True, redondea las distancias al entero más cercano (TSPLIB).
+    """
+
+    def __init__(self, cities, euc_2d=False):
+        coordenadas = np.asarray(cities, dtype=np.float64).reshape(-1, 2)
+        self.x = np.ascontiguousarray(coordenadas[:, 0])
+        self.y = np.ascontiguousarray(coordenadas[:, 1])
+        # Copias como listas de Python, el acceso escalar es mucho más rápido
+        self._x = self.x.tolist()
+        self._y = self.y.tolist()
+        self.euc_2d = euc_2d
+
+    def __len__(self):
+        return len(self._x)
+
+    @property
+    def shape(self):
+        return (len(self._x), len(self._x))
+
+    def d(self, i, j):
+        """
+        Distancia entre la ciudad i y la ciudad j.
+        """
+        dx = self._x[i] - self._x[j]
+        dy = self._y[i] - self._y[j]
+        if self.euc_2d:
+            return float(int(math.sqrt(dx * dx + dy * dy) + 0.5))
+        return math.sqrt(dx * dx + dy * dy)
+
+    def d_lote(self, i, js):
+        """
+        Distancias desde la ciudad i hasta cada ciudad de js (np.ndarray de floats).
+        """
+        return self._calcular(i, np.asarray(js))
+
+    def fila(self, i):
+        """
+        Fila i completa de la matriz de distancias, calculada en O(n).
+        """
+        return self._calcular(i, slice(None))
+
+    def _calcular(self, i, j):
+        dx = self.x[i] - self.x[j]
+        dy = self.y[i] - self.y[j]
+        distancias = np.sqrt(dx * dx + dy * dy)
+        if self.euc_2d:
+            return np.floor(distancias + 0.5)
+        return distancias
+
+    def __getitem__(self, indice):
+        if isinstance(indice, tuple):
+            i, j = indice
+            if np.ndim(i) == 0 and np.ndim(j) == 0:
+                return self.d(i, j)
+            return self._calcular(np.asarray(i), np.asarray(j))
+        return _FilaDistancias(self, indice)
+
+
+class _FilaDistancias:
+    """
+    Vista perezosa de una fila del oráculo, permite oraculo[i][j].
+    """
+
+    __slots__ = ("_oraculo", "_i")
+
+    def __init__(self, oraculo, i):
+        self._oraculo = oraculo
+        self._i = i
+
+    def __len__(self):
+        return len(self._oraculo)
+
+    def __getitem__(self, j):
+        if np.ndim(j) == 0 and not isinstance(j, slice):
+            return self._oraculo.d(self._i, j)
+        return self._oraculo.fila(self._i)[j]
+
+
+def crear_distancias(cities, umbral=UMBRAL_ORACULO, dtype=np.float64, euc_2d=False):
+    """
+    Devuelve la estructura de distancias adecuada para la instancia.
+
+    Para instancias pequeñas se calcula la matriz completa, a partir de
+    umbral ciudades se devuelve un OraculoDistancia para mantener la
+    memoria en O(n).
+
+    Parámetros:
+    ----------
+    cities (lista de listas de floats): Coordenadas (x, y) de las ciudades.
+    umbral (int): Cantidad de ciudades a partir de la cual se usa el oráculo.
+    dtype (np.dtype): Tipo de la matriz densa (np.float64 o np.float32).
+    euc_2d (bool): Si es True, redondea las distancias como TSPLIB EUC_2D.
+
+    Returns:
+    ------
+    distancias (np.ndarray / OraculoDistancia)
+    """
+    if len(cities) >= umbral:
+        return OraculoDistancia(cities, euc_2d)
+    return matriz_distancias(cities, dtype, euc_2d)
 
 
 def calcular_costo_ruta(ruta, distances):
@@ -29,3 +196,27 @@ def calculate_total_distance(tour, distance_matrix):
         # Agrega la distancia entre la actual ciudad y la siguiente ciudad
         total_distance += distance_matrix[tour[i]][tour[(i + 1) % len(tour)]]
     return total_distance
+
+
+def population_lengths(population, distance_matrix):
+    """
+    Calcula la distancia total de todos los recorridos de una población a la vez.
+
+    Las distancias de todas las aristas se obtienen con un solo acceso
+    vectorizado, D[pop, np.roll(pop, -1, 1)], y se suman por fila.
+
+    Parámetros:
+    ----------
+    population (np.ndarray (p, n) / lista de recorridos del mismo largo): Recorridos abiertos.
+    distance_matrix (np.ndarray / OraculoDistancia / lista de listas): Distancias entre ciudades.
+
+    Returns:
+    ------
+    lengths (np.ndarray de floats): Distancia total de cada recorrido, volviendo a la ciudad inicial.
+    """
+    population = np.asarray(population)
+    if population.ndim == 1:
+        population = population[None, :]
+    if not isinstance(distance_matrix, (np.ndarray, OraculoDistancia)):
+        distance_matrix = np.asarray(distance_matrix, dtype=np.float64)
+    return distance_matrix[population, np.roll(population, -1, axis=1)].sum(axis=1)
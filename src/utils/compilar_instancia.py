@@ -0,0 +1,100 @@
+# Compila instancias TSPLIB (.tsp + .opt.tour) a un formato binario.
+#
+# Cada instancia compilada es un directorio <instancia>.compilado/ junto a los
+# archivos originales con:
+#   - coordenadas.npy: arreglo float64 (n, 2) con las coordenadas.
+#   - ruta_optima.npy: arreglo int32 (n + 1) con la ruta optima cerrada.
+#   - metadatos.json: nombre, dimension, tipo de distancia, longitud optima
+#                     y firma (tamaño, fecha) de los archivos fuente.
+#
+# Los arreglos se cargan con np.load(mmap_mode="r"), y obtener_ciudades y
+# obtener_mejor_ruta los prefieren automaticamente mientras esten actualizados.
+#
+# Uso (desde src/):
+#   python utils/compilar_instancia.py ../doc/Benchmarks/sra104815.tsp ...
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from utils.leer_archivo import (
+    VERSION_COMPILADO,
+    firma_archivo,
+    leer_instancia,
+    leer_ruta,
+    nombre_instancia,
+    ruta_compilado,
+)
+
+
+def longitud_ruta(coordenadas, ruta):
+    """
+    Longitud euclidiana de una ruta cerrada, calculada de forma vectorizada.
+    """
+    tramos = np.diff(coordenadas[ruta], axis=0)
+    return float(np.sqrt((tramos * tramos).sum(axis=1)).sum())
+
+
+def compilar_instancia(tsp_filename, tour_filename=None):
+    """
+    Compila una instancia TSPLIB al formato binario.
+
+    Parámetros:
+    ----------
+    tsp_filename (str / Path): Archivo .tsp de la instancia.
+    tour_filename (str / Path, opcional): Archivo .opt.tour. Por defecto se
+                                          busca <instancia>.opt.tour junto al .tsp.
+
+    Returns:
+    ------
+    directorio (Path): Directorio con la instancia compilada.
+    """
+    tsp_filename = Path(tsp_filename)
+    if tour_filename is None:
+        tour_filename = tsp_filename.with_name(f"{nombre_instancia(tsp_filename)}.opt.tour")
+    tour_filename = Path(tour_filename)
+
+    encabezado, coordenadas = leer_instancia(tsp_filename)
+    metadatos = {
+        "version": VERSION_COMPILADO,
+        "nombre": encabezado.get("NAME", nombre_instancia(tsp_filename)),
+        "dimension": len(coordenadas),
+        "edge_weight_type": encabezado.get("EDGE_WEIGHT_TYPE"),
+        "longitud_optima": None,
+        "fuentes": {"tsp": {"archivo": tsp_filename.name, "firma": firma_archivo(tsp_filename)}},
+    }
+
+    directorio = ruta_compilado(tsp_filename)
+    directorio.mkdir(exist_ok=True)
+    # Invalida la compilacion anterior antes de sobrescribir los arreglos
+    (directorio / "metadatos.json").unlink(missing_ok=True)
+    np.save(directorio / "coordenadas.npy", coordenadas)
+
+    if tour_filename.exists():
+        ruta = leer_ruta(tour_filename)
+        np.save(directorio / "ruta_optima.npy", ruta)
+        metadatos["longitud_optima"] = longitud_ruta(coordenadas, ruta)
+        metadatos["fuentes"]["tour"] = {
+            "archivo": tour_filename.name,
+            "firma": firma_archivo(tour_filename),
+        }
+
+    # Los metadatos se escriben al final: una compilacion interrumpida
+    # nunca queda marcada como actualizada
+    temporal = directorio / "metadatos.json.tmp"
+    with open(temporal, "w") as file:
+        json.dump(metadatos, file, indent=2)
+    os.replace(temporal, directorio / "metadatos.json")
+
+    return directorio
+
+
+if __name__ == "__main__":
+
+    for filename in sys.argv[1:]:
+        directorio = compilar_instancia(filename)
+        print(f"{filename} -> {directorio}")
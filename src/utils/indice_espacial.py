@@ -0,0 +1,309 @@
+import math
+import weakref
+
+import numpy as np
+
+from utils.calcular_distancia import OraculoDistancia
+
+# Listas de candidatos por matriz: id(matriz) -> (referencia débil a la
+# matriz, {(k, cuadrantes): candidatos}). La entrada se borra cuando la
+# matriz deja de existir, por lo que la cache no la mantiene en memoria
+_cache_candidatos = {}
+
+
+class IndiceEspacial:
+    """
+    Índice espacial de rejilla uniforme sobre las coordenadas de las ciudades.
+
+    Las ciudades se ordenan por celda (O(n log n)) y cada consulta recorre
+    anillos de celdas alrededor del punto, por lo que las listas de vecinos
+    cercanos de todas las ciudades se obtienen en O(n log n) en lugar de O(n^2).
+
+    Parámetros:
+    ----------
+    coords (lista de listas de floats / np.ndarray): Coordenadas (x, y) de las ciudades.
+    puntos_por_celda (int): Cantidad promedio de ciudades por celda.
+    """
+
+    def __init__(self, coords, puntos_por_celda=4):
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        n = len(self.coords)
+
+        self.minimo = self.coords.min(axis=0)
+        ancho, alto = self.coords.max(axis=0) - self.minimo
+        # El tamaño de celda sale del lado mayor: con el área, ciudades
+        # colineales (o casi) darían celdas diminutas y una rejilla con
+        # cientos de miles de filas vacías. Así la rejilla tiene a lo sumo
+        # ~n / puntos_por_celda celdas
+        self.tam_celda = max(max(ancho, alto) * math.sqrt(puntos_por_celda / max(n, 1)), 1e-9)
+        self.nx = int(ancho / self.tam_celda) + 1
+        self.ny = int(alto / self.tam_celda) + 1
+
+        celda_xy = ((self.coords - self.minimo) / self.tam_celda).astype(np.int64)
+        self.celda_x = np.minimum(celda_xy[:, 0], self.nx - 1)
+        self.celda_y = np.minimum(celda_xy[:, 1], self.ny - 1)
+        celdas = self.celda_y * self.nx + self.celda_x
+
+        # Estructura tipo CSR: las ciudades de la celda c son
+        # self.orden[self.inicio[c]:self.inicio[c + 1]]
+        self.orden = np.argsort(celdas, kind="stable")
+        self.inicio = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(celdas, minlength=self.nx * self.ny), out=self.inicio[1:])
+
+    def __len__(self):
+        return len(self.coords)
+
+    def ciudades_region(self, x0, x1, y0, y1):
+        """
+        Ciudades en las celdas [x0, x1] x [y0, y1] (recortadas a la rejilla).
+        """
+        x0, x1 = max(x0, 0), min(x1, self.nx - 1)
+        y0, y1 = max(y0, 0), min(y1, self.ny - 1)
+        partes = [
+            self.orden[self.inicio[fila * self.nx + x0] : self.inicio[fila * self.nx + x1 + 1]]
+            for fila in range(y0, y1 + 1)
+        ]
+        return np.concatenate(partes) if partes else np.empty(0, dtype=np.int64)
+
+    def _margen(self, ciudades, cx, cy, r):
+        # Distancia de cada ciudad al borde de la region de celdas consultada,
+        # los lados que alcanzan el borde de la rejilla no limitan la busqueda
+        x = self.coords[ciudades, 0] - self.minimo[0]
+        y = self.coords[ciudades, 1] - self.minimo[1]
+        s = self.tam_celda
+        margen = np.full(len(ciudades), np.inf)
+        if cx - r > 0:
+            margen = np.minimum(margen, x - (cx - r) * s)
+        if cx + r < self.nx - 1:
+            margen = np.minimum(margen, (cx + r + 1) * s - x)
+        if cy - r > 0:
+            margen = np.minimum(margen, y - (cy - r) * s)
+        if cy + r < self.ny - 1:
+            margen = np.minimum(margen, (cy + r + 1) * s - y)
+        return margen
+
+    def _distancias(self, ciudades, candidatos):
+        diferencia = self.coords[ciudades, None, :] - self.coords[None, candidatos, :]
+        distancias = np.sqrt((diferencia * diferencia).sum(axis=2))
+        # Una ciudad no es vecina de sí misma
+        distancias[ciudades[:, None] == candidatos[None, :]] = np.inf
+        return distancias
+
+    def k_vecinos(self, k):
+        """
+        Los k vecinos más cercanos de cada ciudad.
+
+        Returns:
+        ------
+        vecinos (np.ndarray int32 (n, k)): vecinos[i] son los k vecinos de i
+                                           ordenados por distancia creciente.
+        """
+        n = len(self.coords)
+        k = min(k, n - 1)
+        vecinos = np.empty((n, k), dtype=np.int32)
+        if k <= 0:
+            return vecinos
+
+        for celda in np.flatnonzero(np.diff(self.inicio)):
+            pendientes = self.orden[self.inicio[celda] : self.inicio[celda + 1]]
+            cx, cy = celda % self.nx, celda // self.nx
+            r = 1
+            while pendientes.size:
+                candidatos = self.ciudades_region(cx - r, cx + r, cy - r, cy + r)
+                cubre_todo = candidatos.size == n
+                if candidatos.size <= k and not cubre_todo:
+                    r += 1
+                    continue
+
+                distancias = self._distancias(pendientes, candidatos)
+                mas_cercanos = np.argpartition(distancias, k - 1, axis=1)[:, :k]
+                d_cercanos = np.take_along_axis(distancias, mas_cercanos, axis=1)
+                orden = np.argsort(d_cercanos, axis=1, kind="stable")
+                mas_cercanos = np.take_along_axis(mas_cercanos, orden, axis=1)
+                d_k = np.take_along_axis(d_cercanos, orden[:, -1:], axis=1)[:, 0]
+
+                # El resultado es exacto si el k-esimo vecino está más cerca
+                # que el borde de la region consultada
+                if cubre_todo:
+                    listos = np.ones(len(pendientes), dtype=bool)
+                else:
+                    listos = d_k <= self._margen(pendientes, cx, cy, r)
+                vecinos[pendientes[listos]] = candidatos[mas_cercanos[listos]]
+                pendientes = pendientes[~listos]
+                r += 1
+
+        return vecinos
+
+    def vecinos_cuadrantes(self, q, anillos=2):
+        """
+        Los q vecinos más cercanos de cada ciudad en cada uno de los cuatro
+        cuadrantes a su alrededor.
+
+        La búsqueda se limita a las celdas a distancia anillos de la celda
+        de la ciudad, por lo que es una aproximación: en zonas poco densas
+        un cuadrante puede tener menos de q vecinos.
+
+        Returns:
+        ------
+        vecinos (np.ndarray int32 (n, 4q)): vecinos por cuadrante, -1 si no hay.
+        """
+        n = len(self.coords)
+        vecinos = np.full((n, 4 * q), -1, dtype=np.int32)
+
+        for celda in np.flatnonzero(np.diff(self.inicio)):
+            ciudades = self.orden[self.inicio[celda] : self.inicio[celda + 1]]
+            cx, cy = celda % self.nx, celda // self.nx
+            candidatos = self.ciudades_region(cx - anillos, cx + anillos, cy - anillos, cy + anillos)
+            distancias = self._distancias(ciudades, candidatos)
+
+            dx = self.coords[candidatos, 0][None, :] - self.coords[ciudades, 0][:, None]
+            dy = self.coords[candidatos, 1][None, :] - self.coords[ciudades, 1][:, None]
+            cuadrantes = (
+                (dx >= 0) & (dy > 0),
+                (dx < 0) & (dy >= 0),
+                (dx <= 0) & (dy < 0),
+                (dx > 0) & (dy <= 0),
+            )
+            for c, mascara in enumerate(cuadrantes):
+                d = np.where(mascara, distancias, np.inf)
+                m = min(q, d.shape[1])
+                mas_cercanos = np.argsort(d, axis=1, kind="stable")[:, :m]
+                validos = np.isfinite(np.take_along_axis(d, mas_cercanos, axis=1))
+                bloque = np.where(validos, candidatos[mas_cercanos], -1)
+                vecinos[ciudades, c * q : c * q + m] = bloque
+
+        return vecinos
+
+
+def _unir_candidatos(coords, vecinos, extra):
+    # Une los k vecinos con los vecinos por cuadrante, sin repetidos y
+    # ordenados por distancia; las filas se completan con -1
+    todos = np.concatenate((vecinos, extra), axis=1).astype(np.int64)
+    validos = todos >= 0
+    diferencia = coords[np.where(validos, todos, 0)] - coords[:, None, :]
+    distancias = np.where(validos, (diferencia * diferencia).sum(axis=2), np.inf)
+
+    # Marca los repetidos de cada fila comparando los vecinos ordenados por indice
+    orden = np.argsort(np.where(validos, todos, -1), axis=1, kind="stable")
+    ordenados = np.take_along_axis(todos, orden, axis=1)
+    repetido = np.zeros_like(validos)
+    repetido[:, 1:] = ordenados[:, 1:] == ordenados[:, :-1]
+    np.put_along_axis(distancias, orden, np.where(repetido, np.inf, np.take_along_axis(distancias, orden, axis=1)), axis=1)
+
+    orden = np.argsort(distancias, axis=1, kind="stable")
+    resultado = np.where(
+        np.isfinite(np.take_along_axis(distancias, orden, axis=1)),
+        np.take_along_axis(todos, orden, axis=1),
+        -1,
+    )
+    ancho = int(np.isfinite(distancias).sum(axis=1).max())
+    return resultado[:, :ancho].astype(np.int32)
+
+
+def listas_candidatas(coords, k=10, cuadrantes=0):
+    """
+    Construye las listas de candidatos de cada ciudad a partir de sus coordenadas.
+
+    Parámetros:
+    ----------
+    coords (lista de listas de floats / np.ndarray): Coordenadas (x, y) de las ciudades.
+    k (int): Cantidad de vecinos más cercanos por ciudad.
+    cuadrantes (int): Vecinos adicionales más cercanos por cuadrante (0 para no usarlos).
+
+    Returns:
+    ------
+    candidatos (np.ndarray int32 (n, m)): Candidatos de cada ciudad ordenados
+                                          por distancia, completados con -1.
+
+    Complejidad de tiempo:
+    O(n log n) para una distribución razonable de las ciudades.
+    """
+    indice = IndiceEspacial(coords)
+    vecinos = indice.k_vecinos(k)
+    if cuadrantes > 0:
+        vecinos = _unir_candidatos(indice.coords, vecinos, indice.vecinos_cuadrantes(cuadrantes))
+    return vecinos
+
+
+def listas_candidatas_matriz(distance_matrix, k=10, tam_bloque=256):
+    """
+    Construye las listas de los k vecinos más cercanos desde una matriz de distancias.
+
+    Se usa cuando no se tienen las coordenadas. La matriz se recorre por
+    bloques de filas, en O(n^2) tiempo y O(tam_bloque * n) memoria adicional.
+
+    Returns:
+    ------
+    candidatos (np.ndarray int32 (n, k)): Candidatos ordenados por distancia.
+    """
+    matriz = np.asarray(distance_matrix)
+    n = len(matriz)
+    k = min(k, n - 1)
+    vecinos = np.empty((n, k), dtype=np.int32)
+    for inicio in range(0, n, tam_bloque):
+        fin = min(inicio + tam_bloque, n)
+        bloque = np.array(matriz[inicio:fin], dtype=np.float64)
+        bloque[np.arange(fin - inicio), np.arange(inicio, fin)] = np.inf
+        mas_cercanos = np.argpartition(bloque, k - 1, axis=1)[:, :k]
+        d_cercanos = np.take_along_axis(bloque, mas_cercanos, axis=1)
+        orden = np.argsort(d_cercanos, axis=1, kind="stable")
+        vecinos[inicio:fin] = np.take_along_axis(mas_cercanos, orden, axis=1)
+    return vecinos
+
+
+def obtener_candidatos(distance_matrix, k=10, cuadrantes=0):
+    """
+    Listas de candidatos para una matriz de distancias u OraculoDistancia.
+
+    Con un oráculo se usa el índice espacial sobre sus coordenadas; con una
+    matriz se toman los k más cercanos de cada fila (los cuadrantes requieren
+    coordenadas y se ignoran). El resultado se guarda en una cache mientras
+    exista la matriz (u oráculo), por lo que llamadas repetidas con el mismo
+    objeto no lo recalculan. Las listas de listas no se guardan. Si la matriz
+    se modifica en el lugar, las listas guardadas quedan desactualizadas: en
+    ese caso se deben pasar las listas de candidatos explícitamente.
+
+    Parámetros:
+    ----------
+    distance_matrix (np.ndarray / lista de listas / OraculoDistancia): Distancias entre ciudades.
+    k (int): Cantidad de vecinos más cercanos por ciudad.
+    cuadrantes (int): Vecinos adicionales por cuadrante (solo con coordenadas).
+
+    Returns:
+    ------
+    candidatos (np.ndarray int32 (n, m)): Candidatos de cada ciudad, -1 como relleno.
+    """
+    clave = (k, cuadrantes)
+    entrada = _cache_candidatos.get(id(distance_matrix))
+    if entrada is not None and entrada[0]() is distance_matrix and clave in entrada[1]:
+        return entrada[1][clave]
+
+    if isinstance(distance_matrix, OraculoDistancia):
+        coords = np.column_stack((distance_matrix.x, distance_matrix.y))
+        candidatos = listas_candidatas(coords, k, cuadrantes)
+    else:
+        candidatos = listas_candidatas_matriz(distance_matrix, k)
+
+    try:
+        referencia = weakref.ref(distance_matrix)
+    except TypeError:
+        # Las listas no admiten referencias débiles
+        return candidatos
+    if entrada is None or entrada[0]() is not distance_matrix:
+        entrada = (referencia, {})
+        _cache_candidatos[id(distance_matrix)] = entrada
+        weakref.finalize(distance_matrix, _cache_candidatos.pop, id(distance_matrix), None)
+    entrada[1][clave] = candidatos
+    return candidatos
+
+
+def candidatos_como_listas(candidatos):
+    """
+    Convierte las listas de candidatos a listas de Python sin el relleno -1,
+    más rápidas de recorrer dentro de los ciclos de las heurísticas.
+    """
+    if candidatos is None:
+        return None
+    if isinstance(candidatos, np.ndarray):
+        return [[c for c in fila if c >= 0] for fila in candidatos.tolist()]
+    return [[c for c in fila if c >= 0] for fila in candidatos]
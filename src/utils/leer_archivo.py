@@ -1,46 +1,165 @@
-# Función que lee un archivo .tsp y devuelve una matriz con las coordenadas de los nodos
-# Se ignoran las primeras 6 lineas del archivo que contienen informacion respecto al problema
-def obtener_ciudades(filename):
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Version del formato compilado (ver utils/compilar_instancia.py)
+VERSION_COMPILADO = 1
+
+
+# Lee el encabezado de un archivo TSPLIB linea por linea hasta encontrar
+# el inicio de una seccion de datos (por ejemplo NODE_COORD_SECTION).
+# Acepta tanto "CLAVE: valor" como "CLAVE : valor".
+# Devuelve un diccionario con las claves del encabezado y el nombre de la seccion.
+def leer_encabezado(file):
+    encabezado = {}
+    for line in file:
+        line = line.strip()
+        if not line:
+            continue
+        if line.endswith("_SECTION"):
+            return encabezado, line
+        if line == "EOF":
+            break
+        clave, _, valor = line.partition(":")
+        encabezado[clave.strip().upper()] = valor.strip()
+    return encabezado, None
+
+
+# Función que lee un archivo .tsp y devuelve sus coordenadas junto con el encabezado
+# (DIMENSION, EDGE_WEIGHT_TYPE, ...). El archivo se procesa en una sola pasada:
+# el arreglo (n, 2) se reserva a partir de DIMENSION y se llena linea por linea.
+def leer_instancia(filename):
     with open(filename, "r") as file:
-        lines = file.readlines()
+        encabezado, seccion = leer_encabezado(file)
+        if seccion != "NODE_COORD_SECTION":
+            raise ValueError(f"{filename}: no se encontro NODE_COORD_SECTION")
 
-    start_index = lines.index("NODE_COORD_SECTION\n") + 1
+        n = int(encabezado["DIMENSION"])
+        coordinates = np.empty((n, 2), dtype=np.float64)
 
-    # Lee las lineas desde la 7 a la penúltima, donde se encuentran las coordendas de los nodos
-    node_lines = lines[start_index:-1]
+        i = 0
+        for line in file:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == "EOF":
+                break
+            if i == n:
+                raise ValueError(f"{filename}: hay mas nodos que DIMENSION ({n})")
+            # Convierte las coordenadas a flotantes y las añade a la matriz
+            coordinates[i, 0] = float(words[1])
+            coordinates[i, 1] = float(words[2])
+            i += 1
 
-    # Inicializa la matriz de coordenadas
-    coordinates = []
+    if i < n:
+        raise ValueError(f"{filename}: se esperaban {n} nodos y se leyeron {i}")
 
-    # Procesa cada línea
-    for line in node_lines:
-        # Divide la línea en palabras
-        words = line.split()
+    return encabezado, coordinates
 
-        # Convierte las coordenadas a flotantes y las añade a la matriz
-        coordinates.append([float(words[1]), float(words[2])])
 
+# Función que lee un archivo .tsp y devuelve una matriz (n, 2) con las coordenadas de los nodos.
+# Si existe una version compilada y actualizada de la instancia, se usa esa.
+def obtener_ciudades(filename):
+    coordinates = cargar_compilado(filename, "coordenadas")
+    if coordinates is not None:
+        return coordinates
+    _, coordinates = leer_instancia(filename)
     return coordinates
 
 
 # Funcion para obtener la mejor ruta de los archivos .opt.tour
 # para luego calcular la distancia, ya que los archivos no la incluyen
-# se les resta 1 a las ciudades para que coincidan con el indice de la matriz
+# se les resta 1 a las ciudades para que coincidan con el indice de la matriz.
+# La ruta se devuelve cerrada (n + 1 ciudades) en un arreglo int32.
+# Si existe una version compilada y actualizada de la instancia, se usa esa.
 def obtener_mejor_ruta(filename):
+    ruta = cargar_compilado(filename, "ruta_optima")
+    if ruta is not None:
+        return ruta
+    return leer_ruta(filename)
+
+
+# Lee la ruta de un archivo .opt.tour en una sola pasada
+def leer_ruta(filename):
     with open(filename, "r") as file:
-        lines = file.readlines()
-    start_index = lines.index("TOUR_SECTION\n") + 1
-    end_index = lines.index("-1\n")
-    node_lines = lines[start_index:end_index]
-    ruta = []
-    # Procesa cada línea
-    for line in node_lines:
-        # Divide la línea en palabras
-        words = line.split()
-        for num in words:
-            ruta.append(int(num) - 1)
-
-        # Convierte las coordenadas a flotantes y las añade a la matriz
-        # ruta.append(int(words[0])-1)
-    ruta.append(ruta[0])
+        encabezado, seccion = leer_encabezado(file)
+        if seccion != "TOUR_SECTION":
+            raise ValueError(f"{filename}: no se encontro TOUR_SECTION")
+
+        n = int(encabezado["DIMENSION"])
+        ruta = np.empty(n + 1, dtype=np.int32)
+
+        i = 0
+        terminado = False
+        for line in file:
+            # Una linea puede contener uno o varios nodos
+            for num in line.split():
+                if num == "-1" or num == "EOF":
+                    terminado = True
+                    break
+                if i == n:
+                    raise ValueError(f"{filename}: hay mas nodos que DIMENSION ({n})")
+                ruta[i] = int(num) - 1
+                i += 1
+            if terminado:
+                break
+
+    if i < n:
+        raise ValueError(f"{filename}: se esperaban {n} nodos y se leyeron {i}")
+
+    ruta[n] = ruta[0]
     return ruta
+
+
+# Nombre base de una instancia a partir de su archivo .tsp u .opt.tour
+def nombre_instancia(filename):
+    nombre = Path(filename).name
+    for extension in (".opt.tour", ".tour", ".tsp"):
+        if nombre.endswith(extension):
+            return nombre[: -len(extension)]
+    return Path(filename).stem
+
+
+# Directorio donde se guarda la version compilada de una instancia:
+# <instancia>.compilado/ junto a los archivos .tsp y .opt.tour
+def ruta_compilado(filename):
+    filename = Path(filename)
+    return filename.with_name(f"{nombre_instancia(filename)}.compilado")
+
+
+# Identifica la version de un archivo fuente por su tamaño y fecha de modificacion
+def firma_archivo(filename):
+    estado = os.stat(filename)
+    return {"tamano": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+
+
+# Lee los metadatos de la version compilada de una instancia, None si no existe
+def leer_metadatos(filename):
+    try:
+        with open(ruta_compilado(filename) / "metadatos.json", "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+# Carga un arreglo ("coordenadas" o "ruta_optima") de la version compilada de la
+# instancia mapeado en memoria. Devuelve None si no existe o si el archivo
+# fuente cambio despues de compilarla.
+def cargar_compilado(filename, arreglo):
+    metadatos = leer_metadatos(filename)
+    if metadatos is None or metadatos.get("version") != VERSION_COMPILADO:
+        return None
+
+    fuente = metadatos["fuentes"].get("tsp" if arreglo == "coordenadas" else "tour")
+    try:
+        if fuente is None or fuente["firma"] != firma_archivo(filename):
+            return None
+    except OSError:
+        return None
+
+    try:
+        return np.load(ruta_compilado(filename) / f"{arreglo}.npy", mmap_mode="r")
+    except OSError:
+        return None
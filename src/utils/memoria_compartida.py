@@ -0,0 +1,65 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class ArreglosCompartidos:
+    """
+    Arreglos de NumPy copiados a bloques de multiprocessing.shared_memory.
+
+    Los procesos de un ProcessPoolExecutor se conectan a los bloques con
+    conectar(specs) (normalmente en su inicializador), en lugar de recibir
+    los arreglos serializados con cada tarea. Lo que el proceso principal
+    escribe en arrays[nombre] lo ven todos los procesos y viceversa.
+
+    Parámetros:
+    ----------
+    arrays (np.ndarray por nombre): Arreglos a compartir; se copian una vez.
+    """
+
+    def __init__(self, **arrays):
+        self.arrays = {}
+        self.specs = {}
+        self._blocks = []
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+                view[...] = array
+                self.arrays[name] = view
+                self.specs[name] = (block.name, array.shape, array.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """
+        Libera los bloques. Antes deben soltarse todas las referencias a las
+        vistas de arrays fuera de este objeto.
+        """
+        self.arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+def conectar(specs):
+    """
+    Se conecta desde otro proceso a los bloques descritos por specs
+    (ArreglosCompartidos.specs).
+
+    Returns:
+    ------
+    tuple: (arrays, blocks) con las vistas por nombre y los bloques, que
+           deben mantenerse vivos mientras se usen las vistas.
+    """
+    arrays = {}
+    blocks = []
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return arrays, blocks
@@ -2,13 +2,14 @@ import random
 import numpy as np
 
 from utils.calcular_distancia import calcular_distancia, calculate_total_distance
+from utils.tour import posiciones
 
 def is_valid_individual(individual, num_cities):
     return len(individual) == num_cities and len(set(individual)) == num_cities
     #return set(individual) == set(range(num_cities))
 
 
-def aptitude_probability(distance_matrix, population):
+def aptitude_probability(distance_matrix, population, population_dist=None):
     """
     Calcula la probabilidad de aptitud de cada individuo en la población.
 
@@ -17,6 +18,7 @@ def aptitude_probability(distance_matrix, population):
 
     distance_matrix (lista de listas de floats): Matriz de distancias entre ciudades.
     population (lista de listas de ints): Población de individuos a ser evaluados.
+    population_dist (np.ndarray de floats, opcional): Distancias ya calculadas de los individuos.
 
     Returns:
     ------
@@ -24,7 +26,10 @@ def aptitude_probability(distance_matrix, population):
     population_apt_probs (lista de floats): Probabilidad de aptitud de cada individuo en la población.
     """
 
-    total_distances = [calculate_total_distance(ind, distance_matrix) for ind in population]
+    if population_dist is None:
+        total_distances = [calculate_total_distance(ind, distance_matrix) for ind in population]
+    else:
+        total_distances = population_dist
     # max_dist = max(population_dist)
     fitness = 1 / np.array(total_distances)
     probabilities = fitness / fitness.sum()
@@ -48,13 +53,100 @@ def roulette_selection(population, probabilities):
     selected_individual (lista de ints): Individuo seleccionado.
     """
 
-    cumulative_prob = np.cumsum(probabilities)
-    r = random.random()
-    for i, individual in enumerate(population):
-        if r <= cumulative_prob[i]:
-            return individual
-    #selected_individual_index = np.searchsorted(cumulative_sum_probs, random_value)
-    #return population[selected_individual_index]
+    return population[int(roulette_indices(np.cumsum(probabilities), random.random()))]
+
+def roulette_indices(cumulative_prob, random_values):
+    """
+    Índices elegidos por la ruleta para uno o varios valores aleatorios en
+    [0, 1): el primer individuo cuya probabilidad acumulada es mayor que el
+    valor (los de probabilidad 0 nunca se eligen), con una búsqueda binaria
+    (O(log p) por valor).
+    """
+    indices = np.searchsorted(cumulative_prob, random_values, side="right")
+    # Por redondeo la ultima suma acumulada puede quedar por debajo de 1
+    return np.minimum(indices, len(cumulative_prob) - 1)
+
+def alias_table(probabilities):
+    """
+    Tabla de alias de Walker (construcción de Vose) para muestrear una
+    distribución discreta en O(1) por muestra.
+
+    Cada casilla i guarda la probabilidad prob[i] de quedarse en i y el
+    índice alias[i] al que se salta en otro caso.
+
+    Parámetros:
+    ----------
+    probabilities (np.ndarray de floats): Probabilidades (no necesitan sumar 1).
+
+    Returns:
+    ------
+    tuple: (prob, alias), arreglos de p floats y p ints.
+
+    Complejidad de tiempo:
+    O(p).
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    p = len(probabilities)
+    scaled = (probabilities * (p / probabilities.sum())).tolist()
+    prob = [1.0] * p
+    alias = list(range(p))
+    small = [i for i, q in enumerate(scaled) if q < 1.0]
+    large = [i for i, q in enumerate(scaled) if q >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] -= 1.0 - scaled[s]
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+    # Las casillas restantes quedan con probabilidad 1 (errores de redondeo)
+    return np.array(prob), np.array(alias, dtype=np.intp)
+
+def alias_sample(table, size, rng):
+    # Muestras de una tabla de alias: una casilla al azar y una moneda
+    prob, alias = table
+    slots = rng.integers(0, len(prob), size)
+    return np.where(rng.random(size) < prob[slots], slots, alias[slots])
+
+def select_parents(probabilities, n_parents, method="roulette", rng=None, tournament_size=2):
+    """
+    Selecciona todos los padres de una generación en una sola llamada.
+
+    - "roulette": ruleta con una sola suma acumulada y np.searchsorted
+      para todos los valores aleatorios, O(p + m log p).
+    - "alias": ruleta con una tabla de alias de Walker, O(p + m).
+    - "tournament": torneos de tournament_size individuos elegidos al azar
+      (con reemplazo); gana el de mayor probabilidad de aptitud, O(m * t).
+
+    Parámetros:
+    ----------
+    probabilities (np.ndarray de floats): Probabilidad de aptitud de cada individuo.
+    n_parents (int): Cantidad de padres a seleccionar.
+    method (str): "roulette", "alias" o "tournament".
+    rng (np.random.Generator, opcional): Generador a usar. Por defecto se
+        crea uno con una semilla del módulo random, de modo que random.seed
+        hace reproducible el resultado.
+    tournament_size (int): Cantidad de individuos por torneo.
+
+    Returns:
+    ------
+    indices (np.ndarray de ints): Índices de los padres en la población.
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+
+    if method == "roulette":
+        return roulette_indices(np.cumsum(probabilities), rng.random(n_parents))
+    if method == "alias":
+        return alias_sample(alias_table(probabilities), n_parents, rng)
+    if method == "tournament":
+        contestants = rng.integers(0, len(probabilities), size=(n_parents, tournament_size))
+        winners = np.argmax(probabilities[contestants], axis=1)
+        return contestants[np.arange(n_parents), winners]
+    raise ValueError("Selection method not valid")
 
 def triple_crossover(numCities, parents):
     """
@@ -64,7 +156,7 @@ def triple_crossover(numCities, parents):
     ----------
 
     numCities (int): Número de ciudades en el problema.
-    parents (lista de listas de ints): Tres padres a ser combinados.
+    parents (lista de listas de ints / Tour): Tres padres a ser combinados.
     
     Returns:
     ------
@@ -85,18 +177,25 @@ def triple_crossover(numCities, parents):
         crossover_point1 : crossover_point2 + 1
     ]
 
+    # Ciudades ya presentes en el descendiente, consultadas en O(1)
+    en_offspring = [False] * numCities
+    for city in offspring[crossover_point1 : crossover_point2 + 1]:
+        en_offspring[city] = True
+
     # Rellena el resto de los genes del descendiente usando el segundo y tercer padre
     current_index = (crossover_point2 + 1) % numCities
     for parent in [parent2, parent3]:
         for city in parent:
-            if city not in offspring:
+            if not en_offspring[city]:
                 offspring[current_index] = city
+                en_offspring[city] = True
                 current_index = (current_index + 1) % numCities
 
     # Si aún hay ciudades sin asignar, completa con las ciudades restantes del primer padre
     for city in parent1:
-        if city not in offspring:
+        if not en_offspring[city]:
             offspring[current_index] = city
+            en_offspring[city] = True
             current_index = (current_index + 1) % numCities
 
     ## Selecciona tres puntos de cruce aleatorios
@@ -130,19 +229,219 @@ def triple_crossover(numCities, parents):
     #                used_genes.add(gene)
     #                break
 
-    # Encontrar el valor faltante
-    for i in range(numCities):
-        if i not in offspring:
-            print(f"Missing value: {i}")
-            break
-
-    # Encontrar el valor repetido
-    for i in range(numCities):
-        if offspring.count(i) > 1:
-            print(f"Repeated value: {i}")
-            break
     return offspring
 
+def pmx_crossover(parent1, parent2, c1, c2):
+    """
+    Hijo del cruce parcialmente mapeado (PMX): toma el segmento
+    parent1[c1:c2] y el resto de las ciudades de parent2, ubicando cada
+    ciudad del segmento de parent2 que falta siguiendo el mapeo entre los
+    segmentos de ambos padres.
+
+    Parámetros:
+    ----------
+    parent1, parent2 (lista de ints / Tour): Padres, permutaciones de 0..n-1.
+    c1, c2 (int): Límites del segmento, c1 <= c2.
+
+    Returns:
+    ------
+    offspring (lista de ints): Descendiente.
+
+    Complejidad de tiempo:
+    O(n), con arreglos de posiciones y de pertenencia en lugar de index / in.
+    """
+    n = len(parent1)
+    offspring = [-1] * n
+    offspring[c1:c2] = parent1[c1:c2]
+    pos2 = posiciones(parent2, n)
+    en_offspring = [False] * n
+    for i in range(c1, c2):
+        en_offspring[offspring[i]] = True
+
+    for i in range(c1, c2):
+        city = parent2[i]
+        if not en_offspring[city]:
+            j = i
+            while offspring[j] != -1:
+                j = pos2[parent1[j]]
+            offspring[j] = city
+            en_offspring[city] = True
+
+    for i in range(n):
+        if offspring[i] == -1:
+            offspring[i] = parent2[i]
+    return offspring
+
+def order_crossover(parent1, parent2, c1, c2):
+    """
+    Hijo del cruce de orden (OX): toma el segmento parent1[c1:c2] y completa
+    las demás posiciones, desde c2 y dando la vuelta, con las ciudades de
+    parent2 en el orden en que aparecen a partir de c2.
+
+    Parámetros:
+    ----------
+    parent1, parent2 (lista de ints / Tour): Padres, permutaciones de 0..n-1.
+    c1, c2 (int): Límites del segmento, c1 <= c2.
+
+    Returns:
+    ------
+    offspring (lista de ints): Descendiente.
+
+    Complejidad de tiempo:
+    O(n).
+    """
+    n = len(parent1)
+    offspring = list(parent1)
+    en_segmento = [False] * n
+    for i in range(c1, c2):
+        en_segmento[parent1[i]] = True
+
+    j = c2 % n
+    for k in range(n):
+        city = parent2[(c2 + k) % n]
+        if not en_segmento[city]:
+            offspring[j] = city
+            j = (j + 1) % n
+    return offspring
+
+def edge_recombination_crossover(parent1, parent2, rng=random):
+    """
+    Cruce de recombinación de aristas (ERX), con preferencia por las aristas
+    comunes a ambos padres.
+
+    Se arma la tabla de vecinos de cada ciudad en los dos padres (a lo sumo
+    4). Desde la primera ciudad de parent1, el hijo avanza a un vecino no
+    visitado unido por una arista común o, si no hay, al vecino con menos
+    vecinos no visitados (desempatando al azar); si la ciudad actual no tiene
+    vecinos disponibles, salta a una ciudad no visitada al azar. Así el hijo
+    hereda casi todas sus aristas de los padres.
+
+    Parámetros:
+    ----------
+    parent1, parent2 (lista de ints / Tour): Padres, permutaciones de 0..n-1.
+    rng (random.Random): Generador aleatorio. Por defecto el del módulo random.
+
+    Returns:
+    ------
+    offspring (lista de ints): Descendiente.
+
+    Complejidad de tiempo:
+    O(n): las listas de vecinos tienen a lo sumo 4 ciudades y las ciudades no
+    visitadas se guardan en un arreglo con eliminación en O(1).
+    """
+    n = len(parent1)
+    neighbours = [[] for _ in range(n)]
+    common = [[] for _ in range(n)]
+    for parent in (parent1, parent2):
+        for i in range(n):
+            a, b = parent[i - 1], parent[i]
+            for x, y in ((a, b), (b, a)):
+                if y in neighbours[x]:
+                    common[x].append(y)
+                else:
+                    neighbours[x].append(y)
+    remaining = [len(v) for v in neighbours]
+
+    # Ciudades no visitadas, con sus posiciones para eliminarlas en O(1)
+    unvisited = list(parent1)
+    where = list(posiciones(unvisited, n))
+    visited = [False] * n
+
+    offspring = []
+    current = parent1[0]
+    while True:
+        offspring.append(current)
+        visited[current] = True
+        last = unvisited.pop()
+        if last != current:
+            k = where[current]
+            unvisited[k] = last
+            where[last] = k
+        if not unvisited:
+            return offspring
+        for x in neighbours[current]:
+            remaining[x] -= 1
+
+        options = [x for x in common[current] if not visited[x]]
+        if not options:
+            options = [x for x in neighbours[current] if not visited[x]]
+            if options:
+                fewest = min(remaining[x] for x in options)
+                options = [x for x in options if remaining[x] == fewest]
+        if options:
+            current = options[0] if len(options) == 1 else options[int(rng.random() * len(options))]
+        else:
+            current = unvisited[int(rng.random() * len(unvisited))]
+
+def crossover_population(parents, method="ox", rng=None):
+    """
+    Cruza una generación completa de padres en una sola llamada.
+
+    Los padres se toman en grupos consecutivos: de a dos para "pmx", "ox" y
+    "erx", que producen dos hijos por pareja (uno con cada padre como
+    principal y, en "pmx" y "ox", los mismos puntos de corte), y de a tres
+    para "triple", que produce uno. Los padres sobrantes se ignoran.
+
+    El cruce "ox" se aplica a todas las parejas a la vez con operaciones
+    vectorizadas de NumPy: con la posición de cada ciudad en el primer padre
+    se marca qué ciudades están en su segmento, el segundo padre se rota
+    hasta c2 y sus ciudades fuera del segmento se ubican en orden con una
+    suma acumulada. Los demás métodos aplican su operador O(n) a cada grupo.
+
+    Parámetros:
+    ----------
+    parents (np.ndarray (m, n) / lista de listas de ints): Padres, permutaciones de 0..n-1.
+    method (str): "ox", "pmx", "erx" o "triple".
+    rng (np.random.Generator, opcional): Generador para los puntos de corte.
+        Por defecto se crea uno con una semilla del módulo random, de modo
+        que random.seed hace reproducible el resultado.
+
+    Returns:
+    ------
+    offspring (np.ndarray int32 (k, n)): Descendientes.
+    """
+    parents = np.asarray(parents, dtype=np.int32)
+    m, n = parents.shape
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))
+
+    if method == "triple":
+        groups = m // 3
+        offspring = [triple_crossover(n, parents[3 * g : 3 * g + 3].tolist()) for g in range(groups)]
+        return np.array(offspring, dtype=np.int32).reshape(-1, n)
+    if method not in ("ox", "pmx", "erx"):
+        raise ValueError("Crossover method not valid")
+
+    pairs = m // 2
+    first, second = parents[0 : 2 * pairs : 2], parents[1 : 2 * pairs : 2]
+    # Cada pareja produce dos hijos: (first, second) y (second, first)
+    main = np.concatenate((first, second))
+    other = np.concatenate((second, first))
+    cuts = np.sort(rng.integers(0, n, size=(pairs, 2)), axis=1)
+    c1 = np.tile(cuts[:, 0], 2)
+    c2 = np.tile(cuts[:, 1] + 1, 2)
+
+    if method == "ox":
+        rows = np.arange(2 * pairs)[:, None]
+        cols = np.arange(n)[None, :]
+        position = np.empty_like(main)
+        position[rows, main] = cols
+        in_segment = (position >= c1[:, None]) & (position < c2[:, None])
+        rotated = other[rows, (c2[:, None] + cols) % n]
+        keep = ~in_segment[rows, rotated]
+        target = (c2[:, None] + np.cumsum(keep, axis=1) - 1) % n
+        offspring = main.copy()
+        offspring[np.broadcast_to(rows, keep.shape)[keep], target[keep]] = rotated[keep]
+        return offspring
+
+    main, other = main.tolist(), other.tolist()
+    if method == "pmx":
+        offspring = [pmx_crossover(a, b, i, j) for a, b, i, j in zip(main, other, c1.tolist(), c2.tolist())]
+    else:
+        python_rng = random.Random(int(rng.integers(2 ** 63)))
+        offspring = [edge_recombination_crossover(a, b, python_rng) for a, b in zip(main, other)]
+    return np.array(offspring, dtype=np.int32).reshape(-1, n)
+
 def swap_mutation(individual):
     c1, c2 = sorted(random.sample(range(len(individual)), 2))
     individual[c1], individual[c2] = individual[c2], individual[c1]
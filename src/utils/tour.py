@@ -0,0 +1,167 @@
+from array import array
+
+import numpy as np
+
+
+class Tour:
+    """
+    Ruta representada como permutación de ciudades.
+
+    Guarda dos arreglos array('i') sincronizados: order[i] es la ciudad en la
+    posición i y pos[c] la posición de la ciudad c (-1 si no está en la ruta).
+    Así las consultas de pertenencia y posición cuestan O(1) y los
+    movimientos se aplican en el lugar, sin crear listas nuevas.
+
+    Parámetros:
+    ----------
+    cities (iterable de ints): Ciudades en el orden de la ruta. Si la ruta está
+                               cerrada (la última ciudad repite la primera),
+                               se ignora la repetición.
+    num_cities (int, opcional): Cantidad total de ciudades del problema, para
+                                rutas que no contienen a todas. Por defecto
+                                la ciudad más grande más uno.
+    """
+
+    def __init__(self, cities, num_cities=None):
+        if isinstance(cities, Tour):
+            cities = cities.order
+        elif isinstance(cities, np.ndarray):
+            cities = cities.astype(np.int32, copy=False).tolist()
+        self.order = array("i", cities)
+        n = len(self.order)
+        if n > 1 and self.order[0] == self.order[-1]:
+            self.order.pop()
+            n -= 1
+        if num_cities is None:
+            num_cities = max(self.order) + 1 if n else 0
+        self.pos = array("i", [-1]) * num_cities
+        for i, c in enumerate(self.order):
+            self.pos[c] = i
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.order[i].tolist()
+        return self.order[i]
+
+    def __contains__(self, c):
+        return 0 <= c < len(self.pos) and self.pos[c] >= 0
+
+    def __eq__(self, other):
+        if isinstance(other, Tour):
+            return self.order == other.order
+        return self.order.tolist() == list(other)
+
+    def __repr__(self):
+        return f"Tour({self.order.tolist()})"
+
+    def load(self, cities):
+        """
+        Reemplaza la ruta por cities en el lugar, en O(n) y reutilizando los
+        arreglos. Las ciudades deben ser menores a la cantidad total de
+        ciudades con la que se creó la ruta.
+        """
+        order, pos = self.order, self.pos
+        for c in order:
+            pos[c] = -1
+        if isinstance(cities, np.ndarray):
+            cities = cities.astype(np.int32, copy=False).tolist()
+        del order[:]
+        order.extend(cities)
+        if len(order) > 1 and order[0] == order[-1]:
+            order.pop()
+        for i, c in enumerate(order):
+            pos[c] = i
+
+    def copy(self):
+        tour = Tour.__new__(Tour)
+        tour.order = array("i", self.order)
+        tour.pos = array("i", self.pos)
+        return tour
+
+    def index(self, c):
+        """
+        Posición de la ciudad c en O(1), con la misma interfaz que list.index.
+        """
+        if c not in self:
+            raise ValueError(f"{c} no está en la ruta")
+        return self.pos[c]
+
+    def next(self, c):
+        i = self.pos[c] + 1
+        return self.order[i if i < len(self.order) else 0]
+
+    def prev(self, c):
+        return self.order[self.pos[c] - 1]
+
+    def between(self, a, b, c):
+        """
+        True si la ciudad b está en el camino a -> c (en el sentido de la ruta).
+        """
+        i, j, k = self.pos[a], self.pos[b], self.pos[c]
+        if i <= k:
+            return i <= j <= k
+        return j >= i or j <= k
+
+    def swap(self, i, j):
+        """
+        Intercambia las ciudades de las posiciones i y j.
+        """
+        order, pos = self.order, self.pos
+        ci, cj = order[i], order[j]
+        order[i], order[j] = cj, ci
+        pos[cj], pos[ci] = i, j
+
+    def reverse(self, i, j):
+        """
+        Invierte en el lugar el segmento de las posiciones i a j (inclusive).
+        Si i > j el segmento da la vuelta: i, ..., n - 1, 0, ..., j.
+
+        Complejidad de tiempo:
+        O(largo del segmento).
+        """
+        order, pos, n = self.order, self.pos, len(self.order)
+        largo = (j - i) % n + 1
+        for _ in range(largo // 2):
+            ci, cj = order[i], order[j]
+            order[i], order[j] = cj, ci
+            pos[cj], pos[ci] = i, j
+            i = i + 1 if i + 1 < n else 0
+            j = j - 1 if j > 0 else n - 1
+
+    def reverse_path(self, a, b):
+        """
+        Invierte el camino de la ciudad a a la ciudad b. Si es más largo que
+        la mitad de la ruta se invierte el complemento, que produce el mismo
+        ciclo con la mitad del trabajo como máximo.
+        """
+        n = len(self.order)
+        i, j = self.pos[a], self.pos[b]
+        if 2 * ((j - i) % n + 1) > n:
+            i, j = (j + 1) % n, (i - 1) % n
+        self.reverse(i, j)
+
+    def sequence(self, start):
+        """
+        Lista de las ciudades de la ruta empezando por start.
+        """
+        i = self.pos[start]
+        return self.order[i:].tolist() + self.order[:i].tolist()
+
+    def tolist(self):
+        return self.order.tolist()
+
+
+def posiciones(tour, num_cities=None):
+    """
+    Arreglo de posiciones de una ruta: el de la ruta si es un Tour, o uno
+    nuevo calculado en O(n) si es una lista.
+    """
+    if isinstance(tour, Tour):
+        return tour.pos
+    return Tour(tour, num_cities).pos
@@ -0,0 +1,302 @@
+# Lista doblemente enlazada de dos niveles para representar rutas del TSP.
+#
+# La ruta se divide en segmentos de ~sqrt(n) ciudades. Cada segmento guarda sus
+# ciudades, un bit de inversion y su rango (posicion en la lista de segmentos).
+# Invertir un camino solo parte los segmentos de sus extremos, invierte el
+# orden de los segmentos intermedios y cambia sus bits de inversion, por lo
+# que cuesta O(sqrt(n)) en lugar de O(n) como en un arreglo.
+#
+# Tiene la misma interfaz que utils/tour.Tour usada por los motores de
+# busqueda local (next, prev, between, reverse_path, sequence, tolist).
+#
+# Benchmark (desde src/):
+#   python utils/two_level_list.py
+
+import math
+
+
+class _Segmento:
+    __slots__ = ("cities", "rev", "rank")
+
+    def __init__(self, cities, rev, rank):
+        self.cities = cities
+        self.rev = rev
+        self.rank = rank
+
+    def orientado(self):
+        # Ciudades del segmento en el sentido de la ruta
+        return self.cities[::-1] if self.rev else self.cities
+
+
+class TwoLevelList:
+    """
+    Ruta como lista de dos niveles con segmentos de ~sqrt(n) ciudades.
+
+    Parámetros:
+    ----------
+    cities (iterable de ints): Ciudades en el orden de la ruta. Si la ruta está
+                               cerrada (la última ciudad repite la primera),
+                               se ignora la repetición.
+    num_cities (int, opcional): Cantidad total de ciudades del problema.
+    tam_segmento (int, opcional): Tamaño de los segmentos. Por defecto sqrt(n).
+    """
+
+    def __init__(self, cities, num_cities=None, tam_segmento=None):
+        cities = [int(c) for c in cities]
+        if len(cities) > 1 and cities[0] == cities[-1]:
+            cities.pop()
+        n = len(cities)
+        if num_cities is None:
+            num_cities = max(cities) + 1 if n else 0
+
+        self.tam = tam_segmento or max(8, math.isqrt(n))
+        self.seg = [None] * num_cities
+        self.idx = [0] * num_cities
+        self.segs = []
+        self.load(cities)
+
+    def load(self, cities):
+        """
+        Reemplaza la ruta por cities en O(n), reutilizando los índices por
+        ciudad y el tamaño de segmento.
+        """
+        cities = [int(c) for c in cities]
+        if len(cities) > 1 and cities[0] == cities[-1]:
+            cities.pop()
+        seg = self.seg
+        for s in self.segs:
+            for c in s.cities:
+                seg[c] = None
+        self.n = len(cities)
+        self.segs = []
+        for inicio in range(0, self.n, self.tam):
+            s = _Segmento(cities[inicio : inicio + self.tam], False, len(self.segs))
+            self.segs.append(s)
+            self._indexar(s)
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __contains__(self, c):
+        return 0 <= c < len(self.seg) and self.seg[c] is not None
+
+    def _indexar(self, s, desde=0):
+        seg, idx = self.seg, self.idx
+        cities = s.cities
+        for i in range(desde, len(cities)):
+            c = cities[i]
+            seg[c] = s
+            idx[c] = i
+
+    def _renumerar(self, desde=0):
+        segs = self.segs
+        for r in range(desde, len(segs)):
+            segs[r].rank = r
+
+    def _offset(self, c):
+        # Posición de c dentro de su segmento, en el sentido de la ruta
+        s = self.seg[c]
+        return len(s.cities) - 1 - self.idx[c] if s.rev else self.idx[c]
+
+    def next(self, c):
+        s = self.seg[c]
+        i = self.idx[c]
+        if s.rev:
+            if i > 0:
+                return s.cities[i - 1]
+        elif i + 1 < len(s.cities):
+            return s.cities[i + 1]
+        r = s.rank + 1
+        t = self.segs[r if r < len(self.segs) else 0]
+        return t.cities[-1] if t.rev else t.cities[0]
+
+    def prev(self, c):
+        s = self.seg[c]
+        i = self.idx[c]
+        if s.rev:
+            if i + 1 < len(s.cities):
+                return s.cities[i + 1]
+        elif i > 0:
+            return s.cities[i - 1]
+        t = self.segs[s.rank - 1]
+        return t.cities[0] if t.rev else t.cities[-1]
+
+    def between(self, a, b, c):
+        """
+        True si la ciudad b está en el camino a -> c (en el sentido de la ruta).
+        """
+        i = (self.seg[a].rank, self._offset(a))
+        j = (self.seg[b].rank, self._offset(b))
+        k = (self.seg[c].rank, self._offset(c))
+        if i <= k:
+            return i <= j <= k
+        return j >= i or j <= k
+
+    def _partir(self, c, antes):
+        # Parte el segmento de c para que c sea la primera (antes=True) o la
+        # última (antes=False) ciudad de su segmento
+        s = self.seg[c]
+        k = self._offset(c) + (0 if antes else 1)
+        largo = len(s.cities)
+        if k == 0 or k == largo:
+            return
+        # Las primeras k ciudades (en el sentido de la ruta) quedan en s
+        if s.rev:
+            primeras, resto = s.cities[largo - k :], s.cities[: largo - k]
+        else:
+            primeras, resto = s.cities[:k], s.cities[k:]
+        t = _Segmento(resto, s.rev, s.rank + 1)
+        s.cities = primeras
+        self.segs.insert(s.rank + 1, t)
+        self._renumerar(s.rank + 1)
+        self._indexar(t)
+        if s.rev:
+            self._indexar(s)
+
+    def _unir(self, s, t):
+        # Une el segmento t al final de s si son consecutivos y caben en uno
+        segs = self.segs
+        if s is t or len(s.cities) + len(t.cities) > self.tam:
+            return
+        if segs[s.rank] is not s or segs[t.rank] is not t or (s.rank + 1) % len(segs) != t.rank:
+            return
+        desde = 0 if s.rev else len(s.cities)
+        s.cities = s.orientado() + t.orientado()
+        s.rev = False
+        del segs[t.rank]
+        self._renumerar(min(t.rank, s.rank))
+        self._indexar(s, desde)
+
+    def reverse_path(self, a, b):
+        """
+        Invierte el camino de la ciudad a a la ciudad b (en el sentido de la ruta).
+
+        Si el camino está dentro de un segmento se invierte ahí mismo; si no,
+        se parten los segmentos de a y b y se invierte el orden de los
+        segmentos intermedios (o el de los del complemento, si son menos),
+        cambiando sus bits de inversión.
+
+        Complejidad de tiempo:
+        O(sqrt(n)).
+        """
+        if a == b:
+            return
+        s = self.seg[a]
+        if s is self.seg[b] and self._offset(a) <= self._offset(b):
+            i, j = self.idx[a], self.idx[b]
+            if i > j:
+                i, j = j, i
+            s.cities[i : j + 1] = s.cities[i : j + 1][::-1]
+            self._indexar_rango(s, i, j + 1)
+            return
+
+        self._partir(a, True)
+        self._partir(b, False)
+        segs = self.segs
+        m = len(segs)
+        ra, rb = self.seg[a].rank, self.seg[b].rank
+        cantidad = (rb - ra) % m + 1
+        if 2 * cantidad > m:
+            # Se invierte el complemento, que produce el mismo ciclo
+            ra, rb = (rb + 1) % m, (ra - 1) % m
+            cantidad = m - cantidad
+
+        i, j = ra, rb
+        for _ in range(cantidad // 2):
+            segs[i], segs[j] = segs[j], segs[i]
+            i = i + 1 if i + 1 < m else 0
+            j = j - 1 if j > 0 else m - 1
+        r = ra
+        for _ in range(cantidad):
+            segs[r].rev = not segs[r].rev
+            segs[r].rank = r
+            r = r + 1 if r + 1 < m else 0
+
+        # Las únicas fronteras nuevas están junto a a y b; ahí se unen los
+        # segmentos pequeños para mantener O(sqrt(n)) segmentos
+        for c in (a, b):
+            self._unir(self.segs[self.seg[c].rank - 1], self.seg[c])
+            self._unir(self.seg[c], self.segs[(self.seg[c].rank + 1) % len(self.segs)])
+
+    def _indexar_rango(self, s, i, j):
+        idx = self.idx
+        cities = s.cities
+        for k in range(i, j):
+            idx[cities[k]] = k
+
+    def sequence(self, start):
+        """
+        Lista de las ciudades de la ruta empezando por start.
+        """
+        ciudades = self.tolist()
+        i = ciudades.index(start)
+        return ciudades[i:] + ciudades[:i]
+
+    def tolist(self):
+        ciudades = []
+        for s in self.segs:
+            ciudades.extend(s.orientado())
+        return ciudades
+
+
+if __name__ == "__main__":
+
+    import random
+    import sys
+    import os
+    import time
+
+    sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+    from utils.tour import Tour
+
+    # Compara el costo de aplicar movimientos 2-opt aleatorios con la inversión
+    # por rebanadas de listas (la de la versión original de heuristic/two_opt.py),
+    # esa misma inversión manteniendo las posiciones de las ciudades (necesarias
+    # con listas de vecinos), el arreglo de utils/tour.py y la lista de dos niveles.
+    random.seed(0)
+    for n, movimientos in ((1000, 2000), (10000, 2000), (104815, 200), (238025, 100)):
+        ciudades = list(range(n))
+        random.shuffle(ciudades)
+        pares = [random.sample(range(n), 2) for _ in range(movimientos)]
+
+        tour = ciudades[:]
+        t0 = time.perf_counter()
+        for i, j in pares:
+            i, j = min(i, j), max(i, j)
+            tour[i + 1 : j + 1] = tour[i + 1 : j + 1][::-1]
+        t_rebanadas = time.perf_counter() - t0
+
+        tour = ciudades[:]
+        pos = [0] * n
+        for k, c in enumerate(tour):
+            pos[c] = k
+        t0 = time.perf_counter()
+        for a, b in pares:
+            i, j = sorted((pos[a], pos[b]))
+            tour[i + 1 : j + 1] = tour[i + 1 : j + 1][::-1]
+            for k in range(i + 1, j + 1):
+                pos[tour[k]] = k
+        t_posiciones = time.perf_counter() - t0
+
+        arreglo = Tour(ciudades)
+        t0 = time.perf_counter()
+        for a, b in pares:
+            arreglo.reverse_path(a, b)
+        t_arreglo = time.perf_counter() - t0
+
+        lista = TwoLevelList(ciudades)
+        t0 = time.perf_counter()
+        for a, b in pares:
+            lista.reverse_path(a, b)
+        t_dos_niveles = time.perf_counter() - t0
+
+        print(
+            f"n={n:>6}  por movimiento: rebanadas {1e6 * t_rebanadas / movimientos:8.1f} us"
+            f" | rebanadas + posiciones {1e6 * t_posiciones / movimientos:9.1f} us"
+            f" | Tour {1e6 * t_arreglo / movimientos:9.1f} us"
+            f" | dos niveles {1e6 * t_dos_niveles / movimientos:7.1f} us"
+            f" ({len(lista.segs)} segmentos)"
+        )